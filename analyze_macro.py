@@ -1,56 +1,60 @@
-import sys
+"""
+Schema discovery for the macro workbook: scans only the first rows of each sheet and prints
+(or writes) the manifest of sheet -> indicator -> column/header row plus keyword matches.
+
+    python analyze_macro.py                                  # manifest JSON between JSON_START/JSON_END
+    python analyze_macro.py --rows 30 --keywords cpi repo --output manifest.json
+
+Ingestion (macro_workbook.load_workbook) caches the same manifest next to the typed sheets
+and reads each sheet from below its header row instead of rescanning.
+"""
+import argparse
 import json
+import sys
+import time
 import traceback
 
 print("Starting Excel Analysis...", flush=True)
 
 try:
-    import pandas as pd
-    print("Pandas imported.", flush=True)
+    from macro_workbook import (
+        CACHE_DIR, DISCOVERY_KEYWORDS, DISCOVERY_ROWS, WORKBOOK_PATH,
+        discover_schema, file_hash, manifest_path, save_manifest
+    )
 except ImportError as e:
-    print(f"Error importing pandas: {e}", flush=True)
+    print(f"Error importing macro_workbook: {e}", flush=True)
     sys.exit(1)
 
-FILE_PATH = "/Users/rudresh/project-31/50 Macroeconomic Indicators.xlsx"
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument("--workbook", default=WORKBOOK_PATH)
+parser.add_argument("--rows", type=int, default=DISCOVERY_ROWS, help="rows scanned per sheet")
+parser.add_argument("--keywords", nargs="+", default=list(DISCOVERY_KEYWORDS))
+parser.add_argument("--output", help="write the manifest here instead of printing it")
+args = parser.parse_args()
 
 try:
-    print(f"Attempting to read: {FILE_PATH}", flush=True)
-    # Read the Excel file - force openpyxl engine
-    xl = pd.ExcelFile(FILE_PATH, engine='openpyxl')
-    print(f"Sheets found: {xl.sheet_names}", flush=True)
-
-    summary = {}
-    
-    for sheet in xl.sheet_names:
-        print(f"Scanning sheet: {sheet}", flush=True)
-        df = pd.read_excel(FILE_PATH, sheet_name=sheet, engine='openpyxl')
-        
-        # Search for keywords in string columns
-        # We convert to string and search "inflation", "cpi", "consumer price"
-        # Also look for G-Sec
-        
-        found_keywords = []
-        
-        # Check headers
-        for col in df.columns:
-            c_str = str(col).lower()
-            if any(x in c_str for x in ["inflation", "cpi", "consumer price", "g-sec", "yield", "rate"]):
-                found_keywords.append(f"Header: {col}")
-                
-        # Check first 20 rows for metadata
-        sample = df.head(20).astype(str)
-        for idx, row in sample.iterrows():
-            for col in df.columns:
-                val = str(row[col]).lower()
-                if any(x in val for x in ["inflation", "cpi", "consumer price", "yr g-sec"]):
-                     found_keywords.append(f"Row {idx}: {val}")
-        
-        if found_keywords:
-            summary[sheet] = found_keywords[:10] # Limit to 10 findings
-
-    print("JSON_START")
-    print(json.dumps(summary, indent=4, default=str))
-    print("JSON_END")
+    print(f"Attempting to read: {args.workbook}", flush=True)
+    sha256 = file_hash(args.workbook)
+    start = time.perf_counter()
+    manifest = discover_schema(args.workbook, args.rows, args.keywords, sha256=sha256)
+    elapsed = time.perf_counter() - start
+
+    for sheet, schema in manifest["sheets"].items():
+        print(f"Scanning sheet: {sheet} -> header row {schema['header_row']}, "
+              f"{len(schema['indicators'])} indicators, keywords: {sorted(schema['keywords'])}", flush=True)
+    print(f"Discovered {len(manifest['sheets'])} sheets in {elapsed * 1000:.0f} ms", flush=True)
+
+    if args.rows == DISCOVERY_ROWS and args.keywords == list(DISCOVERY_KEYWORDS):
+        # Same parameters as ingestion: let the next load_workbook() reuse this scan
+        save_manifest(manifest, manifest_path(sha256, CACHE_DIR))
+
+    if args.output:
+        save_manifest(manifest, args.output)
+        print(f"Manifest written to {args.output}", flush=True)
+    else:
+        print("JSON_START")
+        print(json.dumps(manifest, indent=4, ensure_ascii=False))
+        print("JSON_END")
 
 except Exception as e:
     print("An error occurred:", flush=True)
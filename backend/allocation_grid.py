@@ -0,0 +1,96 @@
+import os
+import numpy as np
+
+# Input domain of the prescription model (mirrors generate_allocation_data.py)
+AGE_RANGE = (18, 70)
+HORIZON_RANGE = (1, 25)
+RISK_LEVELS = (1, 2, 3)
+INCOME_RANGE = (30000, 500000)
+
+DEFAULT_INCOME_BUCKETS = int(os.getenv("PRESCRIPTION_GRID_INCOME_BUCKETS", "48"))
+# Max allowed |grid - forest| in percentage points before the grid is rejected
+DEFAULT_TOLERANCE = float(os.getenv("PRESCRIPTION_GRID_TOLERANCE", "5"))
+
+
+def sample_inputs(samples, seed=0):
+    """Random in-domain [age, income, horizon, risk] rows (continuous income), for model checks."""
+    rng = np.random.default_rng(seed)
+    return np.column_stack([
+        rng.integers(AGE_RANGE[0], AGE_RANGE[1] + 1, samples),
+        rng.uniform(INCOME_RANGE[0], INCOME_RANGE[1], samples),
+        rng.integers(HORIZON_RANGE[0], HORIZON_RANGE[1] + 1, samples),
+        rng.choice(RISK_LEVELS, samples)
+    ]).astype(float)
+
+
+class AllocationGrid:
+    """
+    The prescription forest evaluated once over its whole (bounded) input domain.
+    Age, horizon and risk are exact integer axes; income is quantized into buckets.
+    Serving becomes an indexed read from a (age, income, horizon, risk, 3) uint8 table.
+    """
+
+    def __init__(self, table):
+        self.table = table
+        self.income_buckets = table.shape[1]
+
+    def _income_index(self, income):
+        scaled = (income - INCOME_RANGE[0]) / (INCOME_RANGE[1] - INCOME_RANGE[0]) * self.income_buckets
+        return np.minimum(scaled.astype(np.intp), self.income_buckets - 1)
+
+    @classmethod
+    def compile(cls, model, income_buckets=DEFAULT_INCOME_BUCKETS):
+        """Runs one big vectorized predict over the dense grid (bucket centers for income)."""
+        ages = np.arange(AGE_RANGE[0], AGE_RANGE[1] + 1)
+        horizons = np.arange(HORIZON_RANGE[0], HORIZON_RANGE[1] + 1)
+        risks = np.array(RISK_LEVELS)
+        income_edges = np.linspace(INCOME_RANGE[0], INCOME_RANGE[1], income_buckets + 1)
+        incomes = (income_edges[:-1] + income_edges[1:]) / 2
+
+        # Column order must match the training features: Age, Income, HorizonYears, RiskTolerance
+        mesh = np.stack(np.meshgrid(ages, incomes, horizons, risks, indexing="ij"), axis=-1).reshape(-1, 4)
+        predictions = np.rint(model.predict(mesh)).clip(0, 100).astype(np.uint8)
+        table = np.ascontiguousarray(predictions.reshape(len(ages), len(incomes), len(horizons), len(risks), 3))
+        return cls(table)
+
+    def covers(self, inputs):
+        """Boolean mask of rows that fall inside the compiled domain."""
+        age, income, horizon, risk = inputs.T
+        return (
+            (age >= AGE_RANGE[0]) & (age <= AGE_RANGE[1]) & (age == np.floor(age)) &
+            (horizon >= HORIZON_RANGE[0]) & (horizon <= HORIZON_RANGE[1]) & (horizon == np.floor(horizon)) &
+            np.isin(risk, RISK_LEVELS) &
+            (income >= INCOME_RANGE[0]) & (income <= INCOME_RANGE[1])
+        )
+
+    def lookup_many(self, inputs):
+        """Looks up an (n, 4) array of in-domain rows. Returns an (n, 3) int array."""
+        age, income, horizon, risk = inputs.T
+        return self.table[
+            age.astype(np.intp) - AGE_RANGE[0],
+            self._income_index(income),
+            horizon.astype(np.intp) - HORIZON_RANGE[0],
+            risk.astype(np.intp) - RISK_LEVELS[0]
+        ]
+
+    def lookup(self, age, income, horizon_years, risk_tolerance):
+        """O(1) single-row lookup. Returns None when the input is outside the compiled domain."""
+        if not (AGE_RANGE[0] <= age <= AGE_RANGE[1] and HORIZON_RANGE[0] <= horizon_years <= HORIZON_RANGE[1]
+                and risk_tolerance in RISK_LEVELS and INCOME_RANGE[0] <= income <= INCOME_RANGE[1]
+                and age == int(age) and horizon_years == int(horizon_years)):
+            return None
+        income_idx = self._income_index(np.float64(income))
+        return self.table[int(age) - AGE_RANGE[0], income_idx,
+                          int(horizon_years) - HORIZON_RANGE[0], int(risk_tolerance) - RISK_LEVELS[0]]
+
+    def verify(self, model, samples=5000, seed=0):
+        """Compares the grid against the live forest on random in-domain inputs (continuous income)."""
+        inputs = sample_inputs(samples, seed)
+        expected = np.rint(model.predict(inputs))
+        error = np.abs(self.lookup_many(inputs).astype(float) - expected)
+        return {
+            "samples": samples,
+            "max_abs_error": float(error.max()),
+            "mean_abs_error": float(error.mean()),
+            "exact_match_pct": round(float((error.max(axis=1) == 0).mean() * 100), 2)
+        }
@@ -0,0 +1,97 @@
+import json
+import os
+import tempfile
+
+from fastapi import HTTPException
+
+# Rows scored per vectorized predict call (bounds memory for huge uploads)
+BATCH_CHUNK_SIZE = int(os.getenv("BATCH_CHUNK_SIZE", "5000"))
+# Uploads larger than this spill from RAM to a temp file while being scored
+SPOOL_MAX_BYTES = int(os.getenv("BATCH_SPOOL_MAX_BYTES", str(8 << 20)))
+
+PERSONA_FIELDS = ("needs_pct", "wants_pct", "savings_pct")
+PRESCRIPTION_FIELDS = ("age", "income", "horizon_years", "risk_tolerance")
+
+
+def _iter_ndjson(f):
+    for line_no, line in enumerate(f, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_no, json.loads(line)
+        except ValueError:
+            yield line_no, None
+    f.close()
+
+
+async def spool_records(request):
+    """
+    Reads the request body before the response starts and returns an iterator of (line_no, record).
+     - application/json: a list of objects, or {"items": [...]}
+     - application/x-ndjson: one JSON object per line
+     - multipart/form-data: an NDJSON file in the "file" field
+    NDJSON bodies are spooled (RAM, then disk) so million-row files don't sit in memory.
+    A record is None when its line could not be decoded.
+    """
+    content_type = request.headers.get("content-type", "")
+
+    if "multipart/form-data" in content_type:
+        form = await request.form()
+        upload = form["file"].file
+        upload.seek(0)
+        return _iter_ndjson(upload)
+
+    if "ndjson" in content_type or "jsonlines" in content_type:
+        spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+        async for block in request.stream():
+            spool.write(block)
+        spool.seek(0)
+        return _iter_ndjson(spool)
+
+    try:
+        body = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=422, detail="Malformed JSON body")
+    items = body.get("items", []) if isinstance(body, dict) else body
+    if not isinstance(items, list):
+        raise HTTPException(status_code=422, detail='Expected a JSON array of records or {"items": [...]}')
+    return enumerate(items, start=1)
+
+
+def _extract(record, fields):
+    if not isinstance(record, dict):
+        raise ValueError("Invalid JSON object")
+    try:
+        return [float(record[f]) for f in fields]
+    except KeyError as e:
+        raise ValueError(f"Missing field {e}")
+    except (TypeError, ValueError):
+        raise ValueError(f"Non-numeric value in {fields}")
+
+
+def stream_predictions(records, fields, predict_many, chunk_size=BATCH_CHUNK_SIZE):
+    """
+    Groups records into chunks, runs one vectorized predict per chunk and yields NDJSON.
+    Invalid rows are reported in-line as {"line": n, "error": ...} so the stream keeps going.
+    """
+    rows, slots = [], []
+
+    def flush():
+        predictions = iter(predict_many(rows) if rows else [])
+        out = [json.dumps(slot if slot is not None else next(predictions)) for slot in slots]
+        rows.clear()
+        slots.clear()
+        return ("\n".join(out) + "\n").encode()
+
+    for line_no, record in records:
+        try:
+            rows.append(_extract(record, fields))
+            slots.append(None)
+        except ValueError as e:
+            slots.append({"line": line_no, "error": str(e)})
+
+        if len(slots) >= chunk_size:
+            yield flush()
+
+    if slots:
+        yield flush()
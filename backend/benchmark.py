@@ -0,0 +1,395 @@
+"""
+Micro-benchmarks for the backend hot paths.
+Run from backend/:  python benchmark.py <suite> [options]
+"""
+import argparse
+import subprocess
+import sys
+import time
+import warnings
+
+import numpy as np
+
+warnings.filterwarnings("ignore", message="X does not have valid feature names")
+
+
+def timeit(fn, repeat):
+    """Returns (mean_us, p99_us) per call."""
+    samples = np.empty(repeat)
+    for i in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples[i] = time.perf_counter() - start
+    return samples.mean() * 1e6, np.percentile(samples, 99) * 1e6
+
+
+def report(label, mean_us, p99_us):
+    print(f"  {label:<32} mean {mean_us:>10.1f} us   p99 {p99_us:>10.1f} us")
+
+
+def bench_prescription(args):
+    """Forest vs compiled grid for single-row predict_prescription."""
+    from ml_engine import MLEngine
+
+    engine = MLEngine()
+    engine.cache.maxsize = 0  # measure the model, not the response cache
+    engine.load_or_train_prescription_model()
+    rng = np.random.default_rng(0)
+    queries = [(int(rng.integers(18, 71)), float(rng.uniform(30000, 500000)),
+                int(rng.integers(1, 26)), int(rng.integers(1, 4))) for _ in range(args.repeat)]
+
+    it = iter(queries * 2)
+    forest = timeit(lambda: engine.predict_prescription(*next(it)), args.repeat)
+
+    start = time.perf_counter()
+    check = engine.compile_prescription_model(income_buckets=args.income_buckets)
+    print(f"Grid compile + verify: {time.perf_counter() - start:.2f}s  {check}")
+
+    it = iter(queries * 2)
+    compiled = timeit(lambda: engine.predict_prescription(*next(it)), args.repeat)
+
+    print("predict_prescription (single row):")
+    report("forest", *forest)
+    report("compiled grid", *compiled)
+    print(f"  speed-up: {forest[0] / compiled[0]:.0f}x")
+
+
+def bench_compact_forest(args):
+    """
+    sklearn forest vs CompactForest: serialized size, node-array RAM, parity and predict time.
+    Exits non-zero if the float32 export does not reproduce the forest (the parity check), or if
+    compact mode predicts any batch size slower than the sklearn forest.
+    """
+    import pickle
+
+    from allocation_grid import sample_inputs
+    from compact_forest import CompactForest
+    from ml_engine import MLEngine
+
+    engine = MLEngine()
+    engine.prescription_mode = "forest"
+    engine.load_or_train_prescription_model()
+    forest = engine.prescription_model
+    inputs = sample_inputs(args.samples, seed=1)
+
+    print(f"sklearn forest: pickle {len(pickle.dumps(forest)) // 1024} KB")
+    exports = {}
+    for dtype in ("float64", "float32", "int16"):
+        exports[dtype] = compact = CompactForest.from_sklearn(forest, dtype)
+        check = compact.verify(forest, inputs)
+        print(f"  compact {dtype:<8} pickle {len(pickle.dumps(compact)) // 1024:>6} KB   {check}")
+
+    compact = exports["float32"]
+    print("predict:")
+    for rows in (1, 10, 100, 1000, 5000):
+        batch = inputs[:rows]
+        repeat = max(3, args.repeat // rows)
+        report(f"sklearn {rows} rows", *timeit(lambda: forest.predict(batch), repeat))
+        report(f"compact {rows} rows", *timeit(lambda: compact.predict(batch), repeat))
+
+    if compact.verify(forest, inputs)["max_abs_error"] > 1e-6:
+        sys.exit("float32 CompactForest does not match the sklearn forest")
+
+    # What compact mode actually serves per batch size (large batches go to sklearn): never slower
+    engine.prescription_model = compact
+    batches = sample_inputs(5000, seed=2)
+    slower = []
+    print("compact mode (predict_prescription_many model):")
+    for rows in (1, 100, 500, 1000, 5000):
+        batch = batches[:rows]
+        repeat = max(3, args.repeat // rows)
+        model = engine.prescription_batch_model(rows)
+        served = timeit(lambda: model.predict(batch), repeat)
+        baseline = timeit(lambda: forest.predict(batch), repeat)
+        report(f"{type(model).__name__} {rows} rows", *served)
+        # 10% slack for timer noise when both sides run the same sklearn forest
+        if served[0] > baseline[0] * 1.1:
+            slower.append(f"{rows} rows: {served[0] / 1000:.1f} ms vs sklearn {baseline[0] / 1000:.1f} ms")
+    if slower:
+        sys.exit("compact mode is slower than the sklearn forest at " + "; ".join(slower))
+
+
+def bench_persona(args):
+    """sklearn scaler+KMeans vs the NumPy centroid scorer, single rows and a 10k batch."""
+    from ml_engine import MLEngine
+
+    engine = MLEngine()
+    engine.load_or_train_persona_model()
+    scorer, scaler, kmeans = engine.persona_scorer, engine.scaler, engine.persona_model
+
+    rng = np.random.default_rng(0)
+    batch = rng.integers(0, 101, size=(10000, 3)).astype(float)
+    parity = (scorer.nearest(batch) == kmeans.predict(scaler.transform(batch))).mean() * 100
+    print(f"Cluster parity with KMeans.predict on 10k rows: {parity:.2f}%")
+
+    row = np.array([[50.0, 30.0, 20.0]])
+    print("predict_persona (single row):")
+    report("sklearn transform+predict", *timeit(lambda: kmeans.predict(scaler.transform(row)), args.repeat))
+    report("centroid scorer (top-3)", *timeit(lambda: scorer.predict(50, 30, 20), args.repeat))
+    print("10k-row batch:")
+    report("sklearn transform+predict", *timeit(lambda: kmeans.predict(scaler.transform(batch)), 20))
+    report("centroid scorer nearest", *timeit(lambda: scorer.nearest(batch), 20))
+    report("centroid scorer top-3 + conf", *timeit(lambda: scorer.score(batch), 20))
+
+
+def bench_optimizer(args):
+    """Analytic solver (vertex enumeration, frontier) vs PuLP/CBC: equivalence on random + boundary cases, then latency."""
+    from optimizer import TaxOptimizer
+
+    optimizer = TaxOptimizer(solver="analytic")
+    start = time.perf_counter()
+    check = optimizer.verify(samples=args.samples)
+    print(f"Equivalence vs PuLP ({time.perf_counter() - start:.1f}s): {check}")
+
+    rng = np.random.default_rng(0)
+    queries = [(float(rng.uniform(0, 5e6)), int(rng.integers(1, 4)), 0.3) for _ in range(args.repeat)]
+    print("optimize_portfolio (single call):")
+    it = iter(queries * 2)
+    pulp_timing = timeit(lambda: optimizer.optimize_portfolio_pulp(*next(it)), min(args.repeat, 200))
+    report("pulp / CBC subprocess", *pulp_timing)
+    def vertex_solve():
+        amount, risk, slab = next(it)
+        return optimizer.portfolio_lp(risk).solve(amount, optimizer.effective_returns(slab))
+
+    it = iter(queries * 2)
+    report("vertex enumeration", *timeit(vertex_solve, args.repeat))
+    it = iter(queries * 2)
+    analytic_timing = timeit(lambda: optimizer.optimize_portfolio_uncached(*next(it)), args.repeat)
+    report("frontier interpolation", *analytic_timing)
+    report("result cache hit", *timeit(lambda: optimizer.optimize_portfolio(500000, 2, 0.3), args.repeat))
+    print(f"  speed-up vs pulp: {pulp_timing[0] / analytic_timing[0]:.0f}x")
+    if check["mismatches"]:
+        sys.exit("analytic solver disagrees with PuLP")
+
+
+def bench_optimizer_batch(args):
+    """optimize_many over a synthetic book of --rows customers, spot-checked against optimize_portfolio."""
+    from optimizer import TaxOptimizer
+
+    optimizer = TaxOptimizer(solver="analytic")
+    rng = np.random.default_rng(0)
+    amounts = rng.uniform(10000, 5e6, args.rows).round()
+    risks = rng.integers(1, 4, args.rows)
+    slabs = rng.choice([0.0, 0.05, 0.1, 0.15, 0.2, 0.3], args.rows)
+
+    start = time.perf_counter()
+    table = optimizer.optimize_many(amounts, risks, slabs)
+    elapsed = time.perf_counter() - start
+    print(f"optimize_many: {args.rows:,} rows in {elapsed:.2f}s ({args.rows / elapsed:,.0f} rows/s)")
+
+    sample = rng.choice(args.rows, min(args.rows, 2000), replace=False)
+    mismatches = 0
+    for i in sample.tolist():
+        single = optimizer.optimize_portfolio(amounts[i], int(risks[i]), slabs[i])
+        row = [table[label][i] for label in single["allocation"]] + [table["projected_return_1y"][i]]
+        expected = list(single["allocation"].values()) + [single["projected_return_1y"]]
+        mismatches += any(abs(a - b) > 1 for a, b in zip(row, expected)) or table["status"][i] != single["status"]
+    print(f"Spot check vs optimize_portfolio: {mismatches}/{len(sample)} mismatches")
+    if mismatches:
+        sys.exit("optimize_many disagrees with optimize_portfolio")
+
+
+def bench_projection(args):
+    """Monte Carlo projection latency (budget: 50 ms for 10k paths x 30 years) and seed reproducibility."""
+    from optimizer import optimizer
+    from projection import projection_engine
+
+    allocation = projection_engine.allocation_from_result(optimizer.optimize_portfolio(500000, 2, 0.3))
+    run = lambda: projection_engine.project(allocation, optimizer.returns, 0.3, args.years, args.paths, seed=7)
+    first = run()  # allocates this thread's buffers
+    mean_us, p99_us = timeit(run, 20)
+    print(f"project ({args.paths:,} paths x {args.years} years):")
+    report("monte carlo + percentiles", mean_us, p99_us)
+    print(f"  reproducible with a fixed seed: {run()['percentiles'] == first['percentiles']}")
+    print(f"  median final value: {first['median_final_value']:,} on {first['invested']:,.0f} invested")
+    if mean_us > 50000:
+        print("  ⚠️ over the 50 ms request budget")
+
+
+def bench_macro(args):
+    """Indicator store queries across all indicators (as-of/yoy are one searchsorted each)."""
+    from macro_store import IndicatorStore, MACRO_INDICATORS_PATH
+
+    store = IndicatorStore.load(MACRO_INDICATORS_PATH)
+    first = store.ids[0]
+    print(f"macro store ({len(store)} indicators, {len(store.values):,} observations):")
+    report("latest (all)", *timeit(store.latest, args.repeat))
+    report("as_of (all)", *timeit(lambda: store.as_of("2022-06-30"), args.repeat))
+    report("yoy (all)", *timeit(store.yoy, args.repeat))
+    report("range (one)", *timeit(lambda: store.range(first, "2020-01-01", "2020-12-31"), args.repeat))
+    report("resample M mean (all)", *timeit(lambda: store.resample("M", "mean"), args.repeat))
+
+
+LOAD_MIX = [
+    ("/analyze/persona", lambda rng: {
+        "age_group": "22-28", "state": "Goa", "income": 50000,
+        "needs_pct": int(rng.integers(20, 60)), "wants_pct": 30, "savings_pct": 20}),
+    ("/analyze/prescription", lambda rng: {
+        "age": int(rng.integers(18, 71)), "income": int(rng.integers(30, 500)) * 1000,
+        "horizon_years": int(rng.integers(1, 26)), "risk_tolerance": int(rng.integers(1, 4))}),
+    ("/analyze/optimize", lambda rng: {
+        "investment_amount": int(rng.integers(1, 50)) * 50000, "risk_profile": int(rng.integers(1, 4))}),
+]
+
+
+def bench_load(args):
+    """
+    p50/p99 per endpoint under concurrent load against a running server, e.g.
+    uvicorn main:app --port 8000 & python benchmark.py load --url http://127.0.0.1:8000
+    """
+    import json
+    import urllib.request
+    from concurrent.futures import ThreadPoolExecutor
+
+    rng = np.random.default_rng(0)
+    jobs = [LOAD_MIX[i % len(LOAD_MIX)] for i in range(args.requests)]
+    jobs = [(path, json.dumps(make(rng)).encode()) for path, make in jobs]
+
+    def hit(job):
+        path, body = job
+        req = urllib.request.Request(args.url + path, data=body, headers={"Content-Type": "application/json"})
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(req, timeout=60) as resp:
+                resp.read()
+                status = resp.status
+        except urllib.error.HTTPError as e:
+            status = e.code
+        return path, status, time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(args.concurrency) as pool:
+        results = list(pool.map(hit, jobs))
+    wall = time.perf_counter() - start
+
+    print(f"{args.requests} requests, concurrency {args.concurrency}: {args.requests / wall:.0f} req/s")
+    for path, _ in LOAD_MIX:
+        latencies = np.array([t for p, status, t in results if p == path and status == 200]) * 1e3
+        errors = sum(1 for p, status, _ in results if p == path and status != 200)
+        if len(latencies):
+            print(f"  {path:<24} p50 {np.percentile(latencies, 50):8.1f} ms   "
+                  f"p99 {np.percentile(latencies, 99):8.1f} ms   non-200: {errors}")
+
+
+def bench_dataset(args):
+    """pd.read_csv vs the columnar DatasetCache on a --rows synthetic persona CSV."""
+    import os
+    import tempfile
+
+    import pandas as pd
+
+    from dataset_cache import DatasetCache
+    from generate_data import write_dataset
+    from ml_engine import PERSONA_COLUMNS
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "dataset_personas.csv")
+        write_dataset(source, args.rows, seed=0)
+        cache = DatasetCache(os.path.join(tmp, "cache"))
+
+        def timed(fn):
+            start = time.perf_counter()
+            fn()
+            return time.perf_counter() - start
+
+        print(f"{args.rows} rows, {os.path.getsize(source) / 1e6:.0f} MB CSV:")
+        print(f"  {'pd.read_csv':<32} {timed(lambda: pd.read_csv(source)):8.2f} s")
+        print(f"  {'first use (parse + convert)':<32} {timed(lambda: cache.ensure(source)):8.2f} s")
+        print(f"  {'cached load (persona columns)':<32} {timed(lambda: cache.load(source, PERSONA_COLUMNS)):8.2f} s")
+        print(f"  {'cached load (all columns)':<32} {timed(lambda: cache.load(source)):8.2f} s")
+
+
+TRAINING_SCRIPT = """
+import resource, sys, time
+from ml_engine import MLEngine
+engine = MLEngine()
+engine.training_mode = "chunked"
+engine.data_path, engine.allocations_path = sys.argv[1], sys.argv[2]
+start = time.perf_counter()
+engine.datasets.ensure(engine.data_path)
+engine.datasets.ensure(engine.allocations_path)
+converted = time.perf_counter()
+engine.train_persona_model()
+engine.train_prescription_model()
+print(converted - start, time.perf_counter() - converted, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+
+def bench_training(args):
+    """Chunked (out-of-core) training at --rows and 4x --rows: time and peak RSS should stay flat."""
+    import os
+    import tempfile
+
+    import generate_data
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import generate_allocation_data
+
+    for rows in (args.rows, 4 * args.rows):
+        with tempfile.TemporaryDirectory() as tmp:
+            personas, allocations = os.path.join(tmp, "personas.csv"), os.path.join(tmp, "allocations.csv")
+            generate_data.write_dataset(personas, rows, seed=0)
+            generate_allocation_data.write_dataset(allocations, rows, seed=0)
+            env = dict(os.environ, DATASET_CACHE_DIR=os.path.join(tmp, "cache"))
+            proc = subprocess.run([sys.executable, "-W", "ignore", "-c", TRAINING_SCRIPT, personas, allocations],
+                                  capture_output=True, text=True, env=env)
+            if proc.returncode != 0:
+                sys.exit(proc.stderr)
+            convert_s, train_s, peak_kb = proc.stdout.split()[-3:]
+            print(f"  {rows:>10} rows   convert {float(convert_s):7.1f} s   train {float(train_s):7.1f} s   "
+                  f"peak RSS {int(peak_kb) / 1024:7.0f} MB")
+
+
+def bench_importtime(args):
+    """
+    Cold `import main` cost (python -X importtime) with the heaviest top-level imports.
+    --max-ms makes it a CI gate: exits non-zero when the import regresses past the budget.
+    """
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"],
+                          capture_output=True, text=True)
+    if proc.returncode != 0:
+        sys.exit(proc.stderr)
+
+    modules = []  # (cumulative_us, self_us, name)
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules.append((int(cumulative_us), int(self_us), name.rstrip()))
+
+    total_ms = next(c for c, _, name in modules if name.strip() == "main") / 1000
+    print(f"import main: {total_ms:.0f} ms ({len(modules)} modules)")
+    for cumulative_us, self_us, name in sorted(modules, reverse=True)[1:11]:
+        print(f"  {name.strip():<40} cumulative {cumulative_us / 1000:8.1f} ms   self {self_us / 1000:6.1f} ms")
+    if args.max_ms and total_ms > args.max_ms:
+        sys.exit(f"import main took {total_ms:.0f} ms, budget is {args.max_ms:.0f} ms")
+
+
+SUITES = {
+    "compact-forest": bench_compact_forest,
+    "dataset": bench_dataset,
+    "importtime": bench_importtime,
+    "load": bench_load,
+    "macro": bench_macro,
+    "optimizer": bench_optimizer,
+    "optimizer-batch": bench_optimizer_batch,
+    "projection": bench_projection,
+    "persona": bench_persona,
+    "prescription": bench_prescription,
+    "training": bench_training,
+}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("suite", choices=sorted(SUITES))
+    parser.add_argument("--repeat", type=int, default=500)
+    parser.add_argument("--income-buckets", type=int, default=48)
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--requests", type=int, default=600)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--max-ms", type=float, default=0)
+    parser.add_argument("--samples", type=int, default=2000)
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--paths", type=int, default=10000)
+    parser.add_argument("--years", type=int, default=30)
+    args = parser.parse_args()
+    SUITES[args.suite](args)
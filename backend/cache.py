@@ -0,0 +1,115 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+def _sizeof(obj):
+    """Rough deep size of the plain Python values we cache (dicts/lists of scalars)."""
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(_sizeof(k) + _sizeof(v) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple)):
+        size += sum(_sizeof(v) for v in obj)
+    return size
+
+
+class LRUCache:
+    """
+    Thread-safe bounded LRU cache with an optional TTL and hit/miss accounting.
+    Cached values are shared between callers and must be treated as read-only.
+    """
+
+    def __init__(self, name, maxsize=4096, ttl=3600):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()  # key -> (expires_at, value, nbytes)
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                expires_at, value, nbytes = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+                self._bytes -= nbytes
+                self.expirations += 1
+            self.misses += 1
+            return default
+
+    def set(self, key, value):
+        if self.maxsize <= 0:
+            return
+        nbytes = _sizeof(key) + _sizeof(value)
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= old[2]
+            self._data[key] = (expires_at, value, nbytes)
+            self._bytes += nbytes
+            while len(self._data) > self.maxsize:
+                _, (_, _, evicted_bytes) = self._data.popitem(last=False)
+                self._bytes -= evicted_bytes
+                self.evictions += 1
+
+    def __contains__(self, key):
+        """Whether `key` holds a live entry (no hit/miss accounting, no LRU reordering)."""
+        with self._lock:
+            entry = self._data.get(key)
+            return entry is not None and (entry[0] is None or entry[0] > time.monotonic())
+
+    def get_or_compute(self, key, compute):
+        """Returns the cached value, or computes and stores it (computation runs outside the lock)."""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.set(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+            self.invalidations += 1
+
+    def evict(self, predicate):
+        """Drops every entry whose key satisfies predicate(key); returns how many were dropped."""
+        with self._lock:
+            stale = [key for key in self._data if predicate(key)]
+            for key in stale:
+                self._bytes -= self._data.pop(key)[2]
+            if stale:
+                self.invalidations += 1
+            return len(stale)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "name": self.name,
+                "entries": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+                "memory_bytes": self._bytes,
+                "avg_entry_bytes": self._bytes // len(self._data) if self._data else 0
+            }
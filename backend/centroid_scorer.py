@@ -0,0 +1,95 @@
+import os
+import numpy as np
+
+DEFAULT_TOP_K = 3
+# Softmax temperature over squared distances in scaled feature space
+DEFAULT_TEMPERATURE = float(os.getenv("PERSONA_SOFTMAX_TEMPERATURE", "1.0"))
+
+
+class CentroidScorer:
+    """
+    Nearest-centroid persona scorer on plain contiguous arrays.
+    Equivalent to StandardScaler.transform + KMeans.predict, but without sklearn's
+    per-call validation, and it also yields a distance-based confidence per persona.
+    """
+
+    def __init__(self, mean, scale, centroids, cluster_map, temperature=DEFAULT_TEMPERATURE):
+        self.mean = np.ascontiguousarray(mean, dtype=np.float64)
+        self.scale = np.ascontiguousarray(scale, dtype=np.float64)
+        self.centroids = np.ascontiguousarray(centroids, dtype=np.float64)
+        self.centroid_sq = (self.centroids ** 2).sum(axis=1)
+        self.temperature = temperature
+
+        # Several clusters can share a persona label; confidences are summed per label
+        self.cluster_labels = [cluster_map.get(c, "unknown") for c in range(len(self.centroids))]
+        self.labels = sorted(set(self.cluster_labels))
+        self.cluster_label_ids = np.array([self.labels.index(label) for label in self.cluster_labels])
+        self.cluster_to_label = np.zeros((len(self.centroids), len(self.labels)))
+        self.cluster_to_label[np.arange(len(self.centroids)), self.cluster_label_ids] = 1.0
+
+    @classmethod
+    def from_models(cls, scaler, kmeans, cluster_map):
+        return cls(scaler.mean_, scaler.scale_, kmeans.cluster_centers_, cluster_map)
+
+    def transform(self, rows):
+        """Same as StandardScaler.transform on an (n, 3) batch."""
+        return (np.asarray(rows, dtype=np.float64).reshape(-1, 3) - self.mean) / self.scale
+
+    def _partial_distances(self, scaled):
+        """
+        Squared distances minus the per-row |x|^2 term, which is constant across centroids
+        and therefore irrelevant for argmin and softmax.
+        """
+        return self.centroid_sq - 2.0 * (scaled @ self.centroids.T)
+
+    def nearest(self, rows):
+        """Nearest cluster id per row (same result as KMeans.predict)."""
+        return self._partial_distances(self.transform(rows)).argmin(axis=1)
+
+    def score(self, rows, top_k=DEFAULT_TOP_K):
+        """
+        Returns (cluster_ids, distances, label_ids, label_probs, probs):
+         - cluster_ids/distances: nearest centroid per row (same as KMeans.predict)
+         - probs: (n, personas) softmax(-d^2 / T) over centroids, summed per persona
+         - label_ids/label_probs: the top-k columns of probs
+        """
+        return self.score_scaled(self.transform(rows), top_k)
+
+    def score_scaled(self, scaled, top_k=DEFAULT_TOP_K):
+        """score() for rows that are already transformed."""
+        partial = self._partial_distances(scaled)
+        cluster_ids = partial.argmin(axis=1)
+        nearest = partial[np.arange(len(partial)), cluster_ids]
+        distances = np.sqrt(np.maximum(nearest + (scaled ** 2).sum(axis=1), 0.0))
+
+        weights = np.exp((nearest[:, None] - partial) / self.temperature)
+        probs = (weights / weights.sum(axis=1, keepdims=True)) @ self.cluster_to_label
+
+        top_k = min(top_k, len(self.labels))
+        label_ids = np.argsort(-probs, axis=1)[:, :top_k]
+        label_probs = np.take_along_axis(probs, label_ids, axis=1)
+        return cluster_ids, distances, label_ids, label_probs, probs
+
+    def predict_many(self, rows, top_k=DEFAULT_TOP_K):
+        return self.label(self.score(rows, top_k))
+
+    def label(self, scored):
+        """Maps score() output to persona result dicts."""
+        cluster_ids, distances, label_ids, label_probs, probs = scored
+        results = []
+        for i, cluster_id in enumerate(cluster_ids.tolist()):
+            persona = self.cluster_labels[cluster_id]
+            results.append({
+                "persona": persona,
+                "cluster_id": cluster_id,
+                "confidence": round(float(probs[i, self.cluster_label_ids[cluster_id]]), 4),
+                "distance": round(float(distances[i]), 4),
+                "top_k": [
+                    {"persona": self.labels[label_id], "confidence": round(prob, 4)}
+                    for label_id, prob in zip(label_ids[i].tolist(), label_probs[i].tolist())
+                ]
+            })
+        return results
+
+    def predict(self, needs, wants, savings, top_k=DEFAULT_TOP_K):
+        return self.predict_many([[needs, wants, savings]], top_k)[0]
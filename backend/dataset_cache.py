@@ -0,0 +1,213 @@
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+# Bump when the on-disk layout changes so old conversions are rebuilt
+CACHE_VERSION = 1
+CATEGORICAL_COLUMNS = ("AgeGroup", "State", "PersonaLabel")
+CONVERT_CHUNK_ROWS = int(os.getenv("DATASET_CONVERT_CHUNK_ROWS", "1000000"))
+
+
+def _smallest_int(lo, hi):
+    """Narrowest signed integer dtype holding [lo, hi]."""
+    for dtype in (np.int8, np.int16, np.int32, np.int64):
+        info = np.iinfo(dtype)
+        if info.min <= lo and hi <= info.max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+class DatasetCache:
+    """
+    Columnar cache for the training CSVs: each CSV is parsed once into one .npy file per
+    column (categoricals as integer codes + a category list) and later loads memory-map
+    only the columns asked for, whole or in batches.
+    Layout under root: <name>.json (source size/mtime/sha256, dtypes, categories) pointing
+    at <name>.<sha>/<column>.npy. The JSON is replaced atomically after the column files
+    are written, so concurrent workers never read a half-built conversion.
+    """
+
+    def __init__(self, root=None):
+        self.root = root or os.getenv("DATASET_CACHE_DIR", os.path.join(os.getenv("MODEL_DIR", "models"), "datasets"))
+
+    def _meta_path(self, source):
+        return os.path.join(self.root, f"{os.path.basename(source)}.json")
+
+    def _read_meta(self, source):
+        try:
+            with open(self._meta_path(source)) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return meta if meta.get("version") == CACHE_VERSION else None
+
+    @staticmethod
+    def _stat(source):
+        st = os.stat(source)
+        return st.st_size, st.st_mtime_ns
+
+    @staticmethod
+    def _hash_file(source):
+        digest = hashlib.sha256()
+        with open(source, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def content_hash(self, source):
+        """sha256 of the source, re-read only when its size or mtime changed since the last conversion."""
+        meta = self._read_meta(source)
+        size, mtime_ns = self._stat(source)
+        if meta and meta["size"] == size and meta["mtime_ns"] == mtime_ns:
+            return meta["sha256"]
+        return self._hash_file(source)
+
+    def ensure(self, source):
+        """Returns the metadata of an up-to-date conversion of `source`, converting it if needed."""
+        if not os.path.exists(source):
+            raise FileNotFoundError(f"Dataset not found at {source}")
+
+        meta = self._read_meta(source)
+        size, mtime_ns = self._stat(source)
+        if meta and meta["size"] == size and meta["mtime_ns"] == mtime_ns and os.path.isdir(meta["dir"]):
+            return meta
+
+        sha = self._hash_file(source)
+        if meta and meta["sha256"] == sha and os.path.isdir(meta["dir"]):
+            # Touched but unchanged (e.g. a fresh checkout): keep the columns, refresh the stat
+            meta.update(size=size, mtime_ns=mtime_ns)
+            self._write_meta(source, meta)
+            return meta
+        return self._convert(source, sha, size, mtime_ns, previous=meta)
+
+    def _convert(self, source, sha, size, mtime_ns, previous=None):
+        """
+        Streams the CSV in CONVERT_CHUNK_ROWS chunks (memory stays O(chunk)): each chunk is saved
+        as per-column part files, then the parts are concatenated into the final typed columns.
+        Category codes are assigned in first-seen order while streaming and remapped to sorted order.
+        """
+        print(f"🗜️ Converting {source} to columnar cache...")
+        os.makedirs(self.root, exist_ok=True)
+        directory = os.path.join(self.root, f"{os.path.basename(source)}.{sha[:16]}")
+        tmp_dir = f"{directory}.{os.getpid()}.tmp"
+        parts_dir = os.path.join(tmp_dir, "parts")
+        os.makedirs(parts_dir, exist_ok=True)
+
+        sample = pd.read_csv(source, nrows=1000)
+        categorical = [name for name in sample.columns
+                       if name in CATEGORICAL_COLUMNS or not pd.api.types.is_numeric_dtype(sample[name])]
+        categories = {name: {} for name in categorical}  # value -> first-seen code
+        parts = {name: [] for name in sample.columns}
+        rows = 0
+        reader = pd.read_csv(source, chunksize=CONVERT_CHUNK_ROWS, dtype={name: str for name in categorical})
+        for i, chunk in enumerate(reader):
+            rows += len(chunk)
+            for name in sample.columns:
+                column = chunk[name]
+                if name in categories:
+                    mapping = categories[name]
+                    for value in column.dropna().unique():
+                        mapping.setdefault(value, len(mapping))
+                    values = column.map(mapping).fillna(-1).to_numpy(dtype=np.int32)
+                else:
+                    values = column.to_numpy()
+                path = os.path.join(parts_dir, f"{name}.{i}.npy")
+                np.save(path, values)
+                parts[name].append(path)
+
+        columns = {}
+        for name, paths in parts.items():
+            arrays = [np.load(path, mmap_mode="r") for path in paths]
+            remap = None
+            if name in categories:
+                values = list(categories[name])
+                order = sorted(range(len(values)), key=values.__getitem__)
+                # Index -1 (missing) stays -1
+                remap = np.full(len(values) + 1, -1, dtype=np.int64)
+                remap[order] = np.arange(len(values))
+                dtype = _smallest_int(-1, len(values))
+                columns[name] = {"kind": "category", "categories": [values[j] for j in order]}
+            else:
+                dtype = np.result_type(*(a.dtype for a in arrays)) if arrays else np.dtype(np.float64)
+                if dtype.kind in "iu" and rows:
+                    dtype = _smallest_int(min(a.min() for a in arrays), max(a.max() for a in arrays))
+                columns[name] = {"kind": "numeric"}
+            columns[name]["dtype"] = np.dtype(dtype).str
+
+            out = np.lib.format.open_memmap(os.path.join(tmp_dir, f"{name}.npy"), mode="w+",
+                                            dtype=dtype, shape=(rows,))
+            offset = 0
+            for array in arrays:
+                out[offset:offset + len(array)] = remap[array] if remap is not None else array
+                offset += len(array)
+            out.flush()
+            del out, arrays
+        shutil.rmtree(parts_dir)
+
+        if os.path.isdir(directory):
+            shutil.rmtree(tmp_dir)  # another worker finished the same conversion first
+        else:
+            os.replace(tmp_dir, directory)
+
+        meta = {
+            "version": CACHE_VERSION,
+            "source": source,
+            "size": size,
+            "mtime_ns": mtime_ns,
+            "sha256": sha,
+            "rows": rows,
+            "dir": directory,
+            "columns": columns
+        }
+        self._write_meta(source, meta)
+        if previous and previous["dir"] != directory:
+            shutil.rmtree(previous["dir"], ignore_errors=True)
+        return meta
+
+    def _write_meta(self, source, meta):
+        path = self._meta_path(source)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, path)
+
+    def column(self, meta, name):
+        """Memory-mapped raw column (codes for categoricals)."""
+        return np.load(os.path.join(meta["dir"], f"{name}.npy"), mmap_mode="r")
+
+    def _frame(self, meta, names, start=0, stop=None):
+        data = {}
+        for name in names:
+            values = np.asarray(self.column(meta, name)[start:stop])
+            info = meta["columns"][name]
+            if info["kind"] == "category":
+                data[name] = pd.Categorical.from_codes(values, info["categories"])
+            else:
+                data[name] = values
+        return pd.DataFrame(data, columns=names)
+
+    def _resolve(self, source, columns):
+        meta = self.ensure(source)
+        names = columns or list(meta["columns"])
+        missing = [name for name in names if name not in meta["columns"]]
+        if missing:
+            raise KeyError(f"{source} has no column(s) {missing}")
+        return meta, names
+
+    def rows(self, source):
+        return self.ensure(source)["rows"]
+
+    def load(self, source, columns=None):
+        """DataFrame of the requested columns (all by default), categoricals as pandas Categoricals."""
+        meta, names = self._resolve(source, columns)
+        return self._frame(meta, names)
+
+    def iter_batches(self, source, columns=None, batch_size=100000):
+        """Yields consecutive DataFrames of at most batch_size rows, read from the memory-mapped columns."""
+        meta, names = self._resolve(source, columns)
+        for start in range(0, meta["rows"], batch_size):
+            yield self._frame(meta, names, start, start + batch_size)
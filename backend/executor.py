@@ -0,0 +1,179 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from starlette.concurrency import run_in_threadpool
+
+import metrics
+
+
+class PoolSaturated(Exception):
+    """Raised when an endpoint class already has `queue_limit` jobs in flight."""
+
+
+# --- Worker-side tasks (run inside pool processes; must be importable top-level functions) ---
+
+def _init_ml_worker():
+    from ml_engine import ml_engine
+    ml_engine.load_or_train_persona_model()
+    ml_engine.load_or_train_prescription_model()
+
+
+def _ping():
+    return os.getpid()
+
+
+def _run_with_samples(fn, *args):
+    """Runs a task in a worker and ships its stage timings (and run time) back with the result."""
+    with metrics.forward_stages() as samples:
+        start = time.perf_counter()
+        result = fn(*args)
+    return result, samples, time.perf_counter() - start
+
+
+def predict_prescription_task(age, income, horizon_years, risk_tolerance):
+    from ml_engine import ml_engine
+    return ml_engine.predict_prescription_uncached(age, income, horizon_years, risk_tolerance)
+
+
+def predict_prescription_many_task(rows):
+    from ml_engine import ml_engine
+    return ml_engine.predict_prescription_many(rows)
+
+
+def optimize_portfolio_task(total_investment, risk_profile, tax_slab_pct):
+    from optimizer import optimizer
+    return optimizer.optimize_portfolio(total_investment, risk_profile, tax_slab_pct)
+
+
+def frontier_curve_task(risk_profile, tax_slab_pct, max_amount):
+    from optimizer import optimizer
+    return optimizer.frontier_curve(risk_profile, tax_slab_pct, max_amount)
+
+
+class WorkPool:
+    """
+    One endpoint class (e.g. "ml", "solver", "llm") with its own workers and queue limit.
+    mode="process": warm ProcessPoolExecutor (CPU-bound, sidesteps the GIL)
+    mode="thread":  Starlette's threadpool (pool size 0, handy for local dev)
+    mode="async":   coroutines on the event loop, only the in-flight limit applies (I/O-bound)
+    """
+
+    def __init__(self, name, mode, size=0, queue_limit=64, initializer=None):
+        self.name = name
+        self.mode = mode if (mode != "process" or size > 0) else "thread"
+        self.size = size
+        self.queue_limit = queue_limit
+        self.initializer = initializer
+        self.executor = None
+        self.in_flight = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def start(self):
+        if self.mode == "process" and self.executor is None:
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.size,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=self.initializer
+            )
+
+    def warm(self):
+        """Forces every worker to spawn and run its initializer (model load) before traffic arrives."""
+        if self.executor is not None:
+            return sorted({f.result() for f in [self.executor.submit(_ping) for _ in range(self.size * 2)]})
+        return []
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+    def _acquire(self):
+        with self._lock:
+            if self.in_flight >= self.queue_limit:
+                self.rejected += 1
+                raise PoolSaturated(f"{self.name} pool is at capacity ({self.queue_limit} in flight)")
+            self.in_flight += 1
+
+    def _release(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def _unwrap(self, start, outcome):
+        """Merges worker stage samples; whatever the worker did not spend running is queue + IPC."""
+        result, samples, run_seconds = outcome
+        metrics.merge_stage_samples(samples)
+        metrics.record_stages(f"pool:{self.name}", (("queue_wait", time.perf_counter() - start - run_seconds),))
+        return result
+
+    async def run(self, fn, *args):
+        """Runs fn(*args) on this pool from async code. For mode="async", fn must return an awaitable."""
+        self._acquire()
+        try:
+            if self.mode == "async":
+                return await fn(*args)
+            if self.executor is not None:
+                start = time.perf_counter()
+                outcome = await asyncio.get_running_loop().run_in_executor(self.executor, _run_with_samples, fn, *args)
+                return self._unwrap(start, outcome)
+            return await run_in_threadpool(fn, *args)
+        finally:
+            self._release()
+
+    def call(self, fn, *args):
+        """Blocking variant for sync code that already runs off the event loop (e.g. streaming generators)."""
+        self._acquire()
+        try:
+            if self.executor is not None:
+                start = time.perf_counter()
+                return self._unwrap(start, self.executor.submit(_run_with_samples, fn, *args).result())
+            return fn(*args)
+        finally:
+            self._release()
+
+    def stats(self):
+        return {
+            "mode": self.mode,
+            "size": self.size,
+            "queue_limit": self.queue_limit,
+            "in_flight": self.in_flight,
+            "rejected": self.rejected
+        }
+
+
+def _env_int(name, default):
+    return int(os.getenv(name, str(default)))
+
+
+# Per endpoint-class sizing. *_POOL_SIZE=0 keeps that class in-process (threadpool).
+pools = {
+    "ml": WorkPool("ml", "process",
+                   size=_env_int("ML_POOL_SIZE", min(2, os.cpu_count() or 1)),
+                   queue_limit=_env_int("ML_QUEUE_LIMIT", 64),
+                   initializer=_init_ml_worker),
+    # LP work off the event loop: PuLP solves (OPTIMIZER_SOLVER=pulp) and frontier builds.
+    # Size 0 (the analytic default) runs them on Starlette's threadpool
+    "solver": WorkPool("solver", "process",
+                       size=_env_int("SOLVER_POOL_SIZE", 1 if os.getenv("OPTIMIZER_SOLVER") == "pulp" else 0),
+                       queue_limit=_env_int("SOLVER_QUEUE_LIMIT", 32)),
+    "llm": WorkPool("llm", "async",
+                    queue_limit=_env_int("LLM_QUEUE_LIMIT", 16)),
+}
+
+
+def start_pools():
+    for pool in pools.values():
+        pool.start()
+    for name, pool in pools.items():
+        workers = pool.warm()
+        if workers:
+            print(f"🏭 {name} pool warm ({len(workers)} workers)")
+
+
+def shutdown_pools():
+    for pool in pools.values():
+        pool.shutdown()
@@ -1,6 +1,9 @@
-import csv
+import argparse
 import random
 import os
+import time
+
+import numpy as np
 
 # CONFIGURATION
 COUNT = 2000
@@ -88,11 +91,170 @@ def generate_profile():
 
     return [age, state, income, needs, wants, savings, debt_load, true_persona]
 
+# --- Vectorized generator (same rules as generate_profile, whole arrays at once) ---
+
+COLUMNS = ["AgeGroup", "State", "Income", "NeedsPct", "WantsPct", "SavingsPct", "DebtLoad", "PersonaLabel"]
+PERSONAS = list(PERSONA_PROFILES)
+AGE_GROUPS = ["18-22", "22-28", "29-39", "40-60", "60+"]
+DEFAULT_CHUNK_SIZE = 1_000_000
+
+# (n_personas, 2) inclusive ranges per persona, indexed by persona code
+_RANGES = {key: np.array([PERSONA_PROFILES[p][key] for p in PERSONAS]) for key in ("s", "w", "n")}
+
+
+def _codes(names):
+    return np.array([PERSONAS.index(name) for name in names])
+
+
+def generate_profiles(count, rng):
+    """
+    Vectorized generate_profile(): returns a dict of COLUMNS -> arrays (categoricals as pandas Categoricals).
+    Same distributions as the scalar version, not the same draws.
+    """
+    import pandas as pd
+
+    persona = rng.integers(0, len(PERSONAS), count)
+
+    def draw(key):
+        lo, hi = _RANGES[key][persona].T
+        return rng.integers(lo, hi + 1)
+
+    savings, wants, needs_draw = draw("s"), draw("w"), draw("n")
+    # generate_profile re-draws savings for these groups; a fresh independent draw is equivalent
+    savings_redraw = draw("s")
+    needs = 100 - savings - wants
+
+    group = np.isin(persona, _codes(["abdul", "bagha"]))
+    needs[group], savings[group] = needs_draw[group], savings_redraw[group]
+    wants[group] = 100 - needs[group] - savings[group]
+
+    group = np.isin(persona, _codes(["popatlal", "bhide"]))
+    savings[group], needs[group] = savings_redraw[group], needs_draw[group]
+    wants[group] = 100 - savings[group] - needs[group]
+
+    group = np.isin(persona, _codes(["babita", "tapu"]))
+    needs[group] = needs_draw[group]
+    savings[group] = 100 - wants[group] - needs[group]
+
+    # Sanity checks
+    negative = (persona != PERSONAS.index("jethalal")) & (savings < 0)
+    wants[negative] += savings[negative]
+    savings[negative] = 0
+    np.maximum(wants, 0, out=wants)
+    np.maximum(needs, 0, out=needs)
+
+    diff = 100 - (needs + wants + savings)
+    to_wants = rng.random(count) > 0.5
+    wants += np.where(to_wants, diff, 0)
+    needs += np.where(to_wants, 0, diff)
+
+    age = rng.integers(0, len(AGE_GROUPS), count)
+    age[persona == PERSONAS.index("tapu")] = AGE_GROUPS.index("18-22")
+    age[persona == PERSONAS.index("champaklal")] = AGE_GROUPS.index("60+")
+
+    state = rng.integers(0, len(STATES), count)
+
+    income = rng.integers(20000, 300001, count)
+    abdul, jethalal = persona == PERSONAS.index("abdul"), persona == PERSONAS.index("jethalal")
+    income[abdul] = rng.integers(15000, 40001, abdul.sum())
+    income[jethalal] = rng.integers(100000, 500001, jethalal.sum())
+
+    debt_load = np.where(savings < 10, rng.integers(10, 81, count), 0)
+    debt_load[jethalal] = rng.integers(20, 91, jethalal.sum())
+
+    return {
+        "AgeGroup": pd.Categorical.from_codes(age, AGE_GROUPS),
+        "State": pd.Categorical.from_codes(state, STATES),
+        "Income": income,
+        "NeedsPct": needs,
+        "WantsPct": wants,
+        "SavingsPct": savings,
+        "DebtLoad": debt_load,
+        "PersonaLabel": pd.Categorical.from_codes(persona, PERSONAS),
+    }
+
+
+def write_dataset(path, count, seed=None, chunk_size=DEFAULT_CHUNK_SIZE, fmt="csv"):
+    """
+    Streams `count` rows to CSV or Parquet in chunks of `chunk_size` (memory stays O(chunk_size)).
+    Each chunk has its own child generator of `seed`, so a (seed, chunk_size) pair always gives the same file.
+    """
+    import pandas as pd
+
+    if count < 0 or chunk_size <= 0:
+        raise ValueError("count must be >= 0 and chunk_size > 0")
+    # At least one chunk, so count=0 still writes the header (an empty table)
+    chunk_seeds = np.random.SeedSequence(seed).spawn(max(1, (count + chunk_size - 1) // chunk_size))
+    writer = None
+    try:
+        for i, chunk_seed in enumerate(chunk_seeds):
+            n = min(chunk_size, count - i * chunk_size)
+            df = pd.DataFrame(generate_profiles(n, np.random.default_rng(chunk_seed)), columns=COLUMNS)
+            if fmt == "parquet":
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+
+                table = pa.Table.from_pandas(df, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(path, table.schema)
+                writer.write_table(table)
+            else:
+                df.to_csv(path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def verify(samples=20000, seed=0, alpha=0.001):
+    """
+    Two-sample tests of generate_profiles against generate_profile: KS for numeric
+    columns, chi-square on the contingency table for categoricals. Passes if no p-value < alpha.
+    """
+    from scipy.stats import chi2_contingency, ks_2samp
+
+    random.seed(seed)
+    legacy = list(zip(*(generate_profile() for _ in range(samples))))
+    legacy = dict(zip(COLUMNS, (np.asarray(column) for column in legacy)))
+    fast = generate_profiles(samples, np.random.default_rng(seed))
+
+    report = {}
+    for column in COLUMNS:
+        if column in ("AgeGroup", "State", "PersonaLabel"):
+            categories = sorted(set(legacy[column]) | set(np.asarray(fast[column])))
+            table = [[int((np.asarray(values) == c).sum()) for c in categories]
+                     for values in (legacy[column], fast[column])]
+            report[column] = {"test": "chi2", "p_value": float(chi2_contingency(table)[1])}
+        else:
+            result = ks_2samp(legacy[column].astype(float), np.asarray(fast[column], dtype=float))
+            report[column] = {"test": "ks", "statistic": float(result.statistic), "p_value": float(result.pvalue)}
+    report["passed"] = all(r["p_value"] >= alpha for r in report.values())
+    return report
+
+
 if __name__ == "__main__":
-    print(f"🚀 Generating {COUNT} personas...")
-    with open(OUTPUT_FILE, 'w', newline='') as f:
-        writer = csv.writer(f)
-        writer.writerow(["AgeGroup", "State", "Income", "NeedsPct", "WantsPct", "SavingsPct", "DebtLoad", "PersonaLabel"])
-        for _ in range(COUNT):
-            writer.writerow(generate_profile())
-    print(f"✅ Generated {COUNT} rows in {OUTPUT_FILE}")
+    parser = argparse.ArgumentParser(description="Synthetic persona dataset generator.")
+    parser.add_argument("--count", type=int, default=COUNT)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--output", default=OUTPUT_FILE)
+    parser.add_argument("--format", choices=["csv", "parquet"], default=None,
+                        help="defaults to the --output extension")
+    parser.add_argument("--verify", action="store_true",
+                        help="check the vectorized distributions against generate_profile and exit")
+    args = parser.parse_args()
+    if args.count < 0:
+        parser.error("--count must be >= 0")
+    if args.chunk_size <= 0:
+        parser.error("--chunk-size must be > 0")
+
+    if args.verify:
+        report = verify()
+        for column, result in report.items():
+            print(f"  {column:<14} {result}")
+        raise SystemExit(0 if report["passed"] else 1)
+
+    fmt = args.format or ("parquet" if args.output.endswith(".parquet") else "csv")
+    print(f"🚀 Generating {args.count} personas...")
+    start = time.perf_counter()
+    write_dataset(args.output, args.count, args.seed, args.chunk_size, fmt)
+    print(f"✅ Generated {args.count} rows in {args.output} ({time.perf_counter() - start:.1f}s)")
@@ -1,10 +1,14 @@
 import google.generativeai as genai
 import os
+import time
 from dotenv import load_dotenv
+from metrics import LLM_ERRORS, LLM_TOKENS, record_stages
 
 # Load Env
 load_dotenv()
 
+OFF_DUTY = "Inspector is on leave (No API Key)."
+
 class InspectorGadget:
     def __init__(self):
         self.api_key = os.getenv("GEMINI_API_KEY")
@@ -13,8 +17,8 @@ class InspectorGadget:
             self.model = None
         else:
             genai.configure(api_key=self.api_key)
+            # Stateless calls: every prompt carries its own context, so users never share a chat history
             self.model = genai.GenerativeModel('gemini-pro')
-            self.chat = self.model.start_chat(history=[])
             print("🕵️ Inspector Gadget (Gemini) is Online.")
 
     def analyze_case(self, user_context, question):
@@ -23,8 +27,51 @@ class InspectorGadget:
         question: specific user query
         """
         if not self.model:
-            return "Inspector is on leave (No API Key)."
+            return OFF_DUTY
+
+        start = time.perf_counter()
+        try:
+            response = self.model.generate_content(self._build_prompt(user_context, question))
+        except Exception as e:
+            response = e
+        return self._answer(start, response)
+
+    async def analyze_case_async(self, user_context, question):
+        """Same as analyze_case, but awaits Gemini without holding a worker thread."""
+        if not self.model:
+            return OFF_DUTY
+
+        start = time.perf_counter()
+        try:
+            response = await self.model.generate_content_async(self._build_prompt(user_context, question))
+        except Exception as e:
+            response = e
+        return self._answer(start, response)
 
+    def _answer(self, start, response):
+        """Shared by both paths: the reply for a Gemini response (or the exception raised instead), recorded for /metrics."""
+        try:
+            if isinstance(response, Exception):
+                raise response
+            answer = response.text
+        except Exception as e:
+            self._record_call(start, None)
+            return f"Error connecting to HQ: {str(e)}"
+        self._record_call(start, response)
+        return answer
+
+    def _record_call(self, start, response):
+        """Gemini latency and token usage for /metrics (response=None for a failed call)."""
+        record_stages("gemini", (("generate", time.perf_counter() - start),))
+        if response is None:
+            LLM_ERRORS.inc()
+            return
+        usage = getattr(response, "usage_metadata", None)
+        if usage is not None:
+            LLM_TOKENS.inc(("prompt",), usage.prompt_token_count)
+            LLM_TOKENS.inc(("completion",), usage.candidates_token_count)
+
+    def _build_prompt(self, user_context, question):
         # System Prompt Engineering
         system_persona = """
         You are Inspector Chalu Pandey (from Gokuldham Society context), a strict but helpful Financial Inspector.
@@ -39,13 +86,7 @@ class InspectorGadget:
         Data Context:
         """
         
-        prompt = f"{system_persona}\nUser Data: {user_context}\n\nUser Question: {question}"
-        
-        try:
-            response = self.chat.send_message(prompt)
-            return response.text
-        except Exception as e:
-            return f"Error connecting to HQ: {str(e)}"
+        return f"{system_persona}\nUser Data: {user_context}\n\nUser Question: {question}"
 
 # Singleton
 inspector = InspectorGadget()
@@ -0,0 +1,244 @@
+import json
+import os
+
+import numpy as np
+
+from cache import LRUCache
+
+# Snapshot written by build_macro_data.py at the repo root (see macro_workbook.export_indicators)
+MACRO_INDICATORS_PATH = os.getenv("MACRO_INDICATORS_PATH", "macro_indicators.json")
+SNAPSHOT_VERSION = 1
+# Series i owns the key range [i * KEY_STRIDE, (i + 1) * KEY_STRIDE); day numbers are biased to be >= 0
+KEY_STRIDE = 1 << 32
+DAY_BIAS = 1 << 31
+RESAMPLE_HOW = ("last", "first", "mean", "min", "max")
+# Browsers/CDNs may reuse a /macro response this long; the snapshot only changes on redeploy
+MACRO_MAX_AGE = int(os.getenv("MACRO_MAX_AGE", "3600"))
+
+
+def _period_codes(dates, freq):
+    """Month, quarter or year number of each date; equal codes fall in the same period."""
+    if freq == "M":
+        return dates.astype("datetime64[M]").astype(np.int64)
+    if freq == "Q":
+        return dates.astype("datetime64[M]").astype(np.int64) // 3
+    if freq == "Y":
+        return dates.astype("datetime64[Y]").astype(np.int64)
+    raise ValueError("freq must be one of M, Q, Y")
+
+
+def _period_starts(codes, freq):
+    if freq == "Q":
+        return (codes * 3).astype("datetime64[M]").astype("datetime64[D]")
+    return codes.astype(f"datetime64[{freq}]").astype("datetime64[D]")
+
+
+def one_year_before(dates):
+    """Same day one year earlier (Feb 29 -> Mar 1)."""
+    dates = np.asarray(dates, dtype="datetime64[D]")
+    months = dates.astype("datetime64[M]")
+    return (months - 12).astype("datetime64[D]") + (dates - months.astype("datetime64[D]"))
+
+
+class IndicatorStore:
+    """
+    Every macro indicator as one date-sorted run inside two contiguous arrays (dates, values),
+    CSR-style: series i is [offsets[i], offsets[i + 1]). A parallel int64 key
+        key = i * KEY_STRIDE + day
+    is globally sorted, so one np.searchsorted answers an as-of lookup for any set of
+    indicators at once. Query methods return columnar tables ({name: array}) with one row
+    per requested indicator; missing observations are NaN/NaT.
+    """
+
+    def __init__(self, ids, names, sheets, units, dates, values, offsets, sha256=None):
+        self.ids = np.asarray(ids, dtype=object)
+        self.names = np.asarray(names, dtype=object)
+        self.sheets = np.asarray(sheets, dtype=object)
+        self.units = np.asarray(units, dtype=object)
+        self.dates = np.asarray(dates, dtype="datetime64[D]")
+        self.values = np.asarray(values, dtype=np.float64)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.sha256 = sha256
+        # Serialized endpoint responses; the data is immutable, so entries never expire
+        self.responses = LRUCache("macro", maxsize=int(os.getenv("MACRO_CACHE_SIZE", "512")), ttl=0)
+        self.max_age = MACRO_MAX_AGE
+        self.index = {indicator: i for i, indicator in enumerate(ids)}
+        lengths = np.diff(self.offsets)
+        self._keys = np.repeat(np.arange(len(ids), dtype=np.int64) * KEY_STRIDE, lengths) \
+            + self.dates.astype(np.int64) + DAY_BIAS
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def version(self):
+        return (self.sha256 or "")[:16]
+
+    @classmethod
+    def from_series(cls, records, sha256=None):
+        """records: dicts with id, name, sheet, unit, dates, values (any order, gaps as NaN)."""
+        ids, names, sheets, units, dates, values, offsets = [], [], [], [], [], [], [0]
+        for record in records:
+            d = np.asarray(record["dates"], dtype="datetime64[D]")
+            v = np.asarray(record["values"], dtype=np.float64)
+            keep = ~np.isnat(d) & ~np.isnan(v)
+            d, v = d[keep], v[keep]
+            order = np.argsort(d, kind="stable")
+            ids.append(record["id"])
+            names.append(record["name"])
+            sheets.append(record.get("sheet"))
+            units.append(record.get("unit"))
+            dates.append(d[order])
+            values.append(v[order])
+            offsets.append(offsets[-1] + len(d))
+        if len(set(ids)) != len(ids):
+            raise ValueError("indicator ids must be unique")
+        if not offsets[-1]:
+            raise ValueError("no observations")
+        return cls(ids, names, sheets, units, np.concatenate(dates), np.concatenate(values), offsets, sha256)
+
+    @classmethod
+    def load(cls, path=MACRO_INDICATORS_PATH):
+        with open(path) as f:
+            snapshot = json.load(f)
+        if snapshot.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"{path}: unsupported snapshot version {snapshot.get('version')}")
+        records = [dict(record, values=[np.nan if v is None else v for v in record["values"]])
+                   for record in snapshot["indicators"]]
+        store = cls.from_series(records, snapshot.get("sha256"))
+        print(f"📈 Macro store: {len(store)} indicators, {len(store.values):,} observations")
+        return store
+
+    # --- Lookups ---
+
+    def rows(self, ids=None):
+        """Row numbers of the requested indicator ids (all indicators by default)."""
+        if ids is None:
+            return np.arange(len(self.ids))
+        missing = [indicator for indicator in ids if indicator not in self.index]
+        if missing:
+            raise KeyError(f"Unknown indicator(s): {', '.join(missing)}")
+        return np.array([self.index[indicator] for indicator in ids], dtype=np.int64)
+
+    def _positions(self, rows, dates):
+        """Position of each row's last observation on or before its date, and whether one exists."""
+        days = np.asarray(dates, dtype="datetime64[D]").astype(np.int64)
+        keys = rows * KEY_STRIDE + np.clip(days + DAY_BIAS, 0, KEY_STRIDE - 1)
+        positions = np.searchsorted(self._keys, keys, side="right") - 1
+        return positions, positions >= self.offsets[rows]
+
+    def _table(self, rows, positions, found):
+        safe = np.where(found, positions, 0)
+        return {
+            "id": self.ids[rows],
+            "date": np.where(found, self.dates[safe], np.datetime64("NaT")),
+            "value": np.where(found, self.values[safe], np.nan)
+        }
+
+    def latest(self, ids=None):
+        """Most recent observation per indicator."""
+        rows = self.rows(ids)
+        positions = self.offsets[rows + 1] - 1
+        return self._table(rows, positions, positions >= self.offsets[rows])
+
+    def as_of(self, date, ids=None):
+        """Last observation on or before `date` per indicator (what was known on that day)."""
+        rows = self.rows(ids)
+        return self._table(rows, *self._positions(rows, np.full(len(rows), np.datetime64(date, "D"))))
+
+    def yoy(self, date=None, ids=None):
+        """
+        Year-on-year change (%) of each indicator's observation as of `date` (latest by default)
+        against its own observation as of one year before that observation's date.
+        """
+        current = self.latest(ids) if date is None else self.as_of(date, ids)
+        rows = self.rows(ids)
+        positions, found = self._positions(rows, one_year_before(current["date"]))
+        found &= ~np.isnat(current["date"])
+        prior = self._table(rows, positions, found)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # Relative to |prior| so a shrinking deficit (negative series) reads as an increase
+            change = (current["value"] - prior["value"]) / np.abs(prior["value"]) * 100
+        change[~np.isfinite(change)] = np.nan
+        return dict(current, prior_date=prior["date"], prior_value=prior["value"], yoy_pct=change)
+
+    def range(self, indicator, start=None, end=None):
+        """(dates, values) views of one indicator between start and end (inclusive)."""
+        row = self.rows([indicator])[0]
+        lo, hi = self.offsets[row], self.offsets[row + 1]
+        dates = self.dates[lo:hi]
+        i = 0 if start is None else np.searchsorted(dates, np.datetime64(start, "D"), side="left")
+        j = len(dates) if end is None else np.searchsorted(dates, np.datetime64(end, "D"), side="right")
+        return dates[i:j], self.values[lo + i:lo + j]
+
+    def resample(self, freq="M", how="last", ids=None):
+        """
+        Each indicator aggregated per calendar month/quarter/year ("M"/"Q"/"Y") in one pass:
+        periods are runs of equal (series, period) keys, reduced with np.*.reduceat.
+        Returns {id: (period start dates, values)}.
+        """
+        if how not in RESAMPLE_HOW:
+            raise ValueError(f"how must be one of {', '.join(RESAMPLE_HOW)}")
+        rows = self.rows(ids)
+        lengths = np.diff(self.offsets)[rows]
+        # Positions of the selected series' observations, still grouped by series and date-sorted
+        series = np.repeat(np.arange(len(rows)), lengths)
+        take = np.arange(lengths.sum()) + np.repeat(self.offsets[rows] - (np.cumsum(lengths) - lengths), lengths)
+        codes = _period_codes(self.dates[take], freq)
+        values = self.values[take]
+
+        boundary = np.ones(len(take), dtype=bool)
+        boundary[1:] = (series[1:] != series[:-1]) | (codes[1:] != codes[:-1])
+        starts = np.flatnonzero(boundary)
+        ends = np.append(starts[1:], len(take))
+        if how == "last":
+            reduced = values[ends - 1]
+        elif how == "first":
+            reduced = values[starts]
+        elif how == "mean":
+            reduced = np.add.reduceat(values, starts) / (ends - starts)
+        else:
+            reduced = getattr(np, f"{how}imum").reduceat(values, starts)
+
+        periods = _period_starts(codes[starts], freq)
+        split = np.searchsorted(series[starts], np.arange(1, len(rows)))
+        return {
+            self.ids[r]: (p, v)
+            for r, p, v in zip(rows, np.split(periods, split), np.split(reduced, split))
+        }
+
+    def series(self, indicator, start=None, end=None, freq=None, how="last"):
+        """range(), optionally resampled first (period start dates between start and end)."""
+        if not freq:
+            return self.range(indicator, start, end)
+        dates, values = self.resample(freq, how, [indicator])[indicator]
+        i = 0 if start is None else np.searchsorted(dates, np.datetime64(start, "D"), side="left")
+        j = len(dates) if end is None else np.searchsorted(dates, np.datetime64(end, "D"), side="right")
+        return dates[i:j], values[i:j]
+
+    def catalog(self):
+        """One row per indicator: id, name, sheet, unit, first/last date and observation count."""
+        lo, hi = self.offsets[:-1], self.offsets[1:]
+        return {
+            "id": self.ids,
+            "name": self.names,
+            "sheet": self.sheets,
+            "unit": self.units,
+            "first_date": self._table(self.rows(), lo, hi > lo)["date"],
+            "last_date": self.latest()["date"],
+            "observations": hi - lo
+        }
+
+    @staticmethod
+    def to_json(table):
+        """Columnar table of numpy arrays -> JSON-safe lists (NaN/NaT become null, dates ISO strings)."""
+        out = {}
+        for name, column in table.items():
+            column = np.asarray(column)
+            if column.dtype.kind == "M":
+                out[name] = [None if np.isnat(d) else str(d) for d in column]
+            elif column.dtype.kind == "f":
+                out[name] = [None if v != v else v for v in column.tolist()]
+            else:
+                out[name] = column.tolist()
+        return out
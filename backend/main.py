@@ -1,9 +1,21 @@
-from fastapi import FastAPI, HTTPException
+import os
+import threading
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse, JSONResponse, PlainTextResponse
 from pydantic import BaseModel
 from fastapi.middleware.cors import CORSMiddleware
-from ml_engine import ml_engine
-from inspector import inspector
-from optimizer import optimizer
+from starlette.concurrency import run_in_threadpool
+from batch import spool_records, stream_predictions, PERSONA_FIELDS, PRESCRIPTION_FIELDS
+from executor import (
+    pools, start_pools, shutdown_pools, PoolSaturated,
+    predict_prescription_task, predict_prescription_many_task, optimize_portfolio_task, frontier_curve_task
+)
+from metrics import MetricsMiddleware, registry as metrics_registry
+from readiness import Readiness
+from registry import LazyRegistry, ServiceUnavailable
+
+# Heavy subsystems (pandas/sklearn, Gemini SDK, PuLP) are imported lazily through `services`
+# so importing this module stays cheap; see `python benchmark.py importtime`.
 
 app = FastAPI(title="Gokuldham Bank AI Backend")
 
@@ -21,6 +33,79 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Outermost: counts everything, including CORS rejections and 503s
+app.add_middleware(MetricsMiddleware)
+
+# WARMUP_ON_STARTUP=0 (serverless): skip the background warm-up, load each service on first hit
+WARMUP_ON_STARTUP = os.getenv("WARMUP_ON_STARTUP", "1") == "1"
+
+# Load state per service; the worker only reports ready once all are "ready". Without warm-up,
+# services nobody has requested yet are "lazy" and don't count against readiness.
+readiness = Readiness(lazy=not WARMUP_ON_STARTUP)
+services = LazyRegistry(readiness)
+# Opt-in: PERSONA_ONLINE=1 feeds /analyze/persona submissions into online clustering
+ONLINE_ENABLED = os.getenv("PERSONA_ONLINE", "0") == "1"
+
+# Synthetic requests run before reporting ready (fills caches, faults in model pages, wakes workers)
+WARMUP_PERSONAS = [(50, 30, 20), (85, 10, 5), (30, 20, 50)]
+WARMUP_PRESCRIPTIONS = [(25, 60000, 20, 3), (45, 150000, 10, 2), (65, 90000, 2, 1)]
+
+def load_persona_model():
+    engine = services.get("ml_engine")
+    # Load Models from artifacts (retrains only if the datasets changed)
+    engine.load_or_train_persona_model()
+    if ONLINE_ENABLED:
+        services.get("online_persona").start()
+    return engine
+
+def load_prescription_model():
+    engine = services.get("ml_engine")
+    if pools["ml"].mode == "process":
+        # Inference runs in the pool workers (each loads its own copy); here only the cache-key version is needed
+        engine.load_prescription_version()
+    else:
+        engine.load_or_train_prescription_model()
+    if not engine.prescription_fingerprint:
+        raise FileNotFoundError(f"Allocation dataset not found at {engine.allocations_path}")
+    return engine
+
+def load_worker_pools():
+    # Spawn CPU workers and let them load their own model copies
+    start_pools()
+    return pools
+
+def load_macro_store():
+    from macro_store import IndicatorStore, MACRO_INDICATORS_PATH
+    return IndicatorStore.load(MACRO_INDICATORS_PATH)
+
+def run_warmup_requests():
+    if readiness.state("persona_model") == "ready":
+        for needs, wants, savings in WARMUP_PERSONAS:
+            services.get("persona_model").predict_persona(needs, wants, savings)
+    if readiness.state("prescription_model") == "ready":
+        for args in WARMUP_PRESCRIPTIONS:
+            pools["ml"].call(predict_prescription_task, *args)
+    if services.get("optimizer").solver == "pulp":
+        pools["solver"].call(optimize_portfolio_task, 500000, 2, 0.3)
+    else:
+        services.get("optimizer").optimize_portfolio(500000, 2, 0.3)
+    return True
+
+services.register_module("ml_engine", "ml_engine", "ml_engine")
+services.register("persona_model", load_persona_model)
+services.register("prescription_model", load_prescription_model)
+services.register_module("inspector", "inspector", "inspector")
+services.register_module("optimizer", "optimizer", "optimizer")
+services.register_module("projection", "projection", "projection_engine")
+services.register("macro_store", load_macro_store)
+services.register("worker_pools", load_worker_pools)
+services.register("warmup", run_warmup_requests)
+if ONLINE_ENABLED:
+    services.register_module("online_persona", "online_persona", "online_persona")
+
+@app.exception_handler(ServiceUnavailable)
+async def service_unavailable_handler(request, exc):
+    return JSONResponse({"detail": str(exc)}, status_code=503)
 
 # --- DATA MODELS ---
 class PersonaInput(BaseModel):
@@ -44,56 +129,298 @@ class InspectorInput(BaseModel):
 class OptimizationInput(BaseModel):
     investment_amount: float
     risk_profile: int # 1, 2, 3
+    tax_slab_pct: float = 0.3
+
+class OptimizationBatchInput(BaseModel):
+    investment_amounts: list[float]
+    risk_profiles: list[int]
+    tax_slab_pcts: list[float] | float = 0.3
+
+class ProjectionInput(BaseModel):
+    investment_amount: float
+    risk_profile: int # 1, 2, 3
+    tax_slab_pct: float = 0.3
+    years: int = 30
+    paths: int = 10000
+    seed: int | None = None # same seed -> same bands
+
+class FrontierInput(BaseModel):
+    risk_profile: int # 1, 2, 3
+    tax_slab_pct: float = 0.3
+    max_amount: float = 5000000
 
 # --- ENDPOINTS ---
 
 @app.get("/")
 def health_check():
+    """Liveness: the process is up (models may still be loading, see /ready)."""
     return {"status": "online", "system": "Gokuldham AI Core"}
 
+@app.get("/ready")
+def readiness_check():
+    """
+    Readiness: 200 only after every service is loaded and warm-up predictions have run
+    (WARMUP_ON_STARTUP=0: once no service that has been requested is loading or failed).
+    Reports per-component state, load time and error for the load balancer / debugging.
+    """
+    snapshot = readiness.snapshot()
+    return JSONResponse(snapshot, status_code=200 if snapshot["ready"] else 503)
+
 @app.post("/analyze/persona")
 def analyze_persona(data: PersonaInput):
     """
     Predicts the user's Financial Persona using K-Means Clustering.
     """
+    ml_engine = services.get("persona_model")
     try:
         result = ml_engine.predict_persona(data.needs_pct, data.wants_pct, data.savings_pct)
+        if ONLINE_ENABLED:
+            # Only the spending split is kept; age/state/income never leave the request
+            services.get("online_persona").submit(data.needs_pct, data.wants_pct, data.savings_pct)
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/analyze/prescription")
-def get_prescription(data: PrescriptionInput):
+async def get_prescription(data: PrescriptionInput):
     """
     Predicts Asset Allocation using Random Forest.
+    Cache hits are answered in-process; misses run on the warm "ml" process pool.
     """
+    ml_engine = await services.aget("prescription_model")
+    await services.aget("worker_pools")
     try:
-        result = ml_engine.predict_prescription(data.age, data.income, data.horizon_years, data.risk_tolerance)
+        key = ml_engine.prescription_cache_key(data.age, data.income, data.horizon_years, data.risk_tolerance)
+        result = ml_engine.cache.get(key)
+        if result is None:
+            result = await pools["ml"].run(predict_prescription_task, *key[2:])
+            if "error" not in result:
+                ml_engine.cache.set(key, result)
         return result
+    except PoolSaturated as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/analyze/persona/batch")
+async def analyze_persona_batch(request: Request):
+    """
+    Batch persona scoring. Accepts a JSON array or an NDJSON upload of
+    {needs_pct, wants_pct, savings_pct} rows and streams NDJSON results back in order.
+    """
+    ml_engine = await services.aget("persona_model")
+    return StreamingResponse(
+        stream_predictions(await spool_records(request), PERSONA_FIELDS, ml_engine.predict_persona_many),
+        media_type="application/x-ndjson"
+    )
+
+@app.post("/analyze/prescription/batch")
+async def get_prescription_batch(request: Request):
+    """
+    Batch asset allocation. Accepts a JSON array or an NDJSON upload of
+    {age, income, horizon_years, risk_tolerance} rows and streams NDJSON results back in order.
+    """
+    await services.aget("prescription_model")
+    await services.aget("worker_pools")
+    return StreamingResponse(
+        stream_predictions(
+            await spool_records(request), PRESCRIPTION_FIELDS,
+            lambda rows: pools["ml"].call(predict_prescription_many_task, rows)
+        ),
+        media_type="application/x-ndjson"
+    )
+
 @app.post("/inspector/ask")
-def ask_inspector(data: InspectorInput):
+async def ask_inspector(data: InspectorInput):
     """
     Chat with Inspector Chalu Pandey (Gemini).
+    Awaited on the event loop so slow LLM calls never occupy CPU workers.
     """
-    return {"answer": inspector.analyze_case(data.context, data.question)}
+    inspector = await services.aget("inspector")
+    try:
+        answer = await pools["llm"].run(inspector.analyze_case_async, data.context, data.question)
+    except PoolSaturated as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return {"answer": answer}
 
 @app.post("/analyze/optimize")
-def optimize_portfolio(data: OptimizationInput):
+async def optimize_portfolio(data: OptimizationInput):
     """
     Solves Linear Programming problem for Max Post-Tax Returns.
+    The analytic solver answers in microseconds on the event loop once the (risk, slab) frontier exists;
+    building it goes to the threadpool. OPTIMIZER_SOLVER=pulp goes to the solver pool.
     """
+    optimizer = await services.aget("optimizer")
+    args = (data.investment_amount, data.risk_profile, data.tax_slab_pct)
     try:
-        result = optimizer.optimize_portfolio(data.investment_amount, data.risk_profile)
+        if optimizer.solver != "pulp":
+            if optimizer.has_frontier(data.risk_profile, data.tax_slab_pct):
+                return optimizer.optimize_portfolio(*args)
+            return await run_in_threadpool(optimizer.optimize_portfolio, *args)
+        await services.aget("worker_pools")
+        key = optimizer.cache_key(*args)
+        result = optimizer.results.get(key)
+        if result is None:
+            result = await pools["solver"].run(optimize_portfolio_task, *key[1:])
+            optimizer.results.set(key, result)
         return result
+    except PoolSaturated as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/analyze/optimize/batch")
+async def optimize_portfolio_batch(data: OptimizationBatchInput):
+    """
+    Re-optimizes a whole book in one vectorized pass: parallel arrays in, a columnar table out
+    ({"rows": n, "columns": {name: [...]}}). tax_slab_pcts may be one value for every row.
+    """
+    n = len(data.investment_amounts)
+    slabs = data.tax_slab_pcts
+    if len(data.risk_profiles) != n or (isinstance(slabs, list) and len(slabs) != n):
+        raise HTTPException(status_code=422, detail="investment_amounts, risk_profiles and tax_slab_pcts must have the same length")
+    optimizer = await services.aget("optimizer")
+    table = await run_in_threadpool(optimizer.optimize_many, data.investment_amounts, data.risk_profiles, slabs)
+    return {"rows": n, "columns": {name: column.tolist() for name, column in table.items()}}
+
+@app.post("/analyze/optimize/frontier")
+async def optimize_frontier(data: FrontierInput):
+    """
+    Optimal allocation for every amount up to max_amount, as the breakpoints of a piecewise-linear curve.
+    One call replaces a /analyze/optimize per slider position. Built on the "solver" pool like other LP work.
+    """
+    if data.max_amount <= 0:
+        raise HTTPException(status_code=422, detail="max_amount must be positive")
+    await services.aget("optimizer")
+    try:
+        return await pools["solver"].run(frontier_curve_task, data.risk_profile, data.tax_slab_pct, data.max_amount)
+    except PoolSaturated as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+@app.post("/analyze/projection")
+def project_portfolio(data: ProjectionInput):
+    """
+    Monte Carlo projection of the optimized allocation: percentile bands of post-tax value per year,
+    plus the withdrawable part given the 80C lock-ins.
+    """
+    optimizer = services.get("optimizer")
+    projection = services.get("projection")
+    result = optimizer.optimize_portfolio(data.investment_amount, data.risk_profile, data.tax_slab_pct)
+    if result["status"] != "Optimal":
+        raise HTTPException(status_code=422, detail=f"Optimizer status: {result['status']}")
+    try:
+        bands = projection.project(projection.allocation_from_result(result), optimizer.returns, data.tax_slab_pct,
+                                   years=data.years, paths=data.paths, seed=data.seed)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return {"allocation": result, "projection": bands}
+
+def macro_response(store, key, build):
+    """Serves a /macro query from the store's response cache, building it on a miss."""
+    body = store.responses.get(key)
+    if body is None:
+        try:
+            body = build()
+        except KeyError as e:
+            raise HTTPException(status_code=404, detail=e.args[0])
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        store.responses.set(key, body)
+    return JSONResponse(body, headers={"Cache-Control": f"public, max-age={store.max_age}", "ETag": f'"{store.version}"'})
+
+def parse_ids(ids):
+    return [i.strip() for i in ids.split(",") if i.strip()] if ids else None
+
+@app.get("/macro")
+async def macro_catalog():
+    """
+    Every macro indicator in the store: id, name, sheet, unit, first/last date, observation count.
+    """
+    store = await services.aget("macro_store")
+    return macro_response(store, ("catalog",), lambda: {
+        "version": store.version, "indicators": store.to_json(store.catalog())})
+
+@app.get("/macro/latest")
+async def macro_latest(ids: str | None = None, as_of: str | None = None):
+    """
+    Latest (or as-of date) value of each indicator with its year-on-year change, as a columnar
+    table. ids is a comma-separated list (all indicators by default). Replaces macro_data.js.
+    """
+    store = await services.aget("macro_store")
+    selected = parse_ids(ids)
+    return macro_response(store, ("latest", tuple(selected or ()), as_of), lambda: {
+        "version": store.version, "as_of": as_of, "indicators": store.to_json(store.yoy(as_of, selected))})
+
+@app.get("/macro/series/{indicator}")
+async def macro_series(indicator: str, start: str | None = None, end: str | None = None,
+                       freq: str | None = Query(None, pattern="^[MQY]$"), how: str = "last"):
+    """
+    One indicator's history between start and end, optionally resampled per month/quarter/year
+    (freq M/Q/Y, aggregated with how = last/first/mean/min/max).
+    """
+    store = await services.aget("macro_store")
+
+    def build():
+        dates, values = store.series(indicator, start, end, freq, how)
+        row = store.rows([indicator])[0]
+        return {"id": indicator, "name": store.names[row], "unit": store.units[row],
+                "freq": freq, **store.to_json({"dates": dates, "values": values})}
+
+    return macro_response(store, ("series", indicator, start, end, freq, how), build)
+
+@app.get("/admin/cache")
+def cache_stats():
+    """
+    Cache stats (hits, misses, evictions, memory) for sizing ML_CACHE_* and OPTIMIZER_CACHE_*.
+    """
+    ml_engine = services.get("ml_engine")
+    optimizer = services.get("optimizer")
+    return {
+        "ml": ml_engine.cache.stats(),
+        "model_versions": ml_engine.model_versions,
+        "optimizer": optimizer.results.stats(),
+        "frontier": optimizer.frontiers.stats(),
+        "macro": services.get("macro_store").responses.stats() if services.is_loaded("macro_store") else None
+    }
+
+@app.get("/metrics")
+def metrics_endpoint():
+    """
+    Prometheus scrape target: request counts/errors/latency per route, per-stage latency
+    (model scale/predict/label map, solver build/solve/extract, Gemini, pool queue wait) and LLM tokens.
+    """
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/admin/pools")
+def pool_stats():
+    """
+    Executor pool sizing and saturation (in-flight jobs, 503 rejections) per endpoint class.
+    """
+    return {name: pool.stats() for name, pool in pools.items()}
+
+def warm_up():
+    """Loads every service in dependency order, then runs synthetic predictions."""
+    services.warm(["persona_model", "prescription_model", "inspector", "optimizer", "projection", "macro_store", "worker_pools", "warmup"])
+    print("🚦 Ready." if readiness.is_ready() else "🚦 Warm-up finished with failures, see /ready.")
+
+@app.get("/admin/persona/online")
+def online_persona_stats():
+    """
+    Incremental persona clustering progress (PERSONA_ONLINE=1): updates, rows, queue depth, current map.
+    """
+    if not ONLINE_ENABLED:
+        return {"enabled": False}
+    return {"enabled": True, **services.get("online_persona").stats()}
+
 # Startup Event
 @app.on_event("startup")
 async def startup_event():
-    # Train/Load Models on Startup
-    ml_engine.train_persona_model()
-    ml_engine.train_prescription_model()
+    # Accept traffic (liveness) immediately; /ready flips once warm-up completes
+    if WARMUP_ON_STARTUP:
+        threading.Thread(target=warm_up, name="warm-up", daemon=True).start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    if services.is_loaded("online_persona"):
+        services.get("online_persona").stop()
+    shutdown_pools()
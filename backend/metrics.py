@@ -0,0 +1,230 @@
+import bisect
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Seconds. Dense at the low end: single-row predictions sit in the tens of microseconds
+LATENCY_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+                   0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Raw samples buffered per histogram before the recording thread folds them into buckets itself
+FOLD_THRESHOLD = 4096
+
+
+def _format_labels(names, values):
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{value}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class Counter:
+    """Monotonic counter keyed by a tuple of label values."""
+
+    kind = "counter"
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels=(), amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {value}" for labels, value in items]
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram keyed by a tuple of label values.
+    observe() only appends the raw sample to a deque (thread-safe, no lock); samples are folded
+    into buckets at scrape time, or every FOLD_THRESHOLD samples if nobody scrapes.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}  # labels -> [per-bucket counts (+Inf last), sum, count]
+        self._pending = deque()  # (value, labels) not yet folded
+        self._lock = threading.Lock()
+
+    def observe(self, value, labels=()):
+        self._pending.append((value, labels))
+        if len(self._pending) > FOLD_THRESHOLD:
+            self._fold()
+
+    def observe_many(self, samples):
+        """Records [(value, labels), ...]."""
+        self._pending.extend(samples)
+        if len(self._pending) > FOLD_THRESHOLD:
+            self._fold()
+
+    def _fold(self):
+        buckets = self.buckets
+        pending = self._pending
+        with self._lock:
+            while pending:
+                try:
+                    value, labels = pending.popleft()
+                except IndexError:
+                    break
+                series = self._series.get(labels)
+                if series is None:
+                    series = self._series[labels] = [[0] * (len(buckets) + 1), 0.0, 0]
+                series[0][bisect.bisect_left(buckets, value)] += 1
+                series[1] += value
+                series[2] += 1
+
+    def render(self):
+        self._fold()
+        with self._lock:
+            items = sorted((labels, (list(s[0]), s[1], s[2])) for labels, s in self._series.items())
+        lines = []
+        for labels, (counts, total, count) in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets + ("+Inf",), counts):
+                cumulative += n
+                le = _format_labels(self.labelnames + ("le",), labels + (bound,))
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            label_str = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_str} {total}")
+            lines.append(f"{self.name}_count{label_str} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds the process' metrics and renders them in the Prometheus text exposition format."""
+
+    def __init__(self):
+        self.metrics = []
+
+    def counter(self, name, help, labelnames=()):
+        metric = Counter(name, help, labelnames)
+        self.metrics.append(metric)
+        return metric
+
+    def histogram(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        metric = Histogram(name, help, labelnames, buckets)
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+REQUESTS = registry.counter(
+    "gokuldham_http_requests_total", "HTTP requests by route, method and status code.",
+    ("route", "method", "status"))
+REQUEST_ERRORS = registry.counter(
+    "gokuldham_http_request_errors_total", "HTTP requests that ended in a 5xx or an unhandled exception.",
+    ("route", "method"))
+REQUEST_LATENCY = registry.histogram(
+    "gokuldham_http_request_duration_seconds", "Time from request start to the last response byte.",
+    ("route", "method"))
+STAGE_LATENCY = registry.histogram(
+    "gokuldham_stage_duration_seconds", "Time spent in one stage of a request (model, solver, LLM, pool queue).",
+    ("component", "stage"))
+LLM_TOKENS = registry.counter(
+    "gokuldham_llm_tokens_total", "Gemini tokens by direction (prompt/completion).",
+    ("kind",))
+LLM_ERRORS = registry.counter(
+    "gokuldham_llm_errors_total", "Gemini calls that raised.")
+
+# In pool worker processes, stage samples are buffered here and shipped back with the task result
+_forwarded = None
+
+
+def record_stages(component, laps):
+    """Records [(stage, seconds), ...] for one component."""
+    if _forwarded is not None:
+        _forwarded.append((component, laps))
+        return
+    STAGE_LATENCY.observe_many([(seconds, (component, stage)) for stage, seconds in laps])
+
+
+def merge_stage_samples(samples):
+    """Folds stage samples returned by a worker process into this process' histograms."""
+    for component, laps in samples:
+        record_stages(component, laps)
+
+
+@contextmanager
+def forward_stages():
+    """Inside a worker task: buffers stage samples instead of recording them; yields the buffer."""
+    global _forwarded
+    _forwarded = samples = []
+    try:
+        yield samples
+    finally:
+        _forwarded = None
+
+
+class Stopwatch:
+    """
+    Times consecutive stages of one call with a single perf_counter per stage:
+        watch = Stopwatch("persona"); ...; watch.lap("scale"); ...; watch.lap("predict"); watch.record()
+    """
+
+    __slots__ = ("component", "marks")
+
+    def __init__(self, component):
+        self.component = component
+        self.marks = [(None, time.perf_counter())]
+
+    def lap(self, stage):
+        self.marks.append((stage, time.perf_counter()))
+
+    def record(self):
+        marks = self.marks
+        record_stages(self.component, [(marks[i][0], marks[i][1] - marks[i - 1][1]) for i in range(1, len(marks))])
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware: request count, error count and latency per route template
+    (e.g. "/analyze/persona", never raw paths, so label cardinality stays bounded).
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        start = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            path = route.path if route is not None else "unmatched"
+            method = scope["method"]
+            REQUEST_LATENCY.observe(time.perf_counter() - start, (path, method))
+            REQUESTS.inc((path, method, str(status)))
+            if status >= 500:
+                REQUEST_ERRORS.inc((path, method))
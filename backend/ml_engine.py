@@ -1,34 +1,91 @@
 import pandas as pd
 import numpy as np
-from sklearn.cluster import KMeans
+from sklearn.cluster import KMeans, MiniBatchKMeans
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.preprocessing import StandardScaler
 from sklearn.multioutput import MultiOutputRegressor
-import pickle
 import os
+import time
+from cache import LRUCache
+from dataset_cache import DatasetCache
+from metrics import Stopwatch
+from model_store import ModelStore
+from centroid_scorer import CentroidScorer, DEFAULT_TOP_K
+from allocation_grid import AllocationGrid, DEFAULT_INCOME_BUCKETS, DEFAULT_TOLERANCE, sample_inputs
+from compact_forest import CompactForest, DEFAULT_VALUE_DTYPE as COMPACT_VALUE_DTYPE, \
+    DEFAULT_TOLERANCE as COMPACT_TOLERANCE, BATCH_MIN_ROWS as COMPACT_BATCH_MIN_ROWS
+
+PERSONA_FEATURES = ['NeedsPct', 'WantsPct', 'SavingsPct']
+PERSONA_COLUMNS = PERSONA_FEATURES + ['PersonaLabel']
+PRESCRIPTION_FEATURES = ['Age', 'Income', 'HorizonYears', 'RiskTolerance']
+PRESCRIPTION_TARGETS = ['EquityPct', 'DebtPct', 'GoldPct']
+
+# Response cache: inputs are snapped to these grids before lookup (and before predicting)
+PERSONA_PCT_QUANTUM = float(os.getenv("ML_CACHE_PCT_QUANTUM", "0.1"))
+INCOME_QUANTUM = float(os.getenv("ML_CACHE_INCOME_QUANTUM", "100"))
+
+# Out-of-core training: "auto" switches to streaming batches above CHUNKED_TRAINING_ROWS
+TRAINING_MODE = os.getenv("TRAINING_MODE", "auto")
+CHUNKED_TRAINING_ROWS = int(os.getenv("CHUNKED_TRAINING_ROWS", "1000000"))
+TRAINING_BATCH_ROWS = int(os.getenv("TRAINING_BATCH_ROWS", "100000"))
+PRESCRIPTION_SAMPLE_ROWS = int(os.getenv("PRESCRIPTION_SAMPLE_ROWS", "20000"))
+# Small datasets are re-streamed until MiniBatchKMeans has taken at least this many steps
+MIN_KMEANS_STEPS = 100
+
+def quantize(value, quantum):
+    return round(round(value / quantum) * quantum, 6)
 
 class MLEngine:
     def __init__(self):
         self.persona_model = None
         self.scaler = None
+        self.persona_scorer = None
         self.data_path = "dataset_personas.csv"
         self.allocations_path = "dataset_allocations.csv"
-        self.model_path = "persona_kmeans.pkl"
+        self.store = ModelStore()
+        self.datasets = DatasetCache()
+        self.cluster_map = {}
         self.prescription_model = None
+        self.prescription_fingerprint = None
+        # "forest" walks the trees per request, "compiled" serves from a precomputed grid,
+        # "compact" walks a CompactForest (flat arrays) in place of the sklearn forest
+        self.prescription_mode = os.getenv("PRESCRIPTION_MODE", "forest")
+        self.prescription_grid = None
+        # Compact mode: the sklearn forest, loaded only once a batch of COMPACT_BATCH_MIN_ROWS arrives
+        self.prescription_forest = None
+        self.training_mode = TRAINING_MODE
+        # Keys are (model name, model version, inputs...): a (re)load only retires its own model's entries
+        self.model_versions = {"persona": None, "prescription": None}
+        self.cache = LRUCache(
+            "ml",
+            maxsize=int(os.getenv("ML_CACHE_SIZE", "4096")),
+            ttl=float(os.getenv("ML_CACHE_TTL", "3600"))
+        )
 
-    def load_data(self):
-        """Loads the synthetic dataset."""
-        if not os.path.exists(self.data_path):
-            raise FileNotFoundError(f"Dataset not found at {self.data_path}")
-        return pd.read_csv(self.data_path)
+    def _model_updated(self, name, version):
+        self.model_versions[name] = version
+        # Old-version keys can never be hit again; free their slots without touching other models' entries
+        self.cache.evict(lambda key: key[0] == name and key[1] != version)
+
+    def load_data(self, columns=None):
+        """Loads the synthetic dataset (from the columnar cache; the CSV is only parsed when it changes)."""
+        return self.datasets.load(self.data_path, columns)
+
+    def use_chunked_training(self, path):
+        if self.training_mode == "chunked":
+            return True
+        return self.training_mode == "auto" and self.datasets.rows(path) > CHUNKED_TRAINING_ROWS
 
     def train_persona_model(self):
         """Trains K-Means on the dataset."""
+        if self.use_chunked_training(self.data_path):
+            return self.train_persona_model_chunked()
+
         print("🧠 Training Persona Model (K-Means)...")
-        df = self.load_data()
+        df = self.load_data(PERSONA_COLUMNS)
         
         # Features: Needs%, Wants%, Savings% (Normalized)
-        features = df[['NeedsPct', 'WantsPct', 'SavingsPct']]
+        features = df[PERSONA_FEATURES]
         
         # Scale Data
         self.scaler = StandardScaler()
@@ -41,28 +98,115 @@ class MLEngine:
         # Map Clusters to Labels (Simplified approach: We map the centroid to the most frequent label in that cluster)
         df['Cluster'] = self.persona_model.labels_
         self.cluster_map = df.groupby('Cluster')['PersonaLabel'].agg(lambda x: x.mode()[0]).to_dict()
+        self.persona_scorer = CentroidScorer.from_models(self.scaler, self.persona_model, self.cluster_map)
+        self._model_updated("persona", f"adhoc-{time.time_ns()}")
         
         print("✅ Model Trained. Cluster Map:", self.cluster_map)
         return self.cluster_map
 
-    def predict_persona(self, needs, wants, savings):
-        """Predicts persona for a new user."""
+    def train_persona_model_chunked(self, batch_size=TRAINING_BATCH_ROWS):
+        """
+        Out-of-core variant of train_persona_model: memory stays O(batch_size) at any dataset size.
+        One pass fits the scaler, MiniBatchKMeans takes one partial_fit step per batch, and a final
+        pass counts (cluster x persona) to map each cluster to its most frequent label.
+        """
+        print("🧠 Training Persona Model (chunked Mini-Batch K-Means)...")
+        batches = lambda: self.datasets.iter_batches(self.data_path, PERSONA_COLUMNS, batch_size)
+
+        self.scaler = StandardScaler()
+        for batch in batches():
+            self.scaler.partial_fit(batch[PERSONA_FEATURES])
+
+        n_batches = -(-self.datasets.rows(self.data_path) // batch_size)
+        self.persona_model = MiniBatchKMeans(n_clusters=16, random_state=42, n_init=3)
+        for _ in range(max(1, -(-MIN_KMEANS_STEPS // n_batches))):
+            for batch in batches():
+                self.persona_model.partial_fit(self.scaler.transform(batch[PERSONA_FEATURES]))
+
+        labels, counts = None, None
+        for batch in batches():
+            personas = batch["PersonaLabel"]
+            if counts is None:
+                labels = list(personas.cat.categories)
+                counts = np.zeros((self.persona_model.n_clusters, len(labels)), dtype=np.int64)
+            codes = personas.cat.codes.to_numpy()
+            clusters = self.persona_model.predict(self.scaler.transform(batch[PERSONA_FEATURES]))
+            known = codes >= 0
+            counts += np.bincount(clusters[known] * len(labels) + codes[known],
+                                  minlength=counts.size).reshape(counts.shape)
+
+        # Ties go to the first label in sorted order, like Series.mode()[0]; empty clusters stay unmapped
+        self.cluster_map = {c: labels[i] for c, i in enumerate(counts.argmax(axis=1)) if counts[c].any()}
+        self.persona_scorer = CentroidScorer.from_models(self.scaler, self.persona_model, self.cluster_map)
+        self._model_updated("persona", f"adhoc-{time.time_ns()}")
+
+        print("✅ Model Trained. Cluster Map:", self.cluster_map)
+        return self.cluster_map
+
+    def load_or_train_persona_model(self):
+        """Loads the persona artifact if the dataset is unchanged, otherwise retrains and saves it."""
+        if not os.path.exists(self.data_path):
+            raise FileNotFoundError(f"Dataset not found at {self.data_path}")
+
+        fingerprint = self.store.fingerprint(self.data_path, PERSONA_COLUMNS,
+                                             self.datasets.content_hash(self.data_path))
+        payload = self.store.load("persona", fingerprint)
+        if payload:
+            self.scaler = payload["scaler"]
+            self.persona_model = payload["model"]
+            self.cluster_map = payload["cluster_map"]
+            self.persona_scorer = CentroidScorer.from_models(self.scaler, self.persona_model, self.cluster_map)
+            self._model_updated("persona", fingerprint)
+            print("📦 Persona Model loaded from artifact.")
+            return self.cluster_map
+
+        self.train_persona_model()
+        self.store.save("persona", {
+            "scaler": self.scaler,
+            "model": self.persona_model,
+            "cluster_map": self.cluster_map
+        }, fingerprint)
+        self._model_updated("persona", fingerprint)
+        return self.cluster_map
+
+    def apply_persona_update(self, model, cluster_map, version):
+        """Swaps in an incrementally updated persona model (see online_persona.py)."""
+        self.persona_model = model
+        self.cluster_map = cluster_map
+        self.persona_scorer = CentroidScorer.from_models(self.scaler, model, cluster_map)
+        self._model_updated("persona", version)
+
+    def predict_persona(self, needs, wants, savings, top_k=DEFAULT_TOP_K):
+        """
+        Predicts persona for a new user.
+        Confidence is the softmax weight of the persona over the scaled centroid distances.
+        """
         if not self.persona_model:
-            self.train_persona_model()
-            
-        # Preprocess input
-        input_data = np.array([[needs, wants, savings]])
-        scaled_input = self.scaler.transform(input_data)
-        
-        # Predict
-        cluster_id = self.persona_model.predict(scaled_input)[0]
-        persona_label = self.cluster_map.get(cluster_id, "unknown")
-        
-        return {
-            "persona": persona_label,
-            "cluster_id": int(cluster_id),
-            "confidence": "High (K-Means Distance)"
-        }
+            self.load_or_train_persona_model()
+
+        needs, wants, savings = (quantize(v, PERSONA_PCT_QUANTUM) for v in (needs, wants, savings))
+        key = ("persona", self.model_versions["persona"], needs, wants, savings, top_k)
+        return self.cache.get_or_compute(key, lambda: self._score_personas([[needs, wants, savings]], top_k)[0])
+
+    def predict_persona_many(self, rows, top_k=DEFAULT_TOP_K):
+        """Predicts personas for an (n, 3) batch of [needs, wants, savings] in one vectorized pass."""
+        if not self.persona_model:
+            self.load_or_train_persona_model()
+
+        return self._score_personas(rows, top_k, component="persona_batch")
+
+    def _score_personas(self, rows, top_k, component="persona"):
+        """Scale -> nearest centroid + confidences -> persona dicts, timed per stage."""
+        scorer = self.persona_scorer
+        watch = Stopwatch(component)
+        scaled = scorer.transform(rows)
+        watch.lap("scale")
+        scored = scorer.score_scaled(scaled, top_k)
+        watch.lap("predict")
+        results = scorer.label(scored)
+        watch.lap("label_map")
+        watch.record()
+        return results
 
     def train_prescription_model(self):
         """Trains Random Forest for Asset Allocation."""
@@ -71,37 +215,249 @@ class MLEngine:
              print("⚠️ Allocation Dataset not found. Skipping Prescription Model.")
              return
 
-        df = pd.read_csv(self.allocations_path)
+        columns = PRESCRIPTION_FEATURES + PRESCRIPTION_TARGETS
+        if self.use_chunked_training(self.allocations_path):
+            df = self.sample_rows(self.allocations_path, columns, PRESCRIPTION_SAMPLE_ROWS)
+            print(f"   Training on a {len(df)}-row uniform sample.")
+        else:
+            df = self.datasets.load(self.allocations_path, columns)
         
         # Features: Age, Income, HorizonYears, RiskTolerance
-        X = df[['Age', 'Income', 'HorizonYears', 'RiskTolerance']]
+        X = df[PRESCRIPTION_FEATURES]
         # Target: EquityPct, DebtPct, GoldPct
-        y = df[['EquityPct', 'DebtPct', 'GoldPct']]
+        y = df[PRESCRIPTION_TARGETS]
         
         # Train Multi-Output Random Forest
         rf = RandomForestRegressor(n_estimators=100, random_state=42)
         self.prescription_model = MultiOutputRegressor(rf)
         self.prescription_model.fit(X, y)
         
+        self._model_updated("prescription", f"adhoc-{time.time_ns()}")
         print("✅ Prescription Model Trained.")
 
+    def sample_rows(self, path, columns, size, batch_size=TRAINING_BATCH_ROWS, seed=42):
+        """
+        Uniform random sample of `size` rows in one streaming pass (memory O(size + batch_size)):
+        every row draws a random key and the rows with the `size` smallest keys are kept.
+        """
+        rng = np.random.default_rng(seed)
+        kept, kept_keys = None, None
+        for batch in self.datasets.iter_batches(path, columns, batch_size):
+            keys = rng.random(len(batch))
+            if kept is not None:
+                batch = pd.concat([kept, batch], ignore_index=True)
+                keys = np.concatenate([kept_keys, keys])
+            if len(batch) > size:
+                keep = np.sort(np.argpartition(keys, size)[:size])
+                batch, keys = batch.iloc[keep].reset_index(drop=True), keys[keep]
+            kept, kept_keys = batch, keys
+        return kept
+
+    def prescription_dataset_fingerprint(self):
+        return self.store.fingerprint(self.allocations_path, PRESCRIPTION_FEATURES + PRESCRIPTION_TARGETS,
+                                      self.datasets.content_hash(self.allocations_path))
+
+    def load_prescription_version(self):
+        """
+        For a process that only routes prescriptions to the "ml" pool workers: sets the version used in
+        cache keys without keeping the forest in memory. If the dataset changed, the artifact is trained
+        and saved here once (then dropped) so the workers load it instead of each training their own.
+        """
+        if not os.path.exists(self.allocations_path):
+            print("⚠️ Allocation Dataset not found. Skipping Prescription Model.")
+            return None
+
+        fingerprint = self.prescription_dataset_fingerprint()
+        if not self.store.has("prescription", fingerprint):
+            self.train_prescription_model()
+            self.store.save("prescription", {"model": self.prescription_model}, fingerprint)
+            self.prescription_model = None
+        self.prescription_fingerprint = fingerprint
+        # Workers in compiled/compact mode serve different (rounded) numbers than the forest
+        self._model_updated("prescription", f"{fingerprint}:{self.prescription_mode}")
+        return fingerprint
+
+    def load_or_train_prescription_model(self):
+        """Loads the prescription artifact if the dataset is unchanged, otherwise retrains and saves it."""
+        if not os.path.exists(self.allocations_path):
+            print("⚠️ Allocation Dataset not found. Skipping Prescription Model.")
+            return
+
+        fingerprint = self.prescription_dataset_fingerprint()
+        compact = None
+        if self.prescription_mode == "compact":
+            # The compact artifact alone is enough to serve; the sklearn pickle is never loaded
+            compact = self.store.load("prescription_compact", f"{fingerprint}:{COMPACT_VALUE_DTYPE}")
+        payload = None if compact else self.store.load("prescription", fingerprint)
+        if compact:
+            self.prescription_model = compact
+            print("📦 Compact Prescription Model loaded from artifact.")
+        elif payload:
+            self.prescription_model = payload["model"]
+            print("📦 Prescription Model loaded from artifact.")
+        else:
+            self.train_prescription_model()
+            self.store.save("prescription", {"model": self.prescription_model}, fingerprint)
+
+        self.prescription_fingerprint = fingerprint
+        self.prescription_grid = None
+        self.prescription_forest = None
+        self._model_updated("prescription", fingerprint)
+        if self.prescription_mode == "compact" and not compact:
+            self.compact_prescription_model()
+        if self.prescription_mode == "compiled":
+            self.compile_prescription_model()
+
+    def compact_prescription_model(self, value_dtype=COMPACT_VALUE_DTYPE, tolerance=COMPACT_TOLERANCE):
+        """
+        Replaces the sklearn forest with a CompactForest export (same predictions, a fraction of the RAM).
+        The export is only used if it stays within `tolerance` points of the forest on random inputs.
+        """
+        if not self.prescription_model:
+            self.load_or_train_prescription_model()
+            if not self.prescription_model:
+                return None
+        if isinstance(self.prescription_model, CompactForest):
+            return None
+
+        compact = CompactForest.from_sklearn(self.prescription_model, value_dtype)
+        report = compact.verify(self.prescription_model, sample_inputs(2000))
+        if report["max_abs_error"] > tolerance:
+            print(f"⚠️ Compact forest off by {report['max_abs_error']} pts (> {tolerance}). Serving from forest.")
+            return report
+
+        self.store.save("prescription_compact", compact, f"{self.prescription_fingerprint}:{value_dtype}")
+        self.prescription_model = compact
+        print(f"✅ Compact Prescription Model ready ({report['kb']} KB). Check:", report)
+        return report
+
+    def compile_prescription_model(self, income_buckets=DEFAULT_INCOME_BUCKETS, tolerance=DEFAULT_TOLERANCE):
+        """
+        Precomputes the forest over the full input grid for O(1) serving.
+        The grid is only enabled if it stays within `tolerance` points of the live forest.
+        """
+        if not self.prescription_model:
+            self.load_or_train_prescription_model()
+            if not self.prescription_model:
+                return None
+
+        grid_fingerprint = f"{self.prescription_fingerprint}:buckets={income_buckets}"
+        grid = self.store.load("prescription_grid", grid_fingerprint)
+        if grid is None:
+            print(f"⚙️ Compiling Prescription Grid ({income_buckets} income buckets)...")
+            grid = AllocationGrid.compile(self.prescription_model, income_buckets)
+            self.store.save("prescription_grid", grid, grid_fingerprint)
+
+        report = grid.verify(self.prescription_model)
+        if report["max_abs_error"] > tolerance:
+            print(f"⚠️ Prescription Grid off by {report['max_abs_error']} pts (> {tolerance}). Serving from forest.")
+            self.prescription_grid = None
+        else:
+            print(f"✅ Prescription Grid ready ({grid.table.nbytes // 1024} KB). Check:", report)
+            self.prescription_grid = grid
+            self._model_updated("prescription", grid_fingerprint)
+        return report
+
     def predict_prescription(self, age, income, horizon_years, risk_tolerance):
-        """Predicts asset allocation."""
+        """Predicts asset allocation (served from the response cache when possible)."""
         if not self.prescription_model:
-            self.train_prescription_model()
+            self.load_or_train_prescription_model()
             if not self.prescription_model:
                 return {"error": "Model not trained"}
-        
+
+        key = self.prescription_cache_key(age, income, horizon_years, risk_tolerance)
+        return self.cache.get_or_compute(key, lambda: self.predict_prescription_uncached(*key[2:]))
+
+    def prescription_cache_key(self, age, income, horizon_years, risk_tolerance):
+        """Cache key for a prescription request; key[2:] are the normalized model inputs."""
+        income = quantize(income, INCOME_QUANTUM)
+        return ("prescription", self.model_versions["prescription"], age, income, horizon_years, risk_tolerance)
+
+    def predict_prescription_uncached(self, age, income, horizon_years, risk_tolerance):
+        """Uncached prediction: compiled grid when enabled and in-domain, otherwise the forest."""
+        if not self.prescription_model:
+            self.load_or_train_prescription_model()
+            if not self.prescription_model:
+                return {"error": "Model not trained"}
+
+        watch = Stopwatch("prescription")
+        if self.prescription_grid is not None:
+            allocation = self.prescription_grid.lookup(age, income, horizon_years, risk_tolerance)
+            watch.lap("grid_lookup")
+            if allocation is not None:
+                result = {
+                    "equity": int(allocation[0]),
+                    "debt": int(allocation[1]),
+                    "gold": int(allocation[2]),
+                    "confidence": "High (Random Forest Vote)"
+                }
+                watch.lap("label_map")
+                watch.record()
+                return result
+
         # Prediction
         input_data = np.array([[age, income, horizon_years, risk_tolerance]])
+        watch.lap("prepare")
         prediction = self.prescription_model.predict(input_data)[0]
-        
-        return {
+        watch.lap("predict")
+
+        result = {
             "equity": round(prediction[0]),
             "debt": round(prediction[1]),
             "gold": round(prediction[2]),
             "confidence": "High (Random Forest Vote)"
         }
+        watch.lap("label_map")
+        watch.record()
+        return result
+
+    def prescription_batch_model(self, rows):
+        """
+        Model for a batch of `rows`. The compact forest walks small batches faster than sklearn but
+        large ones slower, so from COMPACT_BATCH_MIN_ROWS on it hands over to the sklearn forest.
+        """
+        if not isinstance(self.prescription_model, CompactForest) or rows < COMPACT_BATCH_MIN_ROWS:
+            return self.prescription_model
+        if self.prescription_forest is None:
+            payload = self.store.load("prescription", self.prescription_fingerprint)
+            # False: no sklearn artifact to fall back to, keep walking the compact forest
+            self.prescription_forest = payload["model"] if payload else False
+            if payload:
+                print("📦 Prescription forest loaded for batch predictions.")
+        return self.prescription_forest or self.prescription_model
+
+    def predict_prescription_many(self, rows):
+        """Predicts allocations for an (n, 4) batch of [age, income, horizon, risk] in one vectorized pass."""
+        if not self.prescription_model:
+            self.load_or_train_prescription_model()
+
+        input_data = np.asarray(rows, dtype=float).reshape(-1, 4)
+        if not self.prescription_model:
+            return [{"error": "Model not trained"}] * len(input_data)
+
+        watch = Stopwatch("prescription_batch")
+        if self.prescription_grid is not None:
+            # Grid lookup for in-domain rows, forest only for the rest
+            predictions = np.empty((len(input_data), 3), dtype=int)
+            covered = self.prescription_grid.covers(input_data)
+            predictions[covered] = self.prescription_grid.lookup_many(input_data[covered])
+            if not covered.all():
+                model = self.prescription_batch_model(int((~covered).sum()))
+                predictions[~covered] = np.rint(model.predict(input_data[~covered]))
+        else:
+            model = self.prescription_batch_model(len(input_data))
+            predictions = np.rint(model.predict(input_data)).astype(int)
+        watch.lap("predict")
+
+        results = [{
+            "equity": equity,
+            "debt": debt,
+            "gold": gold,
+            "confidence": "High (Random Forest Vote)"
+        } for equity, debt, gold in predictions.tolist()]
+        watch.lap("label_map")
+        watch.record()
+        return results
 
 # Singleton Instance
 ml_engine = MLEngine()
@@ -0,0 +1,83 @@
+import hashlib
+import os
+import pickle
+
+import sklearn
+
+# Bump when the shape of a saved artifact changes so old pickles are ignored
+ARTIFACT_VERSION = 1
+
+
+class ModelStore:
+    """
+    Versioned on-disk store for trained models.
+    Each artifact is saved with the fingerprint of the dataset it was trained on,
+    so a worker can reuse it on boot and only retrain when the data/schema changes.
+    """
+
+    def __init__(self, root=None):
+        self.root = root or os.getenv("MODEL_DIR", "models")
+
+    def fingerprint(self, data_path, columns, content_hash=None):
+        """
+        Hashes dataset bytes + the columns the model consumes + library versions.
+        `content_hash` (a precomputed sha256 of the file, see DatasetCache.content_hash) skips re-reading it.
+        """
+        digest = hashlib.sha256()
+        if content_hash is None:
+            with open(data_path, "rb") as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(block)
+        else:
+            digest.update(content_hash.encode())
+        digest.update(",".join(columns).encode())
+        digest.update(f"artifact={ARTIFACT_VERSION};sklearn={sklearn.__version__}".encode())
+        return digest.hexdigest()
+
+    def path_for(self, name):
+        return os.path.join(self.root, f"{name}.pkl")
+
+    def has(self, name, fingerprint):
+        """Whether a matching artifact is stored, from its fingerprint sidecar (no unpickling)."""
+        sidecar = f"{self.path_for(name)}.fingerprint"
+        try:
+            with open(sidecar) as f:
+                return f.read().strip() == fingerprint and os.path.exists(self.path_for(name))
+        except OSError:
+            pass
+        # Artifacts saved before sidecars existed: read the pickle once, then leave a sidecar behind
+        if self.load(name, fingerprint) is None:
+            return False
+        with open(sidecar, "w") as f:
+            f.write(fingerprint)
+        return True
+
+    def load(self, name, fingerprint):
+        """Returns the stored payload if it matches the fingerprint, else None."""
+        path = self.path_for(name)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "rb") as f:
+                artifact = pickle.load(f)
+        except Exception as e:
+            print(f"⚠️ Could not read artifact {path}: {e}")
+            return None
+
+        if artifact.get("fingerprint") != fingerprint:
+            return None
+        return artifact["payload"]
+
+    def save(self, name, payload, fingerprint):
+        """Atomically writes the artifact (tmp file + rename) so readers never see half a pickle."""
+        os.makedirs(self.root, exist_ok=True)
+        path = self.path_for(name)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump({"fingerprint": fingerprint, "payload": payload}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        # Hint for has(); load() still checks the fingerprint stored inside the pickle
+        with open(f"{tmp_path}.fingerprint", "w") as f:
+            f.write(fingerprint)
+        os.replace(f"{tmp_path}.fingerprint", f"{path}.fingerprint")
+        return path
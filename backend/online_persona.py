@@ -0,0 +1,181 @@
+import copy
+import os
+import queue
+import threading
+import time
+
+import numpy as np
+from sklearn.cluster import MiniBatchKMeans
+
+from ml_engine import ml_engine, PERSONA_COLUMNS, PERSONA_FEATURES, TRAINING_BATCH_ROWS
+
+
+class OnlinePersonaClusterer:
+    """
+    Keeps the persona clusters tracking live submissions without full retrains.
+    - Submissions (needs/wants/savings only, nothing identifying) go into a bounded queue.
+    - A background thread drains it in mini-batches and calls MiniBatchKMeans.partial_fit.
+    - cluster_map is kept as running (cluster x persona) counts. Live rows are unlabeled, so
+      each one votes with the persona the seed model gives it; the map is the per-cluster argmax.
+    - The updated model is published to the MLEngine and snapshotted to the ModelStore on a schedule.
+    Each update costs O(batch), never O(dataset). The one O(dataset) step, seeding without a
+    snapshot, runs on the background thread; until it finishes the batch-trained model keeps serving.
+    """
+
+    def __init__(self, engine, batch_size=256, queue_size=10000, flush_interval=5.0,
+                 snapshot_interval=300.0, decay=1.0):
+        self.engine = engine
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.snapshot_interval = snapshot_interval
+        self.decay = decay  # <1.0 lets old evidence fade from the label counts
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.model = None
+        self.label_counts = None
+        self.labels = None
+        self.reference_scorer = None
+        self.reference_to_label = None
+        self.base_fingerprint = None
+        self.updates = 0
+        self.rows_seen = 0
+        self.dropped = 0
+        self.last_snapshot = time.monotonic()
+        self._stop = threading.Event()
+        self._seeded = threading.Event()
+        self._thread = None
+
+    def seed(self):
+        """Initializes the mini-batch model from the trained KMeans (or the last online snapshot)."""
+        engine = self.engine
+        self.base_fingerprint = engine.model_versions["persona"]
+        self.reference_scorer = engine.persona_scorer
+
+        snapshot = engine.store.load("persona_online", self.base_fingerprint)
+        if snapshot:
+            self.model = snapshot["model"]
+            self.labels = snapshot["labels"]
+            self.label_counts = snapshot["label_counts"]
+            self.updates = snapshot["updates"]
+            self.rows_seen = snapshot["rows_seen"]
+            print(f"📦 Online Persona Model resumed ({self.rows_seen} live rows).")
+        else:
+            centers = engine.persona_model.cluster_centers_
+            self.model = MiniBatchKMeans(n_clusters=len(centers), init=centers, n_init=1,
+                                         batch_size=self.batch_size, random_state=42)
+            # One pass over the training set (streamed, so it works at any size): centers barely
+            # move, but per-center counts (the learning-rate denominators) start at the cluster sizes
+            self.label_counts = None
+            for batch in engine.datasets.iter_batches(engine.data_path, PERSONA_COLUMNS, TRAINING_BATCH_ROWS):
+                if self._stop.is_set():
+                    return
+                scaled = engine.scaler.transform(batch[PERSONA_FEATURES].to_numpy(dtype=float))
+                self.model.partial_fit(scaled)
+                if self.label_counts is None:
+                    self.labels = sorted(set(batch["PersonaLabel"].cat.categories) | set(self.reference_scorer.labels))
+                    self.label_counts = np.zeros((len(centers), len(self.labels)))
+                label_ids = batch["PersonaLabel"].map({label: i for i, label in enumerate(self.labels)}).to_numpy(dtype=int)
+                np.add.at(self.label_counts, (self.model.predict(scaled), label_ids), 1)
+
+        self.reference_to_label = np.array([self.labels.index(label) for label in self.reference_scorer.labels])
+        self._publish()
+        self._seeded.set()
+
+    def submit(self, needs, wants, savings):
+        """Non-blocking enqueue; drops (and counts) the row when the queue is full."""
+        try:
+            self.queue.put_nowait((needs, wants, savings))
+        except queue.Full:
+            self.dropped += 1
+
+    def update(self, rows):
+        """One incremental step over a batch of raw [needs, wants, savings] rows."""
+        raw = np.asarray(rows, dtype=float)
+        scaled = self.engine.scaler.transform(raw)
+        self.model.partial_fit(scaled)
+
+        seed_clusters = self.reference_scorer.nearest(raw)
+        reference = self.reference_to_label[self.reference_scorer.cluster_label_ids[seed_clusters]]
+        self.label_counts *= self.decay
+        np.add.at(self.label_counts, (self.model.predict(scaled), reference), 1)
+
+        self.updates += 1
+        self.rows_seen += len(raw)
+        self._publish()
+
+    def _publish(self):
+        cluster_map = {c: self.labels[label_id] for c, label_id in enumerate(self.label_counts.argmax(axis=1))}
+        # Readers get a frozen copy: partial_fit keeps mutating self.model's cluster_centers_ in place
+        self.engine.apply_persona_update(copy.deepcopy(self.model), cluster_map,
+                                         f"{self.base_fingerprint}:online-{self.updates}")
+
+    def snapshot(self):
+        self.engine.store.save("persona_online", {
+            "model": self.model,
+            "labels": self.labels,
+            "label_counts": self.label_counts,
+            "updates": self.updates,
+            "rows_seen": self.rows_seen
+        }, self.base_fingerprint)
+        self.last_snapshot = time.monotonic()
+
+    def _drain(self):
+        rows = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(rows) < self.batch_size and not self._stop.is_set():
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                rows.append(self.queue.get(timeout=min(timeout, 0.5)))
+            except queue.Empty:
+                continue
+        return rows
+
+    def _run(self):
+        try:
+            self.seed()
+        except Exception as e:
+            print(f"⚠️ Online persona seeding failed: {e}")
+            return
+        while not self._stop.is_set():
+            rows = self._drain()
+            try:
+                if rows:
+                    self.update(rows)
+                if self.updates and time.monotonic() - self.last_snapshot >= self.snapshot_interval:
+                    self.snapshot()
+            except Exception as e:
+                print(f"⚠️ Online persona update failed: {e}")
+
+    def start(self):
+        # Seeding happens on the thread: a first start without a snapshot streams the whole dataset
+        self._thread = threading.Thread(target=self._run, name="persona-online", daemon=True)
+        self._thread.start()
+        print("🔁 Online Persona Clustering started (seeding in the background).")
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.flush_interval + 1)
+        if self.updates and self._seeded.is_set():
+            self.snapshot()
+
+    def stats(self):
+        return {
+            "seeded": self._seeded.is_set(),
+            "updates": self.updates,
+            "rows_seen": self.rows_seen,
+            "queued": self.queue.qsize(),
+            "dropped": self.dropped,
+            "cluster_map": self.engine.cluster_map
+        }
+
+
+online_persona = OnlinePersonaClusterer(
+    ml_engine,
+    batch_size=int(os.getenv("PERSONA_ONLINE_BATCH", "256")),
+    queue_size=int(os.getenv("PERSONA_ONLINE_QUEUE", "10000")),
+    flush_interval=float(os.getenv("PERSONA_ONLINE_FLUSH_S", "5")),
+    snapshot_interval=float(os.getenv("PERSONA_ONLINE_SNAPSHOT_S", "300")),
+    decay=float(os.getenv("PERSONA_ONLINE_DECAY", "1.0"))
+)
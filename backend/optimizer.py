@@ -1,8 +1,23 @@
-import pulp
-from pulp import LpMaximize, LpProblem, LpVariable, lpSum
+import os
+import numpy as np
+from cache import LRUCache
+from metrics import Stopwatch
+from portfolio_lp import PortfolioLP, ASSETS, LIMIT_80C, SAFETY_FLOOR, EQUITY_CAPS, constraint_profile
+
+# "analytic" solves in-process (portfolio_lp.py); "pulp" runs CBC as before
+DEFAULT_SOLVER = os.getenv("OPTIMIZER_SOLVER", "analytic")
+
+# Response labels for ASSETS, in order
+ALLOCATION_LABELS = (
+    "ELSS (Tax Saver Equity)",
+    "PPF (Tax Saver Debt)",
+    "Nifty Index (Growth)",
+    "Fixed Deposit (Liquid)"
+)
+MESSAGE = "Optimized for Section 80C utilization and Post-Tax Yield."
 
 class TaxOptimizer:
-    def __init__(self):
+    def __init__(self, solver=DEFAULT_SOLVER):
         # Estimated Annual Returns (Conservative estimates for planning)
         self.returns = {
             "ELSS": 0.12,      # Equity Linked Savings Scheme
@@ -16,18 +31,171 @@ class TaxOptimizer:
         # ELSS & PPF are Tax Free under 80C (up to 1.5L)
         # NIFTY is 12.5% LTCG > 1.25L (We assume 10% avg tax drag for simplicity in linear model)
         # FD & LIQUID are taxed at Slab
-        pass
+        self.solver = solver
+        self._lps = {}  # constraint_profile(risk_profile) -> PortfolioLP (at most 3)
+        # (constraint profile, effective returns) -> Frontier; a handful of breakpoints each
+        self.frontiers = LRUCache("frontier", maxsize=int(os.getenv("OPTIMIZER_FRONTIER_CACHE", "256")), ttl=0)
+        # Finished responses; keys carry assumptions_key() so stale entries are never served
+        self.results = LRUCache(
+            "optimizer",
+            maxsize=int(os.getenv("OPTIMIZER_CACHE_SIZE", "4096")),
+            ttl=int(os.getenv("OPTIMIZER_CACHE_TTL", "0"))
+        )
+
+    def assumptions_key(self):
+        """Changes whenever the return assumptions or the constraint config change."""
+        return hash((
+            tuple(sorted(self.returns.items())),
+            LIMIT_80C, SAFETY_FLOOR, tuple(sorted(EQUITY_CAPS.items())),
+            self.solver
+        ))
+
+    def set_returns(self, **updates):
+        """Updates return assumptions at runtime (e.g. set_returns(FD=0.07)) and drops cached results."""
+        unknown = set(updates) - set(self.returns)
+        if unknown:
+            raise ValueError(f"Unknown assets: {sorted(unknown)}")
+        self.returns = {**self.returns, **{asset: float(value) for asset, value in updates.items()}}
+        self.results.clear()
+        self.frontiers.clear()
+
+    def effective_returns(self, tax_slab_pct):
+        """Post-tax return per rupee, in ASSETS order."""
+        return np.array([
+            self.returns["ELSS"] * 0.9,            # LTCG 12.5% > 1.25L, ~1% drag on long holding
+            self.returns["PPF"],                   # Exempt-Exempt-Exempt
+            self.returns["NIFTY"] * 0.88,          # LTCG 12.5%, ~1-2% drag
+            self.returns["FD"] * (1 - tax_slab_pct)  # Taxed at slab
+        ])
+
+    def portfolio_lp(self, risk_profile):
+        profile = constraint_profile(risk_profile)
+        lp = self._lps.get(profile)
+        if lp is None:
+            lp = self._lps[profile] = PortfolioLP(profile)
+        return lp
+
+    def frontier_key(self, risk_profile, tax_slab_pct):
+        return constraint_profile(risk_profile), self.effective_returns(tax_slab_pct).tobytes()
+
+    def frontier(self, risk_profile, tax_slab_pct):
+        """Breakpoints of the optimal allocation over the pot, computed once per (risk, slab, returns)."""
+        returns = self.effective_returns(tax_slab_pct)
+        return self.frontiers.get_or_compute(self.frontier_key(risk_profile, tax_slab_pct),
+                                             lambda: self.portfolio_lp(risk_profile).frontier(returns))
+
+    def has_frontier(self, risk_profile, tax_slab_pct):
+        """Whether optimize_portfolio would only evaluate (not build) the frontier for this pair."""
+        return self.frontier_key(risk_profile, tax_slab_pct) in self.frontiers
+
+    def frontier_curve(self, risk_profile, tax_slab_pct, max_amount):
+        """The whole frontier up to max_amount, for charting (straight lines between points are exact)."""
+        frontier = self.frontier(risk_profile, tax_slab_pct)
+        amounts = frontier.totals[frontier.totals < max_amount]
+        amounts = np.append(amounts, max_amount)
+        _, allocations, objective = frontier.evaluate_many(amounts)
+        return {
+            "risk_profile": risk_profile,
+            "tax_slab_pct": tax_slab_pct,
+            "points": [
+                {
+                    "amount": round(amount, 2),
+                    "allocation": {label: round(value) for label, value in zip(ALLOCATION_LABELS, x)},
+                    "projected_return_1y": round(value_1y)
+                }
+                for amount, x, value_1y in zip(amounts.tolist(), allocations.tolist(), objective.tolist())
+            ],
+            "message": MESSAGE
+        }
+
+    def optimize_many(self, amounts, risk_profiles, tax_slab_pcts=0.3):
+        """
+        Columnar batch version of optimize_portfolio (always analytic).
+        Rows are grouped by (risk profile, slab) and each group is one vectorized
+        evaluation of its frontier, so cost is O(rows) plus one frontier per group.
+        Returns a dict of equal-length arrays.
+        """
+        amounts = np.asarray(amounts, dtype=np.float64).reshape(-1)
+        risk_profiles = np.broadcast_to(np.asarray(risk_profiles, dtype=np.int64), amounts.shape)
+        tax_slab_pcts = np.broadcast_to(np.asarray(tax_slab_pcts, dtype=np.float64), amounts.shape)
+
+        feasible = np.zeros(len(amounts), dtype=bool)
+        allocations = np.zeros((len(amounts), len(ASSETS)))
+        objective = np.zeros(len(amounts))
+
+        # Group id per row; few distinct groups, so a small int dtype lets the stable sort use radix sort
+        risk_values, risk_codes = np.unique(risk_profiles, return_inverse=True)
+        slab_values, slab_codes = np.unique(tax_slab_pcts, return_inverse=True)
+        group = risk_codes.reshape(-1) * len(slab_values) + slab_codes.reshape(-1)
+        group = group.astype(np.min_scalar_type(len(risk_values) * len(slab_values)))
+        order = np.argsort(group, kind="stable")
+        bounds = np.searchsorted(group[order], np.arange(len(risk_values) * len(slab_values) + 1))
+        for g in np.flatnonzero(np.diff(bounds)).tolist():
+            rows = order[bounds[g]:bounds[g + 1]]
+            risk_profile, tax_slab_pct = risk_values[g // len(slab_values)], slab_values[g % len(slab_values)]
+            frontier = self.frontier(int(risk_profile), float(tax_slab_pct))
+            feasible[rows], allocations[rows], objective[rows] = frontier.evaluate_many(amounts[rows])
+
+        table = {
+            "investment_amount": amounts,
+            "risk_profile": risk_profiles,
+            "tax_slab_pct": tax_slab_pcts,
+            "status": np.where(feasible, "Optimal", "Infeasible")
+        }
+        for label, column in zip(ALLOCATION_LABELS, np.rint(allocations).astype(np.int64).T):
+            table[label] = column
+        table["projected_return_1y"] = np.rint(objective).astype(np.int64)
+        return table
 
     def optimize_portfolio(self, total_investment, risk_profile, tax_slab_pct=0.3):
         """
-        Solves the Linear Programming Problem:
+        Maximizes post-tax returns (see optimize_portfolio_pulp for the LP).
+        Interpolated on the precomputed frontier unless OPTIMIZER_SOLVER=pulp.
+        Repeated requests are served from the result cache.
+        """
+        key = self.cache_key(total_investment, risk_profile, tax_slab_pct)
+        return self.results.get_or_compute(key, lambda: self.optimize_portfolio_uncached(*key[1:]))
+
+    def cache_key(self, total_investment, risk_profile, tax_slab_pct=0.3):
+        """Result cache key; key[1:] are the normalized inputs."""
+        return (self.assumptions_key(), float(total_investment), int(risk_profile), round(float(tax_slab_pct), 6))
+
+    def optimize_portfolio_uncached(self, total_investment, risk_profile, tax_slab_pct=0.3):
+        if self.solver == "pulp":
+            return self.optimize_portfolio_pulp(total_investment, risk_profile, tax_slab_pct)
+
+        watch = Stopwatch("optimizer")
+        frontier = self.frontier(risk_profile, tax_slab_pct)
+        watch.lap("build")
+        status, x, objective = frontier.evaluate(total_investment)
+        watch.lap("solve")
+        result = self._format(status, x, objective)
+        watch.lap("extract")
+        watch.record()
+        return result
+
+    def _format(self, status, x, objective):
+        return {
+            "status": status,
+            "allocation": {label: round(value) for label, value in zip(ALLOCATION_LABELS, x.tolist())},
+            "projected_return_1y": round(objective),
+            "message": MESSAGE
+        }
+
+    def optimize_portfolio_pulp(self, total_investment, risk_profile, tax_slab_pct=0.3):
+        """
+        Solves the Linear Programming Problem with PuLP/CBC:
         Maximize: Post-Tax Returns
         Subject To: 
          1. 80C Limit (ELSS + PPF <= 1.5L)
          2. Total allocation = investment
          3. Risk Constraints
         """
-        
+        import pulp
+        from pulp import LpMaximize, LpProblem, LpVariable
+
+        watch = Stopwatch("optimizer")
+
         # 1. Define the Problem
         prob = LpProblem("Maximize_Post_Tax_Returns", LpMaximize)
         
@@ -39,17 +207,7 @@ class TaxOptimizer:
         fd = LpVariable("FD_Alloc", lowBound=0)
         
         # 3. Calculate "Effective Return" (Return - Tax)
-        # PPF: Exempt-Exempt-Exempt
-        ret_ppf = self.returns["PPF"] 
-        
-        # ELSS: LTCG 12.5% > 1.25L. Assuming long term holding, approximate tax drag ~1%
-        ret_elss = self.returns["ELSS"] * 0.9 
-        
-        # NIFTY: LTCG 12.5%. Tax drag ~1-2%
-        ret_nifty = self.returns["NIFTY"] * 0.88
-        
-        # FD: Taxed at slab
-        ret_fd = self.returns["FD"] * (1 - tax_slab_pct)
+        ret_elss, ret_ppf, ret_nifty, ret_fd = self.effective_returns(tax_slab_pct).tolist()
 
         # OBJECTIVE FUNCTION: Maximize Sum of (Allocation * EffectiveReturn)
         prob += (
@@ -81,20 +239,43 @@ class TaxOptimizer:
         # C4: Liquidity / Safety Floor (Always keep 10% in Debt/FD minimum)
         prob += (ppf + fd >= 0.10 * total_investment), "Safety_Floor"
 
+        watch.lap("build")
+
         # 4. SOLVE
-        status = prob.solve()
-        
+        status = prob.solve(pulp.PULP_CBC_CMD(msg=False))
+        watch.lap("solve")
+
         # 5. Format Result
-        return {
-            "status": pulp.LpStatus[status],
-            "allocation": {
-                "ELSS (Tax Saver Equity)": round(elss.varValue),
-                "PPF (Tax Saver Debt)": round(ppf.varValue),
-                "Nifty Index (Growth)": round(nifty.varValue),
-                "Fixed Deposit (Liquid)": round(fd.varValue)
-            },
-            "projected_return_1y": round(pulp.value(prob.objective)),
-            "message": "Optimized for Section 80C utilization and Post-Tax Yield."
-        }
+        result = self._format(
+            pulp.LpStatus[status],
+            np.array([v.varValue or 0.0 for v in (elss, ppf, nifty, fd)]),
+            pulp.value(prob.objective) or 0.0
+        )
+        watch.lap("extract")
+        watch.record()
+        return result
+
+    def verify(self, samples=2000, seed=0):
+        """
+        Equivalence check of the analytic solver against PuLP/CBC on random
+        (amount, risk, slab) draws plus the 80C / cap boundaries.
+        """
+        rng = np.random.default_rng(seed)
+        cases = [(amount, risk, slab) for amount in (0, 1, 150000, 250000, 500000, 1500000)
+                 for risk in (1, 2, 3) for slab in (0.0, 0.05, 0.2, 0.3)]
+        cases += [(float(rng.uniform(0, 5e6)), int(rng.integers(1, 4)), float(rng.choice([0.0, 0.05, 0.1, 0.2, 0.3])))
+                  for _ in range(samples)]
+
+        analytic = TaxOptimizer(solver="analytic")
+        analytic.returns = self.returns
+        mismatches = []
+        for amount, risk, slab in cases:
+            expected = self.optimize_portfolio_pulp(amount, risk, slab)
+            actual = analytic.optimize_portfolio(amount, risk, slab)
+            worst = max(abs(actual["allocation"][k] - expected["allocation"][k]) for k in ALLOCATION_LABELS)
+            if (actual["status"] != expected["status"] or worst > 1 or
+                    abs(actual["projected_return_1y"] - expected["projected_return_1y"]) > 1):
+                mismatches.append({"case": (amount, risk, slab), "analytic": actual, "pulp": expected})
+        return {"cases": len(cases), "mismatches": len(mismatches), "examples": mismatches[:3]}
 
 optimizer = TaxOptimizer()
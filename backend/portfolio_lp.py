@@ -0,0 +1,155 @@
+import bisect
+from itertools import combinations
+
+import numpy as np
+
+# Variable order used throughout: x = [ELSS, PPF, NIFTY, FD]
+ASSETS = ("ELSS", "PPF", "NIFTY", "FD")
+LIMIT_80C = 150000
+SAFETY_FLOOR = 0.10  # PPF + FD >= 10% of the pot
+EQUITY_CAPS = {1: 0.30, 2: 0.60}  # ELSS + NIFTY cap by risk profile; anything else is uncapped
+
+
+def constraint_profile(risk_profile):
+    """Canonical LP key: every profile without an equity cap (3, or any other value) is the same LP."""
+    return int(risk_profile) if risk_profile in EQUITY_CAPS else None
+
+
+def constraint_rows(risk_profile):
+    """
+    Inequalities of the TaxOptimizer LP as (a, u, v), meaning a.x <= u * T + v
+    for a pot of T. The total-allocation equality (sum x = T) is implicit.
+    """
+    rows = [
+        ((1, 1, 0, 0), 0.0, LIMIT_80C),           # 80C
+        ((0, -1, 0, -1), -SAFETY_FLOOR, 0.0),     # safety floor
+    ]
+    cap = EQUITY_CAPS.get(risk_profile)
+    if cap is not None:
+        rows.append(((1, 0, 1, 0), cap, 0.0))     # equity cap
+    for i in range(len(ASSETS)):
+        a = [0] * len(ASSETS)
+        a[i] = -1
+        rows.append((tuple(a), 0.0, 0.0))         # x_i >= 0
+    return rows
+
+
+class PortfolioLP:
+    """
+    Exact in-process solver for the 4-variable TaxOptimizer LP (no CBC subprocess, no temp files).
+    An LP optimum sits on a vertex: the equality plus 3 active inequalities. With at most 7
+    inequality rows there are <= 35 candidate bases, each a 4x4 system inverted once up front.
+    Every right-hand side is affine in T, so each basis' vertex is x(T) = slope * T + intercept
+    and a solve is one small matmul, a feasibility mask and an argmax.
+    """
+
+    def __init__(self, risk_profile):
+        rows = constraint_rows(risk_profile)
+        self.A = np.array([a for a, _, _ in rows], dtype=np.float64)
+        self.u = np.array([u for _, u, _ in rows])
+        self.v = np.array([v for _, _, v in rows])
+
+        bases, slopes, intercepts = [], [], []
+        for active in combinations(range(len(rows)), len(ASSETS) - 1):
+            M = np.vstack([np.ones(len(ASSETS)), self.A[list(active)]])
+            if abs(np.linalg.det(M)) < 1e-9:
+                continue
+            inverse = np.linalg.inv(M)
+            bases.append(active)
+            slopes.append(inverse @ np.concatenate([[1.0], self.u[list(active)]]))
+            intercepts.append(inverse @ np.concatenate([[0.0], self.v[list(active)]]))
+        self.bases = bases
+        self.slopes = np.array(slopes)          # (B, 4)
+        self.intercepts = np.array(intercepts)  # (B, 4)
+
+    def solve_many(self, totals, returns):
+        """
+        Maximizes returns . x for each pot in `totals` (ties go to the first basis in enumeration order).
+        Returns (feasible (n,), x (n, 4), objective (n,)); infeasible rows are all zeros.
+        """
+        totals = np.asarray(totals, dtype=np.float64).reshape(-1)
+        x = totals[:, None, None] * self.slopes + self.intercepts                  # (n, B, 4)
+        tol = 1e-9 * np.maximum(1.0, np.abs(totals))[:, None, None]
+        feasible = (x @ self.A.T <= totals[:, None, None] * self.u + self.v + tol).all(axis=2)
+        objective = np.where(feasible, x @ returns, -np.inf)                       # (n, B)
+
+        rows = np.arange(len(totals))
+        best = objective.argmax(axis=1)
+        ok = feasible[rows, best]
+        x = np.where(ok[:, None], x[rows, best], 0.0)
+        # Clear -0.0 and 1e-12 noise from the inverse
+        x[np.abs(x) < 1e-6] = 0.0
+        return ok, x, np.where(ok, objective[rows, best], 0.0)
+
+    def solve(self, total, returns):
+        """Single pot. Returns (status, x, objective) with PuLP's status names."""
+        ok, x, objective = self.solve_many([total], returns)
+        return ("Optimal" if ok[0] else "Infeasible"), x[0], float(objective[0])
+
+    def frontier(self, returns):
+        """
+        Optimal allocation as a function of the pot. The optimal basis can only change where
+        some basis' vertex enters/leaves the feasible region or two bases' objectives cross;
+        between those events x*(T) is linear. Solves once at every event and keeps the
+        points where the slope actually changes.
+        """
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # Basis b's row i slack hits zero: (A_i.slope_b - u_i) T + (A_i.intercept_b - v_i) = 0
+            slack_slope = self.slopes @ self.A.T - self.u
+            slack_intercept = self.intercepts @ self.A.T - self.v
+            feasibility_events = -slack_intercept / slack_slope
+            # Bases b and c give the same objective
+            obj_slope = self.slopes @ returns
+            obj_intercept = self.intercepts @ returns
+            crossing_events = -(obj_intercept[:, None] - obj_intercept) / (obj_slope[:, None] - obj_slope)
+
+        events = np.concatenate([feasibility_events.ravel(), crossing_events.ravel()])
+        # Rounding merges the same event reached through different bases (float noise)
+        events = np.unique(np.round(events[np.isfinite(events) & (events > 0)], 4))
+        # Past the last event the basis is fixed; one extra point pins the final slope
+        end = 2 * events.max(initial=0.0) + 1e6
+        totals = np.concatenate([[0.0], events, [end]])
+        _, x, objective = self.solve_many(totals, returns)
+        return Frontier(totals, x, objective).simplified()
+
+
+class Frontier:
+    """
+    Piecewise-linear optimum over the pot (one per risk profile and slab).
+    Any amount is answered by interpolation, linearly extrapolated past the last breakpoint.
+    """
+
+    def __init__(self, totals, allocations, objective):
+        self.totals = np.asarray(totals, dtype=np.float64)
+        self.allocations = np.asarray(allocations, dtype=np.float64)  # (n, 4)
+        self.objective = np.asarray(objective, dtype=np.float64)
+        # [allocation..., objective] per point, and each segment's slope (segment i starts at point i)
+        self.values = np.column_stack([self.allocations, self.objective])
+        self.slopes = np.diff(self.values, axis=0) / np.diff(self.totals)[:, None]
+        self._totals_list = self.totals.tolist()
+
+    def simplified(self):
+        """Drops points where neither the allocation nor the objective changes slope."""
+        slopes = self.slopes
+        bends = ~np.isclose(slopes[1:], slopes[:-1], rtol=1e-7, atol=1e-9).all(axis=1)
+        keep = np.concatenate([[True], bends, [True]])
+        return Frontier(self.totals[keep], self.allocations[keep], self.objective[keep])
+
+    def evaluate_many(self, totals):
+        """Returns (feasible (n,), x (n, 4), objective (n,)) like PortfolioLP.solve_many."""
+        totals = np.asarray(totals, dtype=np.float64).reshape(-1)
+        # Segment per amount; the last segment also covers everything past the last point
+        segment = np.clip(np.searchsorted(self.totals, totals, side="right") - 1, 0, len(self.slopes) - 1)
+        out = self.values[segment] + (totals - self.totals[segment])[:, None] * self.slopes[segment]
+
+        ok = totals >= 0
+        out[~ok] = 0.0
+        return ok, out[:, :-1], out[:, -1]
+
+    def evaluate(self, total):
+        """Single amount without the array setup of evaluate_many."""
+        if total < 0:
+            return "Infeasible", np.zeros(self.allocations.shape[1]), 0.0
+        segment = min(bisect.bisect_right(self._totals_list, total) - 1, len(self.slopes) - 1)
+        out = self.values[segment] + (total - self._totals_list[segment]) * self.slopes[segment]
+        return "Optimal", out[:-1], float(out[-1])
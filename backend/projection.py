@@ -0,0 +1,187 @@
+import os
+import threading
+import time
+
+import numpy as np
+
+from optimizer import ALLOCATION_LABELS
+from portfolio_lp import ASSETS as OPTIMIZER_ASSETS
+
+ASSETS = ("ELSS", "PPF", "NIFTY", "FD", "LIQUID")
+ELSS, PPF, NIFTY, FD, LIQUID = range(len(ASSETS))
+
+# Annual volatility per asset (means come from TaxOptimizer.returns)
+VOLATILITY = np.array([0.18, 0.005, 0.16, 0.01, 0.01])
+# ELSS and NIFTY are both large-cap equity; PPF/FD/LIQUID move with the rate cycle
+CORRELATION = np.array([
+    [1.00, 0.00, 0.95, -0.10, -0.10],
+    [0.00, 1.00, 0.00, 0.50, 0.40],
+    [0.95, 0.00, 1.00, -0.10, -0.10],
+    [-0.10, 0.50, -0.10, 1.00, 0.70],
+    [-0.10, 0.40, -0.10, 0.70, 1.00],
+])
+
+LTCG_RATE = 0.125
+LTCG_EXEMPTION = 125000  # per year, across equity
+LOCK_IN_YEARS = {ELSS: 3, PPF: 15}  # 80C lock-ins
+PERCENTILES = (5, 25, 50, 75, 95)
+MAX_PATHS = 50000
+MAX_YEARS = 50
+# Work buffers up to this size are kept per thread; larger runs allocate per call so ~40
+# threadpool threads never each pin a max-size (50k paths x 50 years) set for the process lifetime
+BUFFER_CACHE_BYTES = int(os.getenv("PROJECTION_BUFFER_CACHE_MB", "16")) * 1024 * 1024
+
+
+class ProjectionEngine:
+    """
+    Monte Carlo projection of an optimizer allocation (lump sum at year 0, no rebalancing).
+    - Correlated lognormal annual returns with the planning means from TaxOptimizer.returns.
+    - Tax applied yearly: FD/LIQUID interest at slab; NIFTY gains realized yearly and ELSS
+      gains realized once unlocked, taxed as LTCG above the annual exemption (losses net
+      within the year); PPF is exempt. Tax paid is drawn from the portfolio: out of NIFTY and
+      ELSS in proportion to their realized gains, so it stops compounding.
+    - 80C lock-ins: PPF (15y) and ELSS (3y) count towards value but not towards the
+      accessible (withdrawable) band until they unlock.
+    Work buffers are float32, preallocated per (paths, years) and kept per thread up to
+    BUFFER_CACHE_BYTES.
+    """
+
+    def __init__(self, volatility=VOLATILITY, correlation=CORRELATION):
+        self.volatility = np.asarray(volatility, dtype=np.float64)
+        self.cholesky = np.linalg.cholesky(np.asarray(correlation, dtype=np.float64)).astype(np.float32)
+        self._local = threading.local()
+
+    @staticmethod
+    def allocation_from_result(result):
+        """TaxOptimizer.optimize_portfolio allocation -> amount per projection asset."""
+        amounts = dict(zip(OPTIMIZER_ASSETS, (result["allocation"][label] for label in ALLOCATION_LABELS)))
+        return np.array([amounts.get(asset, 0.0) for asset in ASSETS], dtype=np.float64)
+
+    @staticmethod
+    def _allocate(paths, years):
+        # Asset-major layout: each asset's paths are one contiguous row
+        return {
+            "shape": (paths, years),
+            "z": np.empty((years, len(ASSETS), (paths + 1) // 2), dtype=np.float32),
+            "growth": np.empty((years, len(ASSETS), paths), dtype=np.float32),
+            "value": np.empty((len(ASSETS), paths), dtype=np.float32),
+            "gain": np.empty((len(ASSETS), paths), dtype=np.float32),
+            "unrealized_elss": np.empty(paths, dtype=np.float32),
+            "realized": np.empty(paths, dtype=np.float32),
+            "taxable": np.empty(paths, dtype=np.float32),
+            "weight": np.empty(paths, dtype=np.float32),
+            "locked_value": np.empty(paths, dtype=np.float32),
+            "total": np.empty((years + 1, paths), dtype=np.float32),
+            "accessible": np.empty((years + 1, paths), dtype=np.float32),
+        }
+
+    @staticmethod
+    def buffer_bytes(paths, years):
+        """float32 bytes of one buffer set: z (half paths) + growth + total/accessible + 5 asset rows + 5 path rows."""
+        return 4 * paths * (years * len(ASSETS) * 3 // 2 + 2 * (years + 1) + 2 * len(ASSETS) + 5)
+
+    def _buffers(self, paths, years):
+        if self.buffer_bytes(paths, years) > BUFFER_CACHE_BYTES:
+            return self._allocate(paths, years)  # freed with the call
+        buffers = getattr(self._local, "buffers", None)
+        if buffers is None or buffers["shape"] != (paths, years):
+            buffers = self._local.buffers = self._allocate(paths, years)
+        return buffers
+
+    def simulate(self, allocation, returns, tax_slab_pct, years=30, paths=10000, seed=None):
+        """
+        allocation: amount per ASSETS entry; returns: TaxOptimizer.returns.
+        Returns (total, accessible) as (years + 1, paths) views into this thread's buffers.
+        """
+        b = self._buffers(paths, years)
+        rng = np.random.default_rng(seed)
+
+        # Antithetic draws: the second half of the paths mirror the first (half the RNG work, lower variance)
+        z, growth = b["z"], b["growth"]
+        half = z.shape[2]
+        rng.standard_normal(out=z, dtype=np.float32)
+        np.matmul(self.cholesky, z, out=growth[:, :, :half])
+        np.negative(growth[:, :, :paths - half], out=growth[:, :, half:])
+
+        # Lognormal growth factors whose means match the planning returns
+        mean = np.array([returns[asset] for asset in ASSETS])
+        sigma = np.sqrt(np.log1p((self.volatility / (1 + mean)) ** 2))
+        mu = np.log1p(mean) - sigma ** 2 / 2
+        growth *= sigma.astype(np.float32)[:, None]
+        growth += mu.astype(np.float32)[:, None]
+        np.exp(growth, out=growth)
+        growth -= 1.0  # now the annual return
+        # FD/LIQUID interest is taxed at slab as it accrues
+        growth[:, [FD, LIQUID]] *= np.float32(1 - tax_slab_pct)
+
+        value, gain = b["value"], b["gain"]
+        value[:] = np.asarray(allocation, dtype=np.float32)[:, None]
+        unrealized_elss, realized, taxable, weight = b["unrealized_elss"], b["realized"], b["taxable"], b["weight"]
+        unrealized_elss[:] = 0.0
+        total, accessible = b["total"], b["accessible"]
+        locked = np.zeros(len(ASSETS), dtype=np.float32)
+
+        for year in range(years + 1):
+            for asset, lock_years in LOCK_IN_YEARS.items():
+                locked[asset] = 1.0 if year < lock_years else 0.0
+            value.sum(axis=0, out=total[year])
+            np.matmul(locked, value, out=b["locked_value"])
+            np.subtract(total[year], b["locked_value"], out=accessible[year])
+            if year == years:
+                break
+
+            np.multiply(value, growth[year], out=gain)
+            value += gain
+
+            # Equity gains realized this year: NIFTY always, ELSS only once unlocked
+            unrealized_elss += gain[ELSS]
+            elss_realized = year + 1 >= LOCK_IN_YEARS[ELSS]
+            np.add(gain[NIFTY], unrealized_elss if elss_realized else 0.0, out=realized)
+            np.subtract(realized, LTCG_EXEMPTION, out=taxable)
+            np.maximum(taxable, 0.0, out=taxable)
+            taxable *= LTCG_RATE  # now the tax due
+
+            # Paid out of the assets whose gains were realized, in proportion to those gains
+            np.maximum(gain[NIFTY], 0.0, out=weight)
+            if elss_realized:
+                elss_gain = np.maximum(unrealized_elss, 0.0)
+                weight /= np.maximum(weight + elss_gain, np.float32(1e-6))
+                value[ELSS] -= taxable * (1.0 - weight)
+                unrealized_elss[:] = 0.0
+            else:
+                weight[:] = 1.0
+            value[NIFTY] -= taxable * weight
+
+        return total, accessible
+
+    def project(self, allocation, returns, tax_slab_pct, years=30, paths=10000, seed=None):
+        """Percentile bands of post-tax portfolio value (and of its unlocked part) per year."""
+        if not 1 <= years <= MAX_YEARS or not 1 <= paths <= MAX_PATHS:
+            raise ValueError(f"years must be 1-{MAX_YEARS} and paths 1-{MAX_PATHS}")
+        if seed is None:
+            seed = int(np.random.SeedSequence().entropy % 2 ** 32)
+
+        start = time.perf_counter()
+        total, accessible = self.simulate(allocation, returns, tax_slab_pct, years, paths, seed)
+        bands = np.percentile(total, PERCENTILES, axis=1)
+        # Once every lock-in has expired, accessible == total
+        unlocked = min(max(LOCK_IN_YEARS.values()), years + 1)
+        accessible_bands = np.concatenate([np.percentile(accessible[:unlocked], PERCENTILES, axis=1),
+                                           bands[:, unlocked:]], axis=1)
+        invested = float(np.sum(allocation))
+        final = total[-1]
+
+        return {
+            "years": list(range(years + 1)),
+            "percentiles": {f"p{q}": band.round().tolist() for q, band in zip(PERCENTILES, bands)},
+            "accessible_percentiles": {f"p{q}": band.round().tolist() for q, band in zip(PERCENTILES, accessible_bands)},
+            "invested": invested,
+            "median_final_value": round(float(np.median(final))),
+            "prob_below_invested": round(float((final < invested).mean()), 4) if invested else 0.0,
+            "paths": paths,
+            "seed": seed,
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 1)
+        }
+
+
+projection_engine = ProjectionEngine()
@@ -0,0 +1,60 @@
+import threading
+import time
+from contextlib import contextmanager
+
+
+class Readiness:
+    """
+    Per-component warm-up state for the /ready probe.
+    Each component goes pending -> loading -> ready (or failed, with the error kept for the probe).
+    With lazy=True (no startup warm-up) components start as "lazy" instead of "pending": they load
+    on first use and don't hold back readiness until then.
+    """
+
+    def __init__(self, components=(), lazy=False):
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+        self.initial_state = "lazy" if lazy else "pending"
+        self.components = {}
+        for name in components:
+            self.add(name)
+
+    def add(self, name):
+        with self._lock:
+            self.components.setdefault(name, {"state": self.initial_state, "load_ms": None, "error": None})
+
+    def set(self, name, state, **info):
+        with self._lock:
+            self.components[name].update(state=state, **info)
+
+    @contextmanager
+    def track(self, name):
+        """Marks `name` as loading for the duration of the block, then ready or failed."""
+        self.set(name, "loading")
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            self.set(name, "failed", error=str(e), load_ms=round((time.perf_counter() - start) * 1000, 1))
+            print(f"❌ {name} failed to warm up: {e}")
+        else:
+            self.set(name, "ready", load_ms=round((time.perf_counter() - start) * 1000, 1))
+
+    def state(self, name):
+        with self._lock:
+            return self.components[name]["state"]
+
+    def _ready(self):
+        return all(c["state"] in ("ready", "lazy") for c in self.components.values())
+
+    def is_ready(self):
+        with self._lock:
+            return self._ready()
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "ready": self._ready(),
+                "uptime_s": round(time.time() - self.started_at, 1),
+                "components": {name: dict(c) for name, c in self.components.items()}
+            }
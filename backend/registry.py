@@ -0,0 +1,78 @@
+import importlib
+import os
+import threading
+import time
+
+from starlette.concurrency import run_in_threadpool
+
+# A failed load is retried on the next get() after this backoff, doubling per failure up to the max
+RETRY_BACKOFF_S = float(os.getenv("SERVICE_RETRY_BACKOFF_S", "1"))
+RETRY_MAX_S = float(os.getenv("SERVICE_RETRY_MAX_S", "60"))
+
+
+class ServiceUnavailable(Exception):
+    """Raised when a service failed to load (the error is kept on the readiness probe)."""
+
+
+class LazyRegistry:
+    """
+    Defers heavy imports and singleton construction until a service is first used,
+    or until an explicit warm-up. Load state and timing are reported through Readiness.
+    A failed load is not permanent: get() tries again once its backoff has passed.
+    """
+
+    def __init__(self, readiness):
+        self.readiness = readiness
+        self._loaders = {}
+        self._locks = {}
+        self._values = {}
+        self._failures = {}  # name -> (consecutive failures, monotonic time of the next attempt)
+
+    def register(self, name, loader):
+        self._loaders[name] = loader
+        self._locks[name] = threading.Lock()
+        self.readiness.add(name)
+
+    def register_module(self, name, module, attr):
+        """Service that is just `module.attr` (imports the module on first use)."""
+        self.register(name, lambda: getattr(importlib.import_module(module), attr))
+
+    def get(self, name):
+        """Returns the service, loading it once (concurrent callers wait for the same load)."""
+        if name in self._values:
+            return self._values[name]
+
+        with self._locks[name]:
+            if name not in self._values:
+                failures, retry_at = self._failures.get(name, (0, 0.0))
+                if time.monotonic() >= retry_at:
+                    with self.readiness.track(name):
+                        self._values[name] = self._loaders[name]()
+                    if name in self._values:
+                        if self._failures.pop(name, None):
+                            self.readiness.set(name, "ready", error=None, retry_in_s=None)
+                    else:
+                        backoff = min(RETRY_BACKOFF_S * 2 ** failures, RETRY_MAX_S)
+                        self._failures[name] = (failures + 1, time.monotonic() + backoff)
+                        self.readiness.set(name, "failed", attempts=failures + 1, retry_in_s=backoff)
+                if name not in self._values:
+                    error = self.readiness.snapshot()["components"][name]["error"]
+                    raise ServiceUnavailable(f"{name} failed to load: {error}")
+        return self._values[name]
+
+    async def aget(self, name):
+        """Async variant: loads in the threadpool so a cold service never blocks the event loop."""
+        if name in self._values:
+            return self._values[name]
+        return await run_in_threadpool(self.get, name)
+
+    def is_loaded(self, name):
+        return name in self._values
+
+    def warm(self, names=None):
+        """Eagerly loads services in order; failures are recorded, not raised."""
+        for name in names or list(self._loaders):
+            try:
+                self.get(name)
+            except ServiceUnavailable:
+                pass
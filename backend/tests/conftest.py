@@ -0,0 +1,42 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# The backend runs from backend/ with bare-name imports; the allocation generator lives at the repo root
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (BACKEND_DIR, os.path.dirname(BACKEND_DIR)):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+
+@pytest.fixture(scope="session")
+def prescription_forest():
+    """A small prescription forest (same shape as MLEngine's) trained on generated allocations."""
+    from sklearn.ensemble import RandomForestRegressor
+    from sklearn.multioutput import MultiOutputRegressor
+
+    from generate_allocation_data import generate_allocations
+
+    rows = generate_allocations(3000, np.random.default_rng(0)).astype(float)
+    model = MultiOutputRegressor(RandomForestRegressor(n_estimators=10, max_depth=10, random_state=42))
+    return model.fit(rows[:, :4], rows[:, 4:])
+
+
+@pytest.fixture(scope="module")
+def persona_engine(tmp_path_factory):
+    """An MLEngine with a persona model trained on a small generated dataset (artifacts in a temp dir)."""
+    from dataset_cache import DatasetCache
+    from generate_data import write_dataset
+    from ml_engine import MLEngine
+    from model_store import ModelStore
+
+    root = tmp_path_factory.mktemp("models")
+    engine = MLEngine()
+    engine.store = ModelStore(str(root))
+    engine.datasets = DatasetCache(str(root / "datasets"))
+    engine.data_path = str(root / "dataset_personas.csv")
+    write_dataset(engine.data_path, 3000, seed=0)
+    engine.load_or_train_persona_model()
+    return engine
@@ -0,0 +1,33 @@
+import numpy as np
+
+from allocation_grid import AGE_RANGE, DEFAULT_TOLERANCE, INCOME_RANGE, AllocationGrid
+
+BUCKETS = 16
+
+
+def test_grid_matches_forest_at_bucket_centers(prescription_forest):
+    grid = AllocationGrid.compile(prescription_forest, BUCKETS)
+    edges = np.linspace(INCOME_RANGE[0], INCOME_RANGE[1], BUCKETS + 1)
+    rng = np.random.default_rng(0)
+    inputs = np.column_stack([
+        rng.integers(18, 71, 1000),
+        rng.choice((edges[:-1] + edges[1:]) / 2, 1000),
+        rng.integers(1, 26, 1000),
+        rng.integers(1, 4, 1000)
+    ]).astype(float)
+    expected = np.rint(prescription_forest.predict(inputs)).clip(0, 100)
+    np.testing.assert_array_equal(grid.lookup_many(inputs), expected)
+
+
+def test_grid_stays_within_tolerance(prescription_forest):
+    report = AllocationGrid.compile(prescription_forest, 48).verify(prescription_forest, samples=2000)
+    assert report["max_abs_error"] <= DEFAULT_TOLERANCE, report
+
+
+def test_lookup_outside_domain(prescription_forest):
+    grid = AllocationGrid.compile(prescription_forest, BUCKETS)
+    assert grid.lookup(AGE_RANGE[1] + 1, 100000, 10, 2) is None
+    assert grid.lookup(30, INCOME_RANGE[1] + 1, 10, 2) is None
+    assert grid.lookup(30.5, 100000, 10, 2) is None
+    assert grid.lookup(30, 100000, 10, 4) is None
+    assert len(grid.lookup(30, 100000, 10, 2)) == 3
@@ -0,0 +1,56 @@
+import json
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from batch import PERSONA_FIELDS, spool_records, stream_predictions
+
+
+def predict_many(rows):
+    return [{"total": sum(row)} for row in rows]
+
+
+app = FastAPI()
+
+
+@app.post("/batch")
+async def batch(request: Request):
+    return StreamingResponse(stream_predictions(await spool_records(request), PERSONA_FIELDS, predict_many, chunk_size=2),
+                             media_type="application/x-ndjson")
+
+
+client = TestClient(app)
+ROWS = [{"needs_pct": 50, "wants_pct": 30, "savings_pct": 20},
+        {"needs_pct": 50, "wants_pct": 30},
+        "not an object",
+        {"needs_pct": "x", "wants_pct": 30, "savings_pct": 20},
+        {"needs_pct": 60, "wants_pct": 20, "savings_pct": 20}]
+EXPECTED = [{"total": 100.0},
+            {"line": 2, "error": "Missing field 'savings_pct'"},
+            {"line": 3, "error": "Invalid JSON object"},
+            {"line": 4, "error": "Non-numeric value in ('needs_pct', 'wants_pct', 'savings_pct')"},
+            {"total": 100.0}]
+
+
+def lines(response):
+    assert response.status_code == 200
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+@pytest.mark.parametrize("body", [ROWS, {"items": ROWS}])
+def test_json_rows_keep_order_with_inline_errors(body):
+    assert lines(client.post("/batch", json=body)) == EXPECTED
+
+
+def test_ndjson_upload():
+    body = "\n".join(json.dumps(row) for row in ROWS[:2]) + "\n{broken\n\n" + json.dumps(ROWS[4]) + "\n"
+    response = client.post("/batch", content=body, headers={"content-type": "application/x-ndjson"})
+    assert lines(response) == [EXPECTED[0], EXPECTED[1], {"line": 3, "error": "Invalid JSON object"}, EXPECTED[4]]
+
+
+@pytest.mark.parametrize("body", ["5", '{"items": 5}', '"rows"', "[1, 2", "not json"])
+def test_non_list_or_malformed_body_is_422(body):
+    response = client.post("/batch", content=body, headers={"content-type": "application/json"})
+    assert response.status_code == 422
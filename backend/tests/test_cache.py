@@ -0,0 +1,25 @@
+from cache import LRUCache
+from ml_engine import MLEngine
+
+
+def test_evict_drops_only_matching_keys():
+    cache = LRUCache("test", maxsize=10, ttl=0)
+    for key in [("a", 1), ("a", 2), ("b", 1)]:
+        cache.set(key, {"value": key[1]})
+    assert cache.evict(lambda key: key[0] == "a") == 2
+    assert cache.get(("b", 1)) == {"value": 1}
+    assert cache.stats()["entries"] == 1
+    assert cache.stats()["memory_bytes"] > 0
+
+
+def test_model_update_keeps_other_models_entries():
+    engine = MLEngine()
+    engine._model_updated("persona", "v1")
+    engine._model_updated("prescription", "p1")
+    engine.cache.set(("persona", "v1", 50, 30, 20, 1), "old persona")
+    engine.cache.set(("prescription", "p1", 30, 100000, 10, 2), "prescription")
+
+    engine._model_updated("persona", "v2")
+    assert engine.cache.get(("prescription", "p1", 30, 100000, 10, 2)) == "prescription"
+    assert engine.cache.get(("persona", "v1", 50, 30, 20, 1)) is None
+    assert engine.cache.stats()["entries"] == 1
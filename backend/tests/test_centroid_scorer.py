@@ -0,0 +1,43 @@
+import numpy as np
+from sklearn.cluster import KMeans
+from sklearn.preprocessing import StandardScaler
+
+from centroid_scorer import CentroidScorer
+
+
+def fitted(seed=0, clusters=6):
+    rows = np.random.default_rng(seed).uniform(0, 100, (2000, 3))
+    scaler = StandardScaler().fit(rows)
+    kmeans = KMeans(n_clusters=clusters, n_init=1, random_state=seed).fit(scaler.transform(rows))
+    # Two clusters share a persona, so per-persona confidences are sums
+    cluster_map = {c: f"persona{min(c, clusters - 2)}" for c in range(clusters)}
+    return scaler, kmeans, CentroidScorer.from_models(scaler, kmeans, cluster_map)
+
+
+def test_nearest_matches_kmeans_predict():
+    scaler, kmeans, scorer = fitted()
+    rows = np.random.default_rng(1).uniform(-20, 120, (5000, 3))
+    expected = kmeans.predict(scaler.transform(rows))
+    np.testing.assert_array_equal(scorer.nearest(rows), expected)
+    cluster_ids, distances, *_ = scorer.score(rows)
+    np.testing.assert_array_equal(cluster_ids, expected)
+    np.testing.assert_allclose(distances, kmeans.transform(scaler.transform(rows)).min(axis=1), atol=1e-9)
+
+
+def test_confidences_are_a_distribution():
+    _, _, scorer = fitted()
+    rows = np.random.default_rng(2).uniform(0, 100, (1000, 3))
+    *_, label_probs, probs = scorer.score(rows, top_k=len(scorer.labels))
+    np.testing.assert_allclose(probs.sum(axis=1), 1.0)
+    assert (probs >= 0).all()
+    assert (np.diff(label_probs, axis=1) <= 0).all()  # top_k is sorted by confidence
+
+
+def test_result_dicts():
+    scaler, kmeans, scorer = fitted()
+    result = scorer.predict(50, 30, 20, top_k=2)
+    cluster = int(kmeans.predict(scaler.transform([[50, 30, 20]]))[0])
+    assert result["cluster_id"] == cluster
+    assert result["persona"] == scorer.cluster_labels[cluster]
+    assert len(result["top_k"]) == 2
+    assert result["top_k"][0]["confidence"] >= result["confidence"] > 0
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from ml_engine import PERSONA_COLUMNS, PERSONA_FEATURES, MLEngine
+
+
+@pytest.fixture
+def engine(persona_engine):
+    """A fresh engine over persona_engine's dataset and cache (its in-memory model is left alone)."""
+    engine = MLEngine()
+    engine.store, engine.datasets, engine.data_path = persona_engine.store, persona_engine.datasets, persona_engine.data_path
+    return engine
+
+
+def test_chunked_persona_training_recovers_labels_like_in_memory(engine, persona_engine):
+    engine.training_mode = "chunked"
+    cluster_map = engine.train_persona_model()
+    df = engine.load_data(PERSONA_COLUMNS)
+    assert len(cluster_map) == 16 and set(cluster_map.values()) <= set(df["PersonaLabel"].cat.categories)
+
+    # Mini-batch centroids differ from Lloyd's, but should label the dataset about as well
+    rows, truth = df[PERSONA_FEATURES].to_numpy(), df["PersonaLabel"].astype(str).to_numpy()
+    accuracy = lambda model: np.mean([r["persona"] for r in model.predict_persona_many(rows)] == truth)
+    assert accuracy(engine) >= accuracy(persona_engine) - 0.02
+
+
+def test_chunked_scaler_matches_full_pass(engine, persona_engine):
+    engine.train_persona_model_chunked(batch_size=700)
+    assert np.allclose(engine.scaler.mean_, persona_engine.scaler.mean_)
+    assert np.allclose(engine.scaler.scale_, persona_engine.scaler.scale_)
+
+
+def test_sample_rows_is_a_uniform_reproducible_subset(engine):
+    full = engine.load_data(PERSONA_FEATURES)
+    sample = engine.sample_rows(engine.data_path, PERSONA_FEATURES, 500, batch_size=400)
+    assert len(sample) == 500
+    assert sample.equals(engine.sample_rows(engine.data_path, PERSONA_FEATURES, 500, batch_size=400))
+    # Every sampled row is a dataset row, drawn from across the whole file
+    merged = sample.merge(full.reset_index(), on=PERSONA_FEATURES, how="left")
+    assert merged["index"].notna().all()
+    assert merged["index"].min() < len(full) * 0.1 and merged["index"].max() > len(full) * 0.9
+
+    assert len(engine.sample_rows(engine.data_path, PERSONA_FEATURES, 10 ** 6, batch_size=400)) == len(full)
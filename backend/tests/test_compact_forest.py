@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+
+from allocation_grid import sample_inputs
+from compact_forest import WALK_CHUNK_ROWS, CompactForest
+
+
+@pytest.mark.parametrize("rows", [1, WALK_CHUNK_ROWS + 1, 2000])
+def test_float64_export_matches_sklearn(prescription_forest, rows):
+    # One row, a chunk plus one, and several chunks (the walk runs WALK_CHUNK_ROWS rows at a time)
+    inputs = sample_inputs(rows, seed=1)
+    compact = CompactForest.from_sklearn(prescription_forest, "float64")
+    np.testing.assert_allclose(compact.predict(inputs), prescription_forest.predict(inputs), atol=1e-9)
+
+
+@pytest.mark.parametrize("dtype, tolerance", [("float32", 1e-4), ("int16", 0.01)])
+def test_quantized_exports_stay_within_tolerance(prescription_forest, dtype, tolerance):
+    inputs = sample_inputs(2000, seed=2)
+    report = CompactForest.from_sklearn(prescription_forest, dtype).verify(prescription_forest, inputs)
+    assert report["max_abs_error"] <= tolerance, report
+
+
+def test_single_output_forest(prescription_forest):
+    inputs = sample_inputs(500, seed=3)
+    targets = prescription_forest.predict(inputs)[:, 0]
+    forest = RandomForestRegressor(n_estimators=5, max_depth=6, random_state=0).fit(inputs, targets)
+    compact = CompactForest.from_sklearn(forest, "float64")
+    np.testing.assert_allclose(compact.predict(inputs).ravel(), forest.predict(inputs), atol=1e-9)
+
+
+def test_multi_output_trees_are_rejected():
+    inputs = sample_inputs(100)
+    forest = RandomForestRegressor(n_estimators=2, random_state=0).fit(inputs, np.ones((100, 2)))
+    with pytest.raises(ValueError):
+        CompactForest.from_sklearn(forest)
@@ -0,0 +1,57 @@
+import json
+
+import numpy as np
+import pytest
+
+from cpi_engine import CPI_PATH, GENERAL_INDEX, CPIEngine, load_cpi
+
+
+@pytest.fixture(scope="module")
+def raw():
+    with open(CPI_PATH) as f:
+        return json.load(f)
+
+
+def _raw_cell(raw, sector, year, month, subgroup):
+    column = 3 + [field["label"] for field in raw["fields"][3:]].index(subgroup)
+    (row,) = [row for row in raw["data"] if row[0] == sector and int(row[1]) == year and row[2].strip() == month]
+    return float(row[column])
+
+
+def test_yoy_and_mom_match_hand_computed_cells(raw):
+    cpi = load_cpi()
+    jan_24 = _raw_cell(raw, "Rural+Urban", 2024, "January", GENERAL_INDEX)
+    jan_23 = _raw_cell(raw, "Rural+Urban", 2023, "January", GENERAL_INDEX)
+    dec_23 = _raw_cell(raw, "Rural+Urban", 2023, "December", GENERAL_INDEX)
+
+    assert cpi.get("index", "Rural+Urban", 2024, "January", GENERAL_INDEX) == jan_24
+    assert cpi.get("yoy", "Rural+Urban", 2024, "January", GENERAL_INDEX) == pytest.approx((jan_24 / jan_23 - 1) * 100)
+    # MoM across the year boundary reads December of the previous year
+    assert cpi.get("mom", "Rural+Urban", 2024, 1, GENERAL_INDEX) == pytest.approx((jan_24 / dec_23 - 1) * 100)
+    assert np.isnan(cpi.get("yoy", "Rural+Urban", cpi.years[0], "January", GENERAL_INDEX))
+
+
+def test_from_json_handles_messy_labels():
+    data = {
+        "fields": [{"label": "Sector"}, {"label": "Year"}, {"label": "Month"}, {"label": "Food"}, {"label": "Fuel"}],
+        "data": [
+            ["Urban", "2020", "January", "100", "NA"],
+            ["Urban", "2021", "January ", "110", "50"],
+            ["Urban", "2021", "Marcrh", "121", "-"],
+        ],
+    }
+    cpi = CPIEngine.from_json(data)
+    assert cpi.years == [2020, 2021]
+    assert cpi.get("yoy", "Urban", 2021, "January", "Food") == pytest.approx(10.0)
+    assert cpi.get("index", "Urban", 2021, 3, "Food") == 121.0
+    assert np.isnan(cpi.get("index", "Urban", 2021, "March", "Fuel"))
+    assert np.isnan(cpi.get("yoy", "Urban", 2021, "January", "Fuel"))  # base month is NA
+    assert cpi.latest_period("Urban", "Food") == (2021, 3)
+
+    with pytest.raises(KeyError):
+        cpi.get("index", "Rural")
+    with pytest.raises(ValueError):
+        cpi.get("inflation", "Urban")
+    data["data"].append(["Urban", "2021", "Smarch", "1", "1"])
+    with pytest.raises(ValueError):
+        CPIEngine.from_json(data)
@@ -0,0 +1,70 @@
+import os
+
+import pandas as pd
+import pytest
+
+from dataset_cache import DatasetCache
+
+
+def _write(path, frame, mtime_ns=None):
+    frame.to_csv(path, index=False)
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+@pytest.fixture
+def source(tmp_path):
+    frame = pd.DataFrame({
+        "Age": [25, 40, 31, 58],
+        "State": ["Kerala", "Bihar", "Kerala", "Goa"],
+        "Income": [5.5, 12.0, 8.25, 20.0],
+    })
+    path = tmp_path / "data.csv"
+    _write(path, frame)
+    return str(path), frame
+
+
+def test_load_round_trips(tmp_path, source):
+    path, frame = source
+    cache = DatasetCache(str(tmp_path / "cache"))
+    loaded = cache.load(path)
+    assert cache.rows(path) == 4
+    assert list(loaded["State"].astype(str)) == list(frame["State"])
+    assert list(loaded["State"].cat.categories) == ["Bihar", "Goa", "Kerala"]
+    assert loaded["Age"].tolist() == frame["Age"].tolist()
+    assert loaded["Income"].tolist() == frame["Income"].tolist()
+
+    batches = list(cache.iter_batches(path, ["Age"], batch_size=3))
+    assert [len(b) for b in batches] == [3, 1]
+    with pytest.raises(KeyError):
+        cache.load(path, ["Missing"])
+
+
+def test_source_change_invalidates(tmp_path, source):
+    path, frame = source
+    cache = DatasetCache(str(tmp_path / "cache"))
+    first = cache.ensure(path)
+    assert cache.content_hash(path) == first["sha256"]
+
+    changed = frame.assign(Age=frame["Age"] + 1)
+    # Same size; a distinct mtime is all the stat check can see
+    _write(path, changed, mtime_ns=first["mtime_ns"] + 10 ** 9)
+    meta = cache.ensure(path)
+    assert meta["sha256"] != first["sha256"]
+    assert meta["dir"] != first["dir"] and not os.path.isdir(first["dir"])  # stale columns removed
+    assert cache.load(path)["Age"].tolist() == changed["Age"].tolist()
+
+
+def test_touched_source_keeps_columns(tmp_path, source):
+    path, _ = source
+    cache = DatasetCache(str(tmp_path / "cache"))
+    first = cache.ensure(path)
+    os.utime(path, ns=(first["mtime_ns"] + 10 ** 9, first["mtime_ns"] + 10 ** 9))
+    meta = cache.ensure(path)
+    assert meta["dir"] == first["dir"] and meta["sha256"] == first["sha256"]
+    assert meta["mtime_ns"] == first["mtime_ns"] + 10 ** 9
+
+
+def test_missing_source(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        DatasetCache(str(tmp_path / "cache")).ensure(str(tmp_path / "absent.csv"))
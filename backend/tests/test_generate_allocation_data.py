@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from generate_allocation_data import COLUMNS, generate_allocations, verify, write_dataset
+
+
+def test_vectorized_allocations_follow_scalar_rules():
+    report = verify(samples=5000, seed=0)
+    assert report["rule_mismatches"] == 0
+    assert report["passed"], report
+
+
+def test_allocations_sum_to_100():
+    rows = generate_allocations(10000, np.random.default_rng(0))
+    assert rows.shape == (10000, len(COLUMNS))
+    assert (rows[:, 4:].sum(axis=1) == 100).all()
+    assert (rows[:, 4:] >= 0).all()
+
+
+def test_npy_dataset_is_reproducible(tmp_path):
+    first, second = tmp_path / "a.npy", tmp_path / "b.npy"
+    write_dataset(str(first), 2500, seed=7, chunk_size=1000, fmt="npy")
+    write_dataset(str(second), 2500, seed=7, chunk_size=1000, fmt="npy")
+    np.testing.assert_array_equal(np.load(first), np.load(second))
+
+
+@pytest.mark.parametrize("fmt", ["csv", "npy"])
+def test_empty_dataset_still_writes_a_file(tmp_path, fmt):
+    path = tmp_path / f"empty.{fmt}"
+    write_dataset(str(path), 0, seed=1, fmt=fmt)
+    if fmt == "csv":
+        assert path.read_text().strip() == ",".join(COLUMNS)
+    else:
+        assert np.load(path).shape == (0, len(COLUMNS))
+
+
+@pytest.mark.parametrize("count, chunk_size", [(-1, 10), (10, 0)])
+def test_write_dataset_rejects_bad_sizes(tmp_path, count, chunk_size):
+    with pytest.raises(ValueError):
+        write_dataset(str(tmp_path / "bad.csv"), count, chunk_size=chunk_size)
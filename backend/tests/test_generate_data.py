@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from generate_data import COLUMNS, PERSONA_PROFILES, generate_profiles, verify, write_dataset
+
+pytest.importorskip("scipy")
+
+
+def test_vectorized_profiles_match_scalar_distributions():
+    # KS per numeric column, chi-square per categorical, fixed seed so the p-values are stable
+    report = verify(samples=5000, seed=0)
+    failed = {column: r for column, r in report.items() if column != "passed" and r["p_value"] < 0.001}
+    assert report["passed"], failed
+
+
+def test_profile_shares_sum_to_100():
+    profiles = generate_profiles(10000, np.random.default_rng(0))
+    totals = profiles["NeedsPct"] + profiles["WantsPct"] + profiles["SavingsPct"]
+    assert (totals == 100).all()
+    assert set(profiles["PersonaLabel"].categories) == set(PERSONA_PROFILES)
+
+
+def test_write_dataset_is_reproducible(tmp_path):
+    first, second = tmp_path / "a.csv", tmp_path / "b.csv"
+    write_dataset(first, 2500, seed=7, chunk_size=1000)
+    write_dataset(second, 2500, seed=7, chunk_size=1000)
+    assert first.read_bytes() == second.read_bytes()
+    df = pd.read_csv(first)
+    assert list(df.columns) == COLUMNS
+    assert len(df) == 2500
+
+
+@pytest.mark.parametrize("fmt", ["csv", "parquet"])
+def test_empty_dataset_still_has_a_header(tmp_path, fmt):
+    if fmt == "parquet":
+        pytest.importorskip("pyarrow")
+    path = tmp_path / f"empty.{fmt}"
+    write_dataset(str(path), 0, seed=1, fmt=fmt)
+    df = pd.read_csv(path) if fmt == "csv" else pd.read_parquet(path)
+    assert list(df.columns) == COLUMNS
+    assert len(df) == 0
+
+
+@pytest.mark.parametrize("count, chunk_size", [(-1, 10), (10, 0)])
+def test_write_dataset_rejects_bad_sizes(tmp_path, count, chunk_size):
+    with pytest.raises(ValueError):
+        write_dataset(str(tmp_path / "bad.csv"), count, chunk_size=chunk_size)
@@ -0,0 +1,50 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("google.generativeai")
+
+from inspector import OFF_DUTY, InspectorGadget
+
+
+class FakeResponse:
+    text = "Hamara naam hai Inspector Chalu Pandey"
+    usage_metadata = None
+
+
+class FakeModel:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.prompts = []
+
+    def _reply(self, prompt):
+        self.prompts.append(prompt)
+        if self.fail:
+            raise RuntimeError("quota exceeded")
+        return FakeResponse()
+
+    def generate_content(self, prompt):
+        return self._reply(prompt)
+
+    async def generate_content_async(self, prompt):
+        return self._reply(prompt)
+
+
+def ask_both(inspector, context, question):
+    return (inspector.analyze_case(context, question),
+            asyncio.run(inspector.analyze_case_async(context, question)))
+
+
+def test_sync_and_async_paths_agree():
+    inspector = InspectorGadget.__new__(InspectorGadget)
+    inspector.model = FakeModel()
+    assert ask_both(inspector, {"age": 30}, "FD or SIP?") == (FakeResponse.text,) * 2
+    # Same prompt both ways, and each call carries only its own user's context
+    first, second = inspector.model.prompts
+    assert first == second and "{'age': 30}" in first and "FD or SIP?" in first
+
+    inspector.model = FakeModel(fail=True)
+    assert ask_both(inspector, {}, "?") == ("Error connecting to HQ: quota exceeded",) * 2
+
+    inspector.model = None
+    assert ask_both(inspector, {}, "?") == (OFF_DUTY,) * 2
@@ -0,0 +1,82 @@
+import json
+
+import numpy as np
+import pytest
+
+import macro_store
+from macro_store import SNAPSHOT_VERSION, IndicatorStore
+
+RECORDS = [
+    {"id": "repo", "name": "Repo rate", "sheet": "Rates", "unit": "%",
+     "dates": ["2023-02-08", "2023-04-06", "2024-02-08", "2024-06-07"],
+     "values": [6.5, 6.5, 6.5, 6.25]},
+    {"id": "deficit", "name": "Fiscal deficit", "sheet": "Fiscal", "unit": "Rs cr",
+     # unsorted, with a gap
+     "dates": ["2024-03-31", "2023-03-31", "2022-03-31"],
+     "values": [-80.0, float("nan"), -100.0]},
+]
+
+
+@pytest.fixture
+def store():
+    return IndicatorStore.from_series(RECORDS, sha256="ab" * 32)
+
+
+def test_latest(store):
+    latest = store.latest()
+    assert latest["id"].tolist() == ["repo", "deficit"]
+    assert latest["date"].tolist() == [np.datetime64("2024-06-07"), np.datetime64("2024-03-31")]
+    assert latest["value"].tolist() == [6.25, -80.0]
+
+
+def test_as_of(store):
+    table = store.as_of("2023-12-31")
+    assert table["value"].tolist() == [6.5, -100.0]
+    assert table["date"][1] == np.datetime64("2022-03-31")  # the NaN observation was dropped
+    before = store.as_of("2020-01-01", ["repo"])
+    assert np.isnat(before["date"][0]) and np.isnan(before["value"][0])
+
+
+def test_yoy(store):
+    table = store.yoy("2024-03-31")
+    assert table["yoy_pct"][0] == pytest.approx(0.0)
+    # 2024-03-31 against 2023-03-31 (gap) falls back to 2022-03-31: -100 -> -80 is +20% of |prior|
+    assert table["prior_date"][1] == np.datetime64("2022-03-31")
+    assert table["yoy_pct"][1] == pytest.approx(20.0)
+
+
+def test_unknown_ids_raise_key_error(store):
+    with pytest.raises(KeyError):
+        store.latest(["repo", "cpi"])
+
+
+def test_to_json_nulls(store):
+    body = store.to_json(store.as_of("2020-01-01"))
+    assert body == {"id": ["repo", "deficit"], "date": [None, None], "value": [None, None]}
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    import main
+
+    path = tmp_path / "macro_indicators.json"
+    path.write_text(json.dumps({"version": SNAPSHOT_VERSION, "sha256": "cd" * 32,
+                                "indicators": [dict(r, values=[None if v != v else v for v in r["values"]])
+                                               for r in RECORDS]}))
+    monkeypatch.setattr(macro_store, "MACRO_INDICATORS_PATH", str(path))
+    monkeypatch.setattr(main.services, "_values", {k: v for k, v in main.services._values.items() if k != "macro_store"})
+    return TestClient(main.app)
+
+
+def test_latest_endpoint(client):
+    response = client.get("/macro/latest", params={"ids": "repo"})
+    assert response.status_code == 200
+    assert response.json()["indicators"]["value"] == [6.25]
+    assert response.headers["ETag"] == '"' + "cd" * 8 + '"'
+
+
+def test_latest_endpoint_errors(client):
+    assert client.get("/macro/latest", params={"ids": "repo,cpi"}).status_code == 404
+    assert client.get("/macro/latest", params={"as_of": "not-a-date"}).status_code == 422
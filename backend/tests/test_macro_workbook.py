@@ -0,0 +1,112 @@
+import datetime
+
+import numpy as np
+import pytest
+
+import macro_workbook
+from macro_workbook import DATE_COLUMN, MacroWorkbook, load_workbook, parse_workbook
+
+openpyxl = pytest.importorskip("openpyxl")
+
+
+def _write_workbook(path, rate=6.5):
+    workbook = openpyxl.Workbook()
+    rates = workbook.active
+    rates.title = "Rates"
+    rates.append(["Key policy rates"])
+    rates.append([])
+    rates.append(["Period", "Repo Rate (%)", "10-Year G-Sec Yield (FBIL) (%)"])
+    rates.append([datetime.datetime(2024, 1, 1), rate, 7.2])
+    rates.append(["Feb-2024", "-", 7.1])
+    rates.append([None, None, None])
+    rates.append(["Mar-2024", 6.5, 7.05])
+
+    prices = workbook.create_sheet("Prices")
+    prices.append(["Inflation"])
+    prices.append(["Period", "CPI Inflation (%)", "Repo Rate (%)", "Non Food Credit\n (₹  Crore)"])
+    prices.append(["Jan-2024", 5.1, 6.5, 1000])
+    prices.append(["Feb-2024", 5.09, 6.5, "n/a"])
+    workbook.save(path)
+    return str(path)
+
+
+@pytest.fixture
+def workbook_path(tmp_path):
+    return _write_workbook(tmp_path / "macro.xlsx")
+
+
+def test_parse_types_sheets(workbook_path):
+    sheets, meta = parse_workbook(workbook_path)
+    rates = sheets["Rates"]
+    assert list(rates.columns) == [DATE_COLUMN, "Repo Rate (%)", "10-Year G-Sec Yield (FBIL) (%)"]
+    assert rates[DATE_COLUMN].tolist() == [np.datetime64("2024-01-01"), np.datetime64("2024-02-01"),
+                                           np.datetime64("2024-03-01")]
+    assert np.isnan(rates["Repo Rate (%)"][1])  # '-'
+    assert rates["Repo Rate (%)"].dtype == np.float64
+    assert meta["Rates"]["title"] == "Key policy rates" and meta["Rates"]["header_row"] == 2
+    assert np.isnan(sheets["Prices"]["Non Food Credit (₹ Crore)"][1])
+
+
+def test_load_workbook_caches_by_content(workbook_path, tmp_path, monkeypatch):
+    cache_dir = str(tmp_path / "cache")
+    parsed = load_workbook(workbook_path, cache_dir)
+    assert MacroWorkbook.from_cache(parsed.sha256, cache_dir) is not None
+
+    def fail(*args, **kwargs):
+        raise AssertionError("cached workbook was re-parsed")
+
+    monkeypatch.setattr(macro_workbook, "parse_workbook", fail)
+    cached = load_workbook(workbook_path, cache_dir)
+    for name, df in parsed.sheets.items():
+        assert cached.sheets[name].equals(df)
+    assert cached.meta == parsed.meta
+    assert cached.series("Rates", "g-sec").tolist() == [7.2, 7.1, 7.05]
+
+    monkeypatch.undo()
+    _write_workbook(workbook_path, rate=6.25)
+    changed = load_workbook(workbook_path, cache_dir)
+    assert changed.sha256 != parsed.sha256
+    assert changed.sheets["Rates"]["Repo Rate (%)"][0] == 6.25
+
+
+def test_indicator_records(workbook_path):
+    records = {record["id"]: record for record in MacroWorkbook(*parse_workbook(workbook_path)).indicator_records()}
+    repo = records["repo_rate"]
+    assert repo["unit"] == "%" and repo["sheet"] == "Rates"
+    assert repo["dates"] == ["2024-01-01", "2024-02-01", "2024-03-01"]
+    assert repo["values"] == [6.5, None, 6.5]
+    # The second sheet's Repo Rate column is disambiguated by its sheet
+    assert records["prices_repo_rate"]["values"] == [6.5, 6.5]
+    assert records["non_food_credit"]["unit"] == "₹ Crore"
+
+
+def test_discover_schema_reads_header_block(workbook_path):
+    manifest = macro_workbook.discover_schema(workbook_path, keywords=("g-sec", "inflation", "repo"))
+    rates = manifest["sheets"]["Rates"]
+    assert (rates["title"], rates["header_row"], rates["date_column"]) == ("Key policy rates", 2, 0)
+    assert rates["indicators"]["10_year_g_sec_yield_fbil"] == {
+        "column": 2, "letter": "C", "header": "10-Year G-Sec Yield (FBIL) (%)", "unit": "%"}
+    assert rates["keywords"]["g-sec"]["indicators"] == ["10_year_g_sec_yield_fbil"]
+
+    prices = manifest["sheets"]["Prices"]
+    assert prices["header_row"] == 1
+    assert set(prices["indicators"]) == {"cpi_inflation", "prices_repo_rate", "non_food_credit"}
+    # 'Inflation' in the title row is a cell hit, not an indicator
+    assert prices["keywords"]["inflation"] == {"cells": ["A1"], "indicators": ["cpi_inflation"]}
+    assert manifest["sha256"] == macro_workbook.file_hash(workbook_path)
+
+
+def test_discover_schema_reads_only_the_first_rows(workbook_path):
+    # With two rows the Rates header (third row) is out of reach; Prices is still found
+    manifest = macro_workbook.discover_schema(workbook_path, max_rows=2)
+    assert list(manifest["sheets"]) == ["Prices"]
+    sheets, _ = parse_workbook(workbook_path, manifest)
+    assert list(sheets) == ["Prices"] and len(sheets["Prices"]) == 2
+
+
+def test_manifest_is_cached_per_workbook_version(workbook_path, tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    workbook = load_workbook(workbook_path, cache_dir)
+    manifest = macro_workbook.load_manifest(workbook.sha256, cache_dir)
+    assert manifest is not None and set(manifest["sheets"]) == {"Rates", "Prices"}
+    assert macro_workbook.load_manifest("0" * 64, cache_dir) is None
@@ -0,0 +1,51 @@
+import re
+
+from fastapi.testclient import TestClient
+
+from metrics import MetricsRegistry, Stopwatch, STAGE_LATENCY, forward_stages, merge_stage_samples
+
+SAMPLE = re.compile(r'^[a-zA-Z_:][a-zA-Z0-9_:]*(\{([a-zA-Z_][a-zA-Z0-9_]*="[^"]*",?)*\})? -?[0-9.e+-]+$')
+
+
+def test_exposition_format():
+    registry = MetricsRegistry()
+    counter = registry.counter("jobs_total", "Jobs.", ("kind",))
+    histogram = registry.histogram("job_seconds", "Job time.", ("kind",), buckets=(0.1, 1.0))
+    counter.inc(("a",))
+    counter.inc(("a",), 2)
+    for value in (0.05, 0.5, 5.0):
+        histogram.observe(value, ("a",))
+
+    lines = registry.render().splitlines()
+    assert lines[:3] == ["# HELP jobs_total Jobs.", "# TYPE jobs_total counter", 'jobs_total{kind="a"} 3']
+    assert "# TYPE job_seconds histogram" in lines
+    # Buckets are cumulative and end at +Inf == count
+    assert 'job_seconds_bucket{kind="a",le="0.1"} 1' in lines
+    assert 'job_seconds_bucket{kind="a",le="1.0"} 2' in lines
+    assert 'job_seconds_bucket{kind="a",le="+Inf"} 3' in lines
+    assert 'job_seconds_count{kind="a"} 3' in lines
+    assert 'job_seconds_sum{kind="a"} 5.55' in lines
+
+
+def test_worker_stage_samples_are_forwarded():
+    with forward_stages() as samples:
+        watch = Stopwatch("test_component")
+        watch.lap("stage")
+        watch.record()
+    assert [component for component, _ in samples] == ["test_component"]
+    merge_stage_samples(samples)
+    assert any('component="test_component",stage="stage"' in line for line in STAGE_LATENCY.render())
+
+
+def test_metrics_endpoint():
+    import main
+
+    client = TestClient(main.app)
+    client.get("/")
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = response.text.splitlines()
+    assert any(line.startswith('gokuldham_http_requests_total{route="/",method="GET",status="200"} ') for line in body)
+    assert all(line.startswith("#") or SAMPLE.match(line) for line in body), \
+        [line for line in body if not line.startswith("#") and not SAMPLE.match(line)]
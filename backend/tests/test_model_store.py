@@ -0,0 +1,18 @@
+from model_store import ModelStore
+
+
+def test_has_reads_the_fingerprint_sidecar(tmp_path):
+    store = ModelStore(str(tmp_path))
+    assert not store.has("prescription", "abc")
+    store.save("prescription", {"model": [1, 2, 3]}, "abc")
+    assert store.has("prescription", "abc")
+    assert not store.has("prescription", "def")
+    assert store.load("prescription", "abc") == {"model": [1, 2, 3]}
+
+
+def test_has_falls_back_to_the_pickle(tmp_path):
+    store = ModelStore(str(tmp_path))
+    store.save("persona", {"model": 1}, "abc")
+    (tmp_path / "persona.pkl.fingerprint").unlink()
+    assert store.has("persona", "abc")
+    assert (tmp_path / "persona.pkl.fingerprint").read_text() == "abc"
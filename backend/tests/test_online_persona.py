@@ -0,0 +1,27 @@
+import numpy as np
+
+from online_persona import OnlinePersonaClusterer
+
+
+def test_publish_keeps_other_cache_entries_and_copies_the_model(persona_engine):
+    engine = persona_engine
+    prescription_key = ("prescription", engine.model_versions["prescription"], 30, 100000, 10, 2)
+    engine.cache.set(prescription_key, "prescription")
+    engine.predict_persona(50, 30, 20)
+    base_version = engine.model_versions["persona"]
+
+    online = OnlinePersonaClusterer(engine, batch_size=32, flush_interval=0.1, snapshot_interval=3600)
+    online.start()  # seeds on its own thread
+    try:
+        assert online._seeded.wait(60)
+        online.update(np.random.default_rng(0).uniform(0, 60, (32, 3)))
+        assert engine.model_versions["persona"] != base_version
+        # Only stale persona entries go; the prescription result survives every publish
+        assert engine.cache.get(prescription_key) == "prescription"
+        assert all(key[0] != "persona" or key[1] == engine.model_versions["persona"] for key in engine.cache._data)
+        assert engine.persona_model is not online.model
+        assert not np.shares_memory(engine.persona_model.cluster_centers_, online.model.cluster_centers_)
+        assert online.stats()["seeded"]
+    finally:
+        online._stop.set()
+        online._thread.join(5)
@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+
+from optimizer import ALLOCATION_LABELS, TaxOptimizer
+from portfolio_lp import constraint_profile
+
+pytest.importorskip("pulp")
+
+
+@pytest.fixture(scope="module")
+def optimizer():
+    return TaxOptimizer(solver="pulp")
+
+
+def test_vertex_lp_matches_pulp_on_grid(optimizer):
+    # verify() always covers the amount x risk x slab grid (80C and cap boundaries); add a few random draws
+    report = optimizer.verify(samples=24, seed=0)
+    assert report["cases"] == 6 * 3 * 4 + 24
+    assert report["mismatches"] == 0, report["examples"]
+
+
+def test_vertex_lp_matches_pulp_with_updated_returns(optimizer):
+    analytic = TaxOptimizer(solver="analytic")
+    for opt in (optimizer, analytic):
+        opt.set_returns(FD=0.08, NIFTY=0.10)
+    for amount, risk, slab in [(200000, 1, 0.3), (750000, 2, 0.05), (3000000, 3, 0.0)]:
+        expected = optimizer.optimize_portfolio_pulp(amount, risk, slab)
+        actual = analytic.optimize_portfolio(amount, risk, slab)
+        assert actual["status"] == expected["status"]
+        for label in ALLOCATION_LABELS:
+            assert actual["allocation"][label] == pytest.approx(expected["allocation"][label], abs=1)
+
+
+def test_uncapped_profiles_share_one_lp():
+    analytic = TaxOptimizer(solver="analytic")
+    for risk in (3, 7, -1, 42):
+        analytic.optimize_portfolio(500000, risk, 0.3)
+    assert constraint_profile(7) is None
+    assert list(analytic._lps) == [None]
+
+
+def test_has_frontier_tracks_built_frontiers():
+    analytic = TaxOptimizer(solver="analytic")
+    assert not analytic.has_frontier(2, 0.3)
+    analytic.optimize_portfolio(500000, 2, 0.3)
+    assert analytic.has_frontier(2, 0.3)
+    assert not analytic.has_frontier(2, 0.2)
+    assert analytic.frontiers.stats()["hits"] == 0  # probing doesn't count as a lookup
+
+
+def test_optimize_many_matches_scalar_optimizer():
+    analytic = TaxOptimizer(solver="analytic")
+    rng = np.random.default_rng(0)
+    amounts = np.concatenate([[0, 1, 150000, 1500000], rng.uniform(0, 5e6, 300)])
+    risks = rng.integers(1, 4, len(amounts))
+    slabs = rng.choice([0.0, 0.05, 0.2, 0.3], len(amounts))
+    table = analytic.optimize_many(amounts, risks, slabs)
+    for i, (amount, risk, slab) in enumerate(zip(amounts.tolist(), risks.tolist(), slabs.tolist())):
+        expected = analytic.optimize_portfolio_uncached(amount, risk, slab)
+        assert table["status"][i] == expected["status"]
+        assert table["projected_return_1y"][i] == expected["projected_return_1y"]
+        for label in ALLOCATION_LABELS:
+            assert table[label][i] == expected["allocation"][label]
+
+
+def test_optimize_many_broadcasts_one_slab():
+    analytic = TaxOptimizer(solver="analytic")
+    table = analytic.optimize_many([100000, 900000], [1, 3], 0.3)
+    assert table["tax_slab_pct"].tolist() == [0.3, 0.3]
+    assert table["status"].tolist() == ["Optimal", "Optimal"]
+
+
+def test_results_are_memoized_on_normalized_inputs():
+    analytic = TaxOptimizer(solver="analytic")
+    first = analytic.optimize_portfolio(500000, 2, 0.3)
+    assert analytic.optimize_portfolio(500000.0, 2.0, 0.30000000001) is first
+    stats = analytic.results.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+
+def test_new_assumptions_are_never_served_stale_results():
+    analytic = TaxOptimizer(solver="analytic")
+    before = analytic.optimize_portfolio(2000000, 3, 0.0)
+    analytic.set_returns(FD=0.20)
+    after = analytic.optimize_portfolio(2000000, 3, 0.0)
+    assert after is not before
+    assert after["projected_return_1y"] > before["projected_return_1y"]
+    with pytest.raises(ValueError):
+        analytic.set_returns(GOLD=0.1)
@@ -0,0 +1,65 @@
+import json
+import os
+
+import pytest
+
+import calculate_atv
+import pulse_aggregate
+from pulse_aggregate import STATE_PATH, aggregate, latest_atv, totals
+
+
+def _quarter(categories):
+    return {"data": {"transactionData": [
+        {"name": name, "paymentInstruments": [{"type": "TOTAL", "count": count, "amount": amount}]}
+        for name, count, amount in categories
+    ]}}
+
+
+def _write_tree(root, quarters):
+    for (state, year, quarter), categories in quarters.items():
+        directory = root / state / str(year)
+        directory.mkdir(parents=True, exist_ok=True)
+        (directory / f"{quarter}.json").write_text(json.dumps(_quarter(categories)))
+
+
+def _calculate_atv(root, monkeypatch, capsys):
+    monkeypatch.setattr(calculate_atv, "BASE_PATH", str(root))
+    calculate_atv.calculate_state_atv()
+    return json.loads(capsys.readouterr().out)
+
+
+def test_atv_matches_calculate_atv_on_small_tree(tmp_path, monkeypatch, capsys):
+    _write_tree(tmp_path, {
+        ("goa", 2023, 4): [("Merchant payments", 10, 1000.0)],
+        ("goa", 2024, 1): [("Merchant payments", 3, 700.0), ("Peer-to-peer payments", 4, 1234.5)],
+        ("sikkim", 2023, 3): [("Merchant payments", 5, 50.0)],
+        ("sikkim", 2023, 4): [("Merchant payments", 7, 91.0), ("Recharge & bill payments", 2, 17.25)],
+        ("ladakh", 2024, 1): [("Merchant payments", 0, 0.0)],
+    })
+    expected = _calculate_atv(tmp_path, monkeypatch, capsys)
+    df = aggregate(str(tmp_path), workers=1)
+
+    assert latest_atv(df) == expected
+    assert latest_atv(df)["goa"] == round((700.0 + 1234.5) / 7, 2)
+    assert latest_atv(df)["ladakh"] == 0
+    assert latest_atv(df, 2023, 4) == {"goa": 100.0, "sikkim": round(108.25 / 9, 2)}
+
+    yearly = totals(df, ("state", "year"))
+    sikkim = yearly[(yearly["state"] == "sikkim") & (yearly["year"] == 2023)].iloc[0]
+    assert (sikkim["count"], sikkim["amount"]) == (14, 158.25)
+
+
+def test_pool_matches_in_process(tmp_path, monkeypatch):
+    monkeypatch.setattr(pulse_aggregate, "FILES_PER_TASK", 2)
+    _write_tree(tmp_path, {
+        (state, year, quarter): [("Merchant payments", year + quarter, 10.0 * quarter)]
+        for state in ("goa", "kerala") for year in (2022, 2023) for quarter in (1, 2, 3, 4)
+    })
+    assert aggregate(str(tmp_path), workers=2).equals(aggregate(str(tmp_path), workers=1))
+
+
+@pytest.mark.skipif(not os.path.isdir(STATE_PATH), reason="pulse-master data not checked out")
+def test_atv_matches_calculate_atv_on_pulse_data(monkeypatch, capsys):
+    expected = _calculate_atv(STATE_PATH, monkeypatch, capsys)
+    # calculate_atv.py reads 2024 Q1 wherever it exists (every state in the checkout)
+    assert latest_atv(aggregate(workers=1), 2024, 1) == expected
@@ -0,0 +1,61 @@
+import threading
+
+import pytest
+
+from readiness import Readiness
+from registry import LazyRegistry
+
+
+@pytest.fixture
+def warming(monkeypatch):
+    """main's /ready over a registry whose "model" load blocks until released, warmed in the background."""
+    from fastapi.testclient import TestClient
+
+    import main
+
+    readiness = Readiness()
+    monkeypatch.setattr(main, "readiness", readiness)
+    services = LazyRegistry(readiness)
+    started, release = threading.Event(), threading.Event()
+
+    def slow_model():
+        started.set()
+        release.wait(10)
+        return "model"
+
+    services.register("model", slow_model)
+    services.register("broken", lambda: 1 / 0)
+    services.register("warmup", lambda: True)
+    thread = threading.Thread(target=services.warm, daemon=True)
+    thread.start()
+    assert started.wait(10)
+    yield TestClient(main.app), readiness, release, thread
+    release.set()
+
+
+def test_ready_is_503_while_warming_but_liveness_answers(warming):
+    client, readiness, release, thread = warming
+    assert client.get("/").status_code == 200
+
+    response = client.get("/ready")
+    assert response.status_code == 503
+    components = response.json()["components"]
+    assert components["model"]["state"] == "loading"
+    assert components["warmup"]["state"] == "pending"
+
+
+def test_failed_component_keeps_ready_503(warming):
+    client, readiness, release, thread = warming
+    release.set()
+    thread.join(10)
+
+    response = client.get("/ready")
+    assert response.status_code == 503
+    components = response.json()["components"]
+    assert components["model"]["state"] == "ready" and components["model"]["load_ms"] is not None
+    assert components["broken"]["state"] == "failed" and "division by zero" in components["broken"]["error"]
+    # Warm-up carried on past the failure
+    assert components["warmup"]["state"] == "ready"
+
+    readiness.set("broken", "ready")
+    assert client.get("/ready").status_code == 200
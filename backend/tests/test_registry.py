@@ -0,0 +1,68 @@
+import pytest
+
+import registry
+from readiness import Readiness
+from registry import LazyRegistry, ServiceUnavailable
+
+
+def test_unrequested_services_do_not_block_lazy_readiness():
+    readiness = Readiness(lazy=True)
+    services = LazyRegistry(readiness)
+    services.register("model", lambda: "model")
+    services.register("warmup", lambda: True)
+    assert readiness.snapshot()["ready"]
+    assert readiness.state("warmup") == "lazy"
+
+    assert services.get("model") == "model"
+    assert readiness.is_ready()
+
+
+def test_eager_readiness_waits_for_every_service():
+    readiness = Readiness()
+    services = LazyRegistry(readiness)
+    services.register("model", lambda: "model")
+    services.register("warmup", lambda: True)
+    services.get("model")
+    assert not readiness.is_ready()
+    services.get("warmup")
+    assert readiness.is_ready()
+
+
+def test_failed_load_is_retried_after_backoff(monkeypatch):
+    monkeypatch.setattr(registry, "RETRY_BACKOFF_S", 0)
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise FileNotFoundError("dataset not there yet")
+        return "model"
+
+    readiness = Readiness(lazy=True)
+    services = LazyRegistry(readiness)
+    services.register("model", flaky)
+    for _ in range(2):
+        with pytest.raises(ServiceUnavailable):
+            services.get("model")
+    assert not readiness.is_ready()
+    assert readiness.snapshot()["components"]["model"]["attempts"] == 2
+
+    assert services.get("model") == "model"
+    assert readiness.is_ready()
+    assert readiness.snapshot()["components"]["model"]["error"] is None
+
+
+def test_failed_load_waits_for_backoff(monkeypatch):
+    monkeypatch.setattr(registry, "RETRY_BACKOFF_S", 3600)
+    attempts = []
+
+    def failing():
+        attempts.append(1)
+        raise FileNotFoundError("missing")
+
+    services = LazyRegistry(Readiness())
+    services.register("model", failing)
+    for _ in range(3):
+        with pytest.raises(ServiceUnavailable):
+            services.get("model")
+    assert len(attempts) == 1
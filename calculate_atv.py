@@ -2,7 +2,8 @@ import os
 import json
 import sys
 
-BASE_PATH = "/Users/rudresh/project-31/pulse-master/data/aggregated/transaction/country/india/state"
+BASE_PATH = os.getenv("PULSE_STATE_PATH", os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "pulse-master/data/aggregated/transaction/country/india/state"))
 
 def calculate_state_atv():
     results = {}
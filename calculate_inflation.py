@@ -1,37 +1,30 @@
-import json
 import sys
 
-# Load JSON
+from cpi_engine import GENERAL_INDEX, load_cpi
+
+# Usage: python calculate_inflation.py [year] [month] [sector]
+year = int(sys.argv[1]) if len(sys.argv) > 1 else 2024
+month = sys.argv[2] if len(sys.argv) > 2 else "February"
+sector = sys.argv[3] if len(sys.argv) > 3 else "Rural+Urban"
+
+# Load JSON (parsed once into the sector x year x month x subgroup array; YoY precomputed)
 try:
-    with open('/Users/rudresh/project-31/cpi_feb24.json', 'r') as f:
-        data = json.load(f)
+    cpi = load_cpi()
 except Exception as e:
     print(f"Error loading file: {e}")
     sys.exit(1)
 
-# Extract relevant rows for Rural+Urban (General Index)
-# Structure: [Sector, Year, Month, ... General Index(last column)]
-# General Index is index -1 (or 'ad' field)
-
-rows = data.get('data', [])
-feb_24_idx = None
-feb_23_idx = None
-
-for row in rows:
-    sector = row[0]
-    year = row[1]
-    month = row[2]
-    
-    if sector == "Rural+Urban" and month == "February":
-        if year == "2024":
-            feb_24_idx = float(row[-1])
-        elif year == "2023":
-            feb_23_idx = float(row[-1])
+try:
+    current = cpi.get("index", sector, year, month, GENERAL_INDEX)
+    previous = cpi.get("index", sector, year - 1, month, GENERAL_INDEX)
+    inflation = cpi.get("yoy", sector, year, month, GENERAL_INDEX)
+except KeyError as e:
+    print(f"Could not find data: {e.args[0]}")
+    sys.exit(1)
 
-if feb_24_idx and feb_23_idx:
-    inflation = ((feb_24_idx - feb_23_idx) / feb_23_idx) * 100
-    print(f"Feb 2023 Index: {feb_23_idx}")
-    print(f"Feb 2024 Index: {feb_24_idx}")
+if inflation == inflation:  # NaN when either month is missing
+    print(f"{month} {year - 1} Index: {previous}")
+    print(f"{month} {year} Index: {current}")
     print(f"Inflation Rate: {inflation:.2f}%")
 else:
-    print("Could not find data for Feb 2023 or Feb 2024")
+    print(f"Could not find data for {month} {year - 1} or {month} {year} ({sector})")
@@ -0,0 +1,157 @@
+"""
+CPI engine over cpi_feb24.json (MoSPI CPI, base 2012=100): the file is parsed once into a
+(sector x year x month x subgroup) float array, and YoY/MoM inflation for every cell is
+computed up front in one vectorized pass. Queries are direct indexing by label.
+
+    from cpi_engine import load_cpi
+    cpi = load_cpi()
+    cpi.get("yoy", "Rural+Urban", 2024, "January", "General index")    # -> 5.10
+    cpi.get("index", "Urban", 2023)                                     # (12, subgroups) array
+"""
+import json
+import os
+import re
+import sys
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CPI_PATH = os.getenv("CPI_DATA_PATH", os.path.join(BASE_DIR, "cpi_feb24.json"))
+MONTHS = ("January", "February", "March", "April", "May", "June",
+          "July", "August", "September", "October", "November", "December")
+# Month labels are matched on their first three letters ("November ", "Marcrh" occur in the file)
+MONTH_CODES = {name[:3].lower(): i for i, name in enumerate(MONTHS)}
+MISSING = ("NA", "-", "")
+KINDS = ("index", "yoy", "mom")
+GENERAL_INDEX = "General index"
+
+
+def _lag(timeline, months):
+    """Timeline (..., T, G) shifted forward by `months`; the first months are NaN."""
+    lagged = np.full_like(timeline, np.nan)
+    lagged[..., months:, :] = timeline[..., :-months, :]
+    return lagged
+
+
+class CPIEngine:
+    """
+    index[s, y, m, g]: CPI of sector s, year years[y], month m (0 = January), subgroup g;
+    NaN where the series has no value. yoy and mom have the same shape, in percent.
+    """
+
+    def __init__(self, index, sectors, years, subgroups):
+        self.index = np.asarray(index, dtype=np.float64)
+        self.sectors = list(sectors)
+        self.years = list(years)
+        self.subgroups = list(subgroups)
+        self._axes = (
+            {name: i for i, name in enumerate(self.sectors)},
+            {year: i for i, year in enumerate(self.years)},
+            None,
+            {name: i for i, name in enumerate(self.subgroups)},
+        )
+
+        # Month-contiguous timeline (sector, year * 12 + month, subgroup): a year back is 12 steps back
+        timeline = self.index.reshape(len(self.sectors), -1, len(self.subgroups))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.yoy = ((timeline / _lag(timeline, 12) - 1) * 100).reshape(self.index.shape)
+            self.mom = ((timeline / _lag(timeline, 1) - 1) * 100).reshape(self.index.shape)
+
+    @classmethod
+    def from_json(cls, data):
+        """data: the cpi_feb24.json payload ({"fields": [...], "data": [[sector, year, month, values...]]})."""
+        subgroups = [field["label"] for field in data["fields"][3:]]
+        rows = np.array(data["data"], dtype=str)
+        sector_labels = rows[:, 0]
+        years = rows[:, 1].astype(int)
+        sectors = list(dict.fromkeys(sector_labels))
+        year_range = np.arange(years.min(), years.max() + 1)
+
+        months = np.char.lower(np.char.strip(rows[:, 2]))
+        month_codes = np.array([MONTH_CODES.get(m[:3], -1) for m in months])
+        if (month_codes < 0).any():
+            raise ValueError(f"Unknown month label(s): {sorted(set(rows[month_codes < 0, 2]))}")
+
+        values = rows[:, 3:]
+        values = np.where(np.isin(values, MISSING), "nan", values).astype(np.float64)
+        index = np.full((len(sectors), len(year_range), 12, len(subgroups)), np.nan)
+        sector_codes = np.array([sectors.index(label) for label in sector_labels])
+        index[sector_codes, years - year_range[0], month_codes] = values
+        return cls(index, sectors, year_range.tolist(), subgroups)
+
+    # --- Queries ---
+
+    def _key(self, axis, label):
+        if label is None:
+            return slice(None)
+        if axis == 2:
+            return label - 1 if isinstance(label, (int, np.integer)) else MONTH_CODES[label.strip()[:3].lower()]
+        if axis == 1:
+            label = int(label)
+        try:
+            return self._axes[axis][label]
+        except KeyError:
+            raise KeyError(f"Unknown {('sector', 'year', 'month', 'subgroup')[axis]}: {label}") from None
+
+    def get(self, kind="index", sector=None, year=None, month=None, subgroup=None):
+        """
+        Direct lookup: each of sector/year/month/subgroup is a label (month: name or 1-12) or None
+        for the whole axis. Returns a float when all four are given, else the sub-array.
+        """
+        if kind not in KINDS:
+            raise ValueError(f"kind must be one of {', '.join(KINDS)}")
+        key = tuple(self._key(axis, label) for axis, label in enumerate((sector, year, month, subgroup)))
+        result = getattr(self, kind)[key]
+        return float(result) if np.ndim(result) == 0 else result
+
+    def latest_period(self, sector="Rural+Urban", subgroup=GENERAL_INDEX):
+        """(year, month number) of the last month with a value for sector/subgroup."""
+        column = self.get("index", sector, subgroup=subgroup).ravel()
+        last = np.flatnonzero(~np.isnan(column))[-1]
+        return self.years[last // 12], int(last % 12) + 1
+
+    def snapshot(self, sector="Rural+Urban", year=None, month=None):
+        """{subgroup: {"index", "yoy", "mom"}} for one month (the latest general-index month by default)."""
+        if year is None:
+            year, month = self.latest_period(sector)
+        cells = [self.get(kind, sector, year, month) for kind in KINDS]
+        return {
+            subgroup: {kind: None if np.isnan(cell[g]) else round(float(cell[g]), 2) for kind, cell in zip(KINDS, cells)}
+            for g, subgroup in enumerate(self.subgroups)
+        }
+
+    def dates(self):
+        """First-of-month ISO date of every (year, month) cell, year-major."""
+        return [f"{year}-{month:02d}-01" for year in self.years for month in range(1, 13)]
+
+    def indicator_records(self):
+        """Every sector x subgroup index series in the /macro snapshot record format."""
+        dates = self.dates()
+        timeline = self.index.reshape(len(self.sectors), -1, len(self.subgroups))
+        slug = lambda label: re.sub(r"[^a-z0-9]+", "_", label.lower()).strip("_")
+        return [
+            {
+                "id": f"cpi_{slug(sector)}_{slug(subgroup)}",
+                "name": f"CPI {sector}: {subgroup} (2012=100)",
+                "sheet": "CPI",
+                "unit": None,
+                "dates": dates,
+                "values": [None if v != v else v for v in timeline[s, :, g].tolist()]
+            }
+            for s, sector in enumerate(self.sectors)
+            for g, subgroup in enumerate(self.subgroups)
+        ]
+
+
+def load_cpi(path=CPI_PATH):
+    with open(path) as f:
+        return CPIEngine.from_json(json.load(f))
+
+
+if __name__ == "__main__":
+    cpi = load_cpi(sys.argv[1] if len(sys.argv) > 1 else CPI_PATH)
+    year, month = cpi.latest_period()
+    print(f"CPI {len(cpi.sectors)} sectors x {len(cpi.years)} years x 12 months x {len(cpi.subgroups)} subgroups, "
+          f"latest {MONTHS[month - 1]} {year}")
+    for subgroup, cell in cpi.snapshot().items():
+        print(f"  {subgroup:<36} {cell['index']!s:>7}  YoY {cell['yoy']!s:>6}%  MoM {cell['mom']!s:>6}%")
@@ -1,34 +1,23 @@
-import pandas as pd
 import json
-import sys
 
-FILE_PATH = "/Users/rudresh/project-31/50 Macroeconomic Indicators.xlsx"
+from macro_workbook import DATE_COLUMN, load_workbook
 
 try:
-    # Use openpyxl engine
-    df = pd.read_excel(FILE_PATH, sheet_name=0, engine='openpyxl')
-    
-    # "Unnamed: 12" -> 10-Year G-Sec Yield
-    # "Unnamed: 15" -> Policy Repo Rate
-    # The data starts effectively from Row 3 (Index 2 in 0-based DataFrame)
-    
-    # Clean the data: drop rows where these columns are NaN
-    # Columns are indices 12 and 15
-    
-    # Rename columns for clarity based on inspection
-    df.rename(columns={
-        "Unnamed: 12": "G_Sec_Yield",
-        "Unnamed: 15": "Repo_Rate",
-        "Unnamed: 1": "Period"
-    }, inplace=True)
-    
-    # Filter for valid rows
-    valid_data = df[["Period", "G_Sec_Yield", "Repo_Rate"]].dropna()
-    
-    # Get the latest entry (Topmost usually, based on the sample "2025-12-19")
-    # Ensuring it's sorted by date if needed, but sample showed desc order
-    
-    latest = valid_data.iloc[0].to_dict()
+    # Weekly sheet from the workbook cache; columns are looked up by header, not position
+    workbook = load_workbook()
+    df = workbook.sheets["Weekly"]
+
+    columns = {
+        DATE_COLUMN: "Period",
+        workbook.find_column("Weekly", "10-year g-sec yield"): "G_Sec_Yield",
+        workbook.find_column("Weekly", "policy repo rate"): "Repo_Rate"
+    }
+    if None in columns:
+        raise KeyError("G-Sec yield or repo rate column not found in the Weekly sheet")
+
+    # Filter for valid rows, latest entry first
+    valid_data = df[list(columns)].rename(columns=columns).dropna()
+    latest = valid_data.sort_values("Period", ascending=False).iloc[0].to_dict()
     
     print(json.dumps(latest, indent=4, default=str))
 
@@ -1,5 +1,8 @@
-import csv
+import argparse
 import random
+import time
+
+import numpy as np
 
 # CONFIGURATION
 COUNT = 1000
@@ -48,11 +51,134 @@ def generate_allocation():
         
     return [age, income, horizon_years, risk_tolerance, base_equity, debt, gold]
 
-# GENERATE
-with open('dataset_allocations.csv', 'w', newline='') as f:
-    writer = csv.writer(f)
-    writer.writerow(["Age", "Income", "HorizonYears", "RiskTolerance", "EquityPct", "DebtPct", "GoldPct"])
-    for _ in range(COUNT):
-        writer.writerow(generate_allocation())
+# --- Vectorized generator (same rules as generate_allocation, whole arrays at once) ---
+
+COLUMNS = ["Age", "Income", "HorizonYears", "RiskTolerance", "EquityPct", "DebtPct", "GoldPct"]
+OUTPUT_FILE = "dataset_allocations.csv"
+DEFAULT_CHUNK_SIZE = 5_000_000
+
+
+def generate_allocations(count, rng):
+    """
+    Vectorized generate_allocation(): returns an int32 (count, 7) array in COLUMNS order.
+    Same distributions as the scalar version, not the same draws.
+    """
+    out = np.empty((count, len(COLUMNS)), dtype=np.int32)
+    age, income, horizon, risk, equity, debt, gold = out.T
+
+    age[:] = rng.integers(18, 71, count, dtype=np.int32)
+    income[:] = rng.integers(30000, 500001, count, dtype=np.int32)
+    horizon[:] = rng.integers(1, 26, count, dtype=np.int32)
+    risk[:] = rng.integers(1, len(RISK_LEVELS) + 1, count, dtype=np.int32)
+    gold[:] = rng.integers(5, 16, count, dtype=np.int32)
+
+    # 100 - age, then the horizon and risk adjustments
+    np.subtract(100, age, out=equity)
+    equity[horizon < 3] = 0
+    short = (horizon >= 3) & (horizon < 5)
+    np.minimum(equity, 30, out=equity, where=short)
+    equity[horizon > 15] += 10
+    equity[risk == 1] -= 20
+    equity[risk == 3] += 20
+    np.clip(equity, 0, 95, out=equity)
+
+    np.subtract(100 - equity, gold, out=debt)
+    negative = np.minimum(debt, 0)
+    equity += negative
+    debt -= negative
+    return out
+
+
+def write_dataset(path, count, seed=None, chunk_size=DEFAULT_CHUNK_SIZE, fmt="csv"):
+    """
+    Streams `count` rows to CSV, Parquet or .npy in chunks of `chunk_size` (memory stays O(chunk_size)).
+    Each chunk has its own child generator of `seed`, so a (seed, chunk_size) pair always gives the same file.
+    .npy is a single int32 (count, 7) array written through a memmap, readable with np.load(mmap_mode="r").
+    """
+    if count < 0 or chunk_size <= 0:
+        raise ValueError("count must be >= 0 and chunk_size > 0")
+    # At least one chunk, so count=0 still writes the header (an empty table)
+    chunk_seeds = np.random.SeedSequence(seed).spawn(max(1, (count + chunk_size - 1) // chunk_size))
+    if fmt == "npy":
+        out = np.lib.format.open_memmap(path, mode="w+", dtype=np.int32, shape=(count, len(COLUMNS)))
+        for i, chunk_seed in enumerate(chunk_seeds):
+            start = i * chunk_size
+            n = min(chunk_size, count - start)
+            out[start:start + n] = generate_allocations(n, np.random.default_rng(chunk_seed))
+        out.flush()
+        return
+
+    import pandas as pd
+
+    writer = None
+    try:
+        for i, chunk_seed in enumerate(chunk_seeds):
+            n = min(chunk_size, count - i * chunk_size)
+            df = pd.DataFrame(generate_allocations(n, np.random.default_rng(chunk_seed)), columns=COLUMNS)
+            if fmt == "parquet":
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+
+                table = pa.Table.from_pandas(df, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(path, table.schema)
+                writer.write_table(table)
+            else:
+                df.to_csv(path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def verify(samples=20000, seed=0):
+    """
+    Checks generate_allocations against generate_allocation: every vectorized row must be one the
+    scalar rules produce for the same inputs, and the label means must agree within sampling noise.
+    """
+    from unittest.mock import patch
+
+    random.seed(seed)
+    legacy = np.array([generate_allocation() for _ in range(samples)])
+    fast = generate_allocations(samples, np.random.default_rng(seed))
+
+    def rule(row):
+        # Re-run the scalar rules with this row's inputs in place of generate_allocation's own draws
+        age, income, horizon, risk, _, _, gold = (int(v) for v in row)
+        with patch("random.randint", side_effect=[age, income, horizon, gold]), \
+                patch("random.choice", return_value=risk):
+            return generate_allocation()
+
+    mismatches = sum(rule(row) != row.tolist() for row in fast[:2000])
+    mean_gap = np.abs(legacy.mean(axis=0) - fast.mean(axis=0)) / (legacy.std(axis=0) + 1e-9)
+    return {
+        "rule_mismatches": int(mismatches),
+        "max_mean_gap_sd": round(float(mean_gap.max()), 4),
+        "passed": bool(mismatches == 0 and mean_gap.max() < 0.05)
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Synthetic allocation dataset generator.")
+    parser.add_argument("--count", type=int, default=COUNT)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--output", default=OUTPUT_FILE)
+    parser.add_argument("--format", choices=["csv", "parquet", "npy"], default=None,
+                        help="defaults to the --output extension")
+    parser.add_argument("--verify", action="store_true",
+                        help="check the vectorized rules against generate_allocation and exit")
+    args = parser.parse_args()
+    if args.count < 0:
+        parser.error("--count must be >= 0")
+    if args.chunk_size <= 0:
+        parser.error("--chunk-size must be > 0")
+
+    if args.verify:
+        report = verify()
+        print(f"  {report}")
+        raise SystemExit(0 if report["passed"] else 1)
 
-print(f"✅ Generated {COUNT} rows in dataset_allocations.csv")
+    fmt = args.format or next((ext for ext in ("parquet", "npy") if args.output.endswith("." + ext)), "csv")
+    start = time.perf_counter()
+    write_dataset(args.output, args.count, args.seed, args.chunk_size, fmt)
+    print(f"✅ Generated {args.count} rows in {args.output} ({time.perf_counter() - start:.1f}s)")
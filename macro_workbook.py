@@ -0,0 +1,384 @@
+"""
+Macro workbook ingestion: the first rows of every sheet of "50 Macroeconomic Indicators.xlsx"
+are scanned into a schema manifest (title, header row, sheet -> indicator -> column), then
+each sheet is streamed once (openpyxl read-only) from below its header row, and the typed
+result cached as a .npz (+ .json) keyed by the workbook's sha256. Later loads skip openpyxl entirely.
+
+    from macro_workbook import load_workbook
+    wb = load_workbook()
+    wb.sheets["Monthly"]                     # DataFrame: Period + one float64 column per indicator
+    wb.series("Weekly", "10-year g-sec")     # date-sorted Series of the first matching column
+"""
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+WORKBOOK_PATH = os.getenv("MACRO_WORKBOOK", os.path.join(BASE_DIR, "50 Macroeconomic Indicators.xlsx"))
+CACHE_DIR = os.getenv("MACRO_CACHE_DIR", os.path.join(BASE_DIR, ".macro_cache"))
+# Bump when the cached layout changes
+CACHE_VERSION = 1
+DATE_COLUMN = "Period"
+# Indicator snapshot served by the backend's /macro endpoints (format: backend/macro_store.py)
+INDICATORS_PATH = os.getenv("MACRO_INDICATORS_PATH", os.path.join(BASE_DIR, "backend", "macro_indicators.json"))
+INDICATORS_VERSION = 1
+MANIFEST_VERSION = 1
+# Schema discovery only reads this many rows per sheet
+DISCOVERY_ROWS = int(os.getenv("MACRO_DISCOVERY_ROWS", "20"))
+DISCOVERY_KEYWORDS = ("inflation", "cpi", "consumer price", "g-sec", "yield", "rate")
+# A trailing '(%)', '(₹ Crore)', '(US $ Million)' is the unit, not part of the indicator name
+UNIT_PATTERN = re.compile(r"\s*\(([^()]*(?:%|₹|\$)[^()]*)\)\s*$")
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def clean_header(value):
+    """'Non Food Credit\\n (₹  Crore)' -> 'Non Food Credit (₹ Crore)'"""
+    return " ".join(str(value).split())
+
+
+def indicator_id(name):
+    """'10-Year G-Sec Yield (FBIL) (%)' -> ('10_year_g_sec_yield_fbil', '%')"""
+    match = UNIT_PATTERN.search(name)
+    unit = match.group(1) if match else None
+    label = name[:match.start()] if match else name
+    return re.sub(r"[^a-z0-9]+", "_", label.lower()).strip("_"), unit
+
+
+def parse_periods(values):
+    """Datetime cells stay as they are; 'Nov-2025' style labels become the first of the month."""
+    cells = pd.Series(values, dtype=object)
+    labels = cells.map(lambda v: isinstance(v, str)).to_numpy(dtype=bool)
+    periods = pd.to_datetime(cells.where(~labels), errors="coerce")
+    periods[labels] = pd.to_datetime(cells[labels], format="%b-%Y", errors="coerce")
+    return periods.to_numpy(dtype="datetime64[ns]")
+
+
+def frame_from_rows(header, rows):
+    """Typed sheet frame: Period (datetime64) + float64 indicator columns ('-' and text become NaN)."""
+    columns = [i for i, name in enumerate(header) if name is not None and str(name).strip()]
+    names = [clean_header(header[i]) for i in columns]
+    width = max(columns) + 1
+    block = np.array([(list(row) + [None] * width)[:width] for row in rows], dtype=object).reshape(-1, width)
+
+    data = {}
+    for i, name in zip(columns, names):
+        if name == DATE_COLUMN:
+            data[name] = parse_periods(block[:, i])
+        else:
+            data[name] = pd.to_numeric(pd.Series(block[:, i]), errors="coerce").to_numpy(dtype=np.float64)
+    df = pd.DataFrame(data, columns=names)
+    if DATE_COLUMN in df:
+        df = df[df[DATE_COLUMN].notna()].reset_index(drop=True)
+    return df
+
+
+def assign_indicator_ids(columns):
+    """
+    (sheet, header) pairs in workbook order -> {(sheet, header): (id, unit)}. A header whose id
+    is already taken by an earlier sheet gets the sheet name as prefix.
+    """
+    ids, seen = {}, set()
+    for sheet, header in columns:
+        key, unit = indicator_id(header)
+        if key in seen:
+            key = f"{sheet.lower()}_{key}"
+        seen.add(key)
+        ids[(sheet, header)] = (key, unit)
+    return ids
+
+
+def _header_block(ws, max_rows):
+    """First max_rows rows as an object array, padded to a common width."""
+    rows = list(ws.iter_rows(max_row=max_rows, values_only=True))
+    width = max((len(row) for row in rows), default=0)
+    block = np.empty((len(rows), width), dtype=object)
+    for i, row in enumerate(rows):
+        block[i, :len(row)] = row
+    return block
+
+
+def match_keywords(labels, keywords):
+    """(keywords, rows, cols) mask of the cells in `labels` containing each keyword (case-insensitive)."""
+    lowered = np.char.lower(labels.astype(str))
+    return np.char.find(lowered[None], np.char.lower(np.asarray(keywords, dtype=str))[:, None, None]) >= 0
+
+
+def _sheet_schema(ws, max_rows, keywords):
+    """
+    Schema of one sheet from its first max_rows rows: the header is the first row with a
+    'Period' cell or at least two text cells (the sheet title above it is a single cell).
+    """
+    block = _header_block(ws, max_rows)
+    if not block.size:
+        return None
+    is_text = np.frompyfunc(lambda v: isinstance(v, str) and bool(v.strip()), 1, 1)(block).astype(bool)
+    labels = np.where(is_text, np.frompyfunc(clean_header, 1, 1)(block), "").astype(str)
+    is_date = np.char.lower(labels) == DATE_COLUMN.lower()
+    candidates = np.flatnonzero(is_date.any(axis=1) | (is_text.sum(axis=1) >= 2))
+    if not len(candidates):
+        return None
+    header_row = int(candidates[0])
+
+    filled = block[:header_row] != None  # noqa: E711 (elementwise)
+    single = np.flatnonzero(filled.sum(axis=1) == 1)
+    title = str(block[single[0]][filled[single[0]]][0]).strip() if len(single) else None
+
+    from openpyxl.utils import get_column_letter
+    header = labels[header_row].tolist()
+    date_columns = np.flatnonzero(is_date[header_row])
+    columns = [int(c) for c in np.flatnonzero(labels[header_row] != "") if c not in date_columns]
+    hits = match_keywords(labels, keywords)
+    return {
+        "title": title,
+        "header_row": header_row,  # 0-based sheet row
+        "width": int(block.shape[1]),
+        "date_column": int(date_columns[0]) if len(date_columns) else None,
+        "raw_headers": [None if v is None else str(v) for v in block[header_row]],
+        "columns": {header[c]: {"column": c, "letter": get_column_letter(c + 1)} for c in columns},
+        "keywords": {
+            keyword: {
+                "headers": [header[c] for c in np.flatnonzero(mask[header_row]) if c in columns],
+                "cells": [f"{get_column_letter(int(c) + 1)}{r + 1}" for r, c in np.argwhere(mask) if r != header_row]
+            }
+            for keyword, mask in zip(keywords, hits) if mask.any()
+        }
+    }
+
+
+def discover_schema(path=WORKBOOK_PATH, max_rows=DISCOVERY_ROWS, keywords=DISCOVERY_KEYWORDS, sha256=None):
+    """
+    Manifest of sheet -> indicator -> column/header row, from the first max_rows rows of each
+    sheet only (read-only streaming stops there, so the cost does not grow with sheet length).
+    """
+    import openpyxl
+
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", message="Workbook contains no default style")
+        workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    sheets = {}
+    try:
+        for ws in workbook.worksheets:
+            schema = _sheet_schema(ws, max_rows, list(keywords))
+            if schema is not None:
+                sheets[ws.title] = schema
+    finally:
+        workbook.close()
+
+    ids = assign_indicator_ids((sheet, header) for sheet, schema in sheets.items() for header in schema["columns"])
+    for sheet, schema in sheets.items():
+        columns = schema.pop("columns")
+        schema["indicators"] = {}
+        for header, info in columns.items():
+            key, unit = ids[(sheet, header)]
+            schema["indicators"][key] = dict(info, header=header, unit=unit)
+        for match in schema["keywords"].values():
+            match["indicators"] = [ids[(sheet, header)][0] for header in match.pop("headers")]
+    return {
+        "version": MANIFEST_VERSION,
+        "workbook": os.path.basename(path),
+        "sha256": sha256 or file_hash(path),
+        "max_rows": max_rows,
+        "keywords": list(keywords),
+        "sheets": sheets
+    }
+
+
+def manifest_path(sha256, cache_dir=CACHE_DIR):
+    return os.path.join(cache_dir, f"{sha256[:16]}.manifest.json")
+
+
+def save_manifest(manifest, path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def load_manifest(sha256, cache_dir=CACHE_DIR):
+    """The cached manifest of this workbook version, or None."""
+    try:
+        with open(manifest_path(sha256, cache_dir)) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("version") != MANIFEST_VERSION or manifest.get("sha256") != sha256:
+        return None
+    return manifest
+
+
+def parse_workbook(path=WORKBOOK_PATH, manifest=None):
+    """
+    Single streaming pass over every sheet in the manifest (discovered first if not given),
+    reading only the rows below each header. Returns (sheets: name -> DataFrame, meta).
+    """
+    import openpyxl
+
+    if manifest is None:
+        manifest = discover_schema(path)
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", message="Workbook contains no default style")
+        workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    sheets, meta = {}, {}
+    try:
+        for name, schema in manifest["sheets"].items():
+            header = [None] * schema["width"]
+            if schema["date_column"] is not None:
+                header[schema["date_column"]] = DATE_COLUMN
+            for info in schema["indicators"].values():
+                header[info["column"]] = info["header"]
+
+            rows = workbook[name].iter_rows(min_row=schema["header_row"] + 2, values_only=True)
+            body = [row for row in rows if any(v is not None for v in row)]
+            df = frame_from_rows(header, body)
+            sheets[name] = df
+            meta[name] = {
+                "title": schema["title"],
+                "header_row": schema["header_row"],
+                "columns": list(df.columns),
+                "raw_headers": schema["raw_headers"],
+                "rows": len(df)
+            }
+    finally:
+        workbook.close()
+    return sheets, meta
+
+
+class MacroWorkbook:
+    """Typed sheets of the macro workbook plus per-sheet metadata (title, header row, raw headers)."""
+
+    def __init__(self, sheets, meta, sha256=None):
+        self.sheets = sheets
+        self.meta = meta
+        self.sha256 = sha256
+
+    def find_column(self, sheet, keyword):
+        """First column of `sheet` whose header contains `keyword` (case-insensitive), else None."""
+        keyword = keyword.lower()
+        return next((c for c in self.sheets[sheet].columns if keyword in c.lower() and c != DATE_COLUMN), None)
+
+    def series(self, sheet, keyword):
+        """Date-sorted (ascending) Series of the first column matching `keyword`, without gaps."""
+        column = self.find_column(sheet, keyword)
+        if column is None:
+            raise KeyError(f"No column matching '{keyword}' in sheet '{sheet}'")
+        df = self.sheets[sheet]
+        return df.set_index(DATE_COLUMN)[column].dropna().sort_index()
+
+    # --- Columnar cache ---
+
+    def save(self, cache_dir=CACHE_DIR):
+        os.makedirs(cache_dir, exist_ok=True)
+        base = os.path.join(cache_dir, self.sha256[:16])
+        arrays = {}
+        for name, df in self.sheets.items():
+            for i, column in enumerate(df.columns):
+                arrays[f"{name}/{i}"] = df[column].to_numpy()
+        tmp = f"{base}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(tmp, f"{base}.npz")
+        # The JSON goes last: its presence means the arrays are complete
+        with open(tmp, "w") as f:
+            json.dump({"version": CACHE_VERSION, "sha256": self.sha256, "sheets": self.meta}, f)
+        os.replace(tmp, f"{base}.json")
+
+    @classmethod
+    def from_cache(cls, sha256, cache_dir=CACHE_DIR):
+        base = os.path.join(cache_dir, sha256[:16])
+        try:
+            with open(f"{base}.json") as f:
+                manifest = json.load(f)
+            if manifest.get("version") != CACHE_VERSION or manifest.get("sha256") != sha256:
+                return None
+            with np.load(f"{base}.npz") as arrays:
+                sheets = {
+                    name: pd.DataFrame({column: arrays[f"{name}/{i}"] for i, column in enumerate(info["columns"])},
+                                       columns=info["columns"])
+                    for name, info in manifest["sheets"].items()
+                }
+        except (OSError, ValueError, KeyError):
+            return None
+        return cls(sheets, manifest["sheets"], sha256)
+
+    # --- Indicator snapshot ---
+
+    def indicator_records(self):
+        """One record per indicator column (id, name, sheet, unit, ISO dates, values with gaps as None)."""
+        ids = assign_indicator_ids((sheet, column) for sheet, df in self.sheets.items()
+                                   for column in df.columns if column != DATE_COLUMN)
+        records = []
+        for sheet, df in self.sheets.items():
+            dates = df[DATE_COLUMN].dt.strftime("%Y-%m-%d").tolist()
+            for column in df.columns:
+                if column == DATE_COLUMN:
+                    continue
+                key, unit = ids[(sheet, column)]
+                values = df[column].to_numpy()
+                records.append({
+                    "id": key,
+                    "name": column,
+                    "sheet": sheet,
+                    "unit": unit,
+                    "dates": dates,
+                    "values": [None if v != v else float(v) for v in values]
+                })
+        return records
+
+    def export_indicators(self, path=INDICATORS_PATH, extra_records=()):
+        """
+        Writes the snapshot the backend IndicatorStore loads (replaced atomically). extra_records
+        are series from other sources in the same format (e.g. CPIEngine.indicator_records()).
+        """
+        records = self.indicator_records() + list(extra_records)
+        snapshot = {"version": INDICATORS_VERSION, "sha256": self.sha256, "indicators": records}
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(snapshot, f, separators=(",", ":"))
+        os.replace(tmp, path)
+        return len(snapshot["indicators"])
+
+
+def load_workbook(path=WORKBOOK_PATH, cache_dir=CACHE_DIR):
+    """Cached typed sheets of the workbook; parses the xlsx only when its content hash is new."""
+    sha256 = file_hash(path)
+    workbook = MacroWorkbook.from_cache(sha256, cache_dir)
+    if workbook is None:
+        # The manifest outlives cache layout bumps; only a new workbook version is rescanned
+        manifest = load_manifest(sha256, cache_dir)
+        if manifest is None:
+            manifest = discover_schema(path, sha256=sha256)
+            save_manifest(manifest, manifest_path(sha256, cache_dir))
+        sheets, meta = parse_workbook(path, manifest)
+        workbook = MacroWorkbook(sheets, meta, sha256)
+        workbook.save(cache_dir)
+    return workbook
+
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else WORKBOOK_PATH
+    start = time.perf_counter()
+    sheets, meta = parse_workbook(path)
+    parsed = time.perf_counter() - start
+    MacroWorkbook(sheets, meta, file_hash(path)).save()
+
+    start = time.perf_counter()
+    workbook = load_workbook(path)
+    cached = time.perf_counter() - start
+    for name, info in workbook.meta.items():
+        print(f"  {name:<12} header row {info['header_row']}  {info['rows']:>4} rows  {len(info['columns']) - 1:>3} indicators")
+    print(f"✅ xlsx parse {parsed * 1000:.0f} ms, cached load {cached * 1000:.1f} ms")
@@ -0,0 +1,183 @@
+"""
+PhonePe Pulse transaction aggregation over the full history: every {state}/{year}/{quarter}.json
+under pulse-master/data/aggregated/transaction/country/india/state is parsed on a process pool
+(orjson when installed) into one flat table of (state, year, quarter, category, count, amount),
+and totals/ATV for any grouping are vectorized group-bys on it.
+
+    python pulse_aggregate.py                        # ATV per state, latest quarter
+    python pulse_aggregate.py --by state year        # totals and ATV per state and year
+    python pulse_aggregate.py --output pulse.csv     # the full table
+    python pulse_aggregate.py --benchmark            # against the serial calculate_atv.py
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+try:
+    import orjson
+    loads = orjson.loads
+except ImportError:  # optional; these files are small, so open() costs about as much as decoding
+    orjson = None
+    loads = json.loads
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STATE_PATH = os.getenv("PULSE_STATE_PATH", os.path.join(
+    BASE_DIR, "pulse-master", "data", "aggregated", "transaction", "country", "india", "state"))
+# 0 = one worker per CPU; 1 parses in-process (no pool, also what a single-CPU box gets)
+WORKERS = int(os.getenv("PULSE_WORKERS", "0"))
+# Files per pool task: large enough that pickling results doesn't dominate small files
+FILES_PER_TASK = 64
+KEYS = ("state", "year", "quarter", "category")
+
+
+def list_files(root=STATE_PATH):
+    """(state, year, quarter, path) for every {state}/{year}/{quarter}.json under root, sorted."""
+    files = []
+    for state in sorted(e.name for e in os.scandir(root) if e.is_dir()):
+        for year in sorted(e.name for e in os.scandir(os.path.join(root, state)) if e.is_dir() and e.name.isdigit()):
+            directory = os.path.join(root, state, year)
+            for name in sorted(os.listdir(directory)):
+                quarter, ext = os.path.splitext(name)
+                if ext == ".json" and quarter.isdigit():
+                    files.append((state, int(year), int(quarter), os.path.join(directory, name)))
+    return files
+
+
+def parse_file(path):
+    """[(category, count, amount)] of one quarter file, summed over its payment instruments."""
+    with open(path, "rb") as f:
+        data = loads(f.read())
+    rows = []
+    for category in (data.get("data") or {}).get("transactionData") or []:
+        instruments = category.get("paymentInstruments") or []
+        rows.append((category["name"],
+                     sum(i.get("count", 0) for i in instruments),
+                     sum(i.get("amount", 0.0) for i in instruments)))
+    return rows
+
+
+def parse_files(paths):
+    return [parse_file(path) for path in paths]
+
+
+def aggregate(root=STATE_PATH, workers=WORKERS):
+    """
+    Full table, one row per (state, year, quarter, category): count, amount, atv.
+    state and category are pandas Categoricals.
+    """
+    files = list_files(root)
+    paths = [path for *_, path in files]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(paths) <= FILES_PER_TASK:
+        parsed = parse_files(paths)
+    else:
+        batches = [paths[i:i + FILES_PER_TASK] for i in range(0, len(paths), FILES_PER_TASK)]
+        with ProcessPoolExecutor(min(workers, len(batches))) as pool:
+            parsed = [rows for batch in pool.map(parse_files, batches) for rows in batch]
+
+    lengths = np.array([len(rows) for rows in parsed])
+    flat = [row for rows in parsed for row in rows]
+    meta = np.array([(state, year, quarter) for state, year, quarter, _ in files], dtype=object).reshape(-1, 3)
+    df = pd.DataFrame({
+        "state": pd.Categorical(np.repeat(meta[:, 0], lengths)),
+        "year": np.repeat(meta[:, 1], lengths).astype(np.int16),
+        "quarter": np.repeat(meta[:, 2], lengths).astype(np.int8),
+        "category": pd.Categorical([name for name, _, _ in flat]),
+        "count": np.array([count for _, count, _ in flat], dtype=np.int64),
+        "amount": np.array([amount for _, _, amount in flat], dtype=np.float64),
+    })
+    df["atv"] = atv(df["amount"], df["count"])
+    return df
+
+
+def atv(amount, count):
+    """Average transaction value; 0 where there were no transactions (as calculate_atv.py)."""
+    amount, count = np.asarray(amount, dtype=np.float64), np.asarray(count)
+    return np.divide(amount, count, out=np.zeros_like(amount), where=count > 0)
+
+
+def totals(df, by=("state", "year", "quarter")):
+    """count, amount and atv summed over everything not in `by` (e.g. all categories of a quarter)."""
+    grouped = df.groupby(list(by), observed=True, sort=True)[["count", "amount"]].sum().reset_index()
+    grouped["atv"] = atv(grouped["amount"], grouped["count"])
+    return grouped
+
+
+def latest_atv(df, year=None, quarter=None):
+    """{state: ATV over all categories} for the given quarter (each state's latest by default), rounded like calculate_atv.py."""
+    quarterly = totals(df)
+    if year is not None:
+        quarterly = quarterly[(quarterly["year"] == year) & (quarterly["quarter"] == quarter)]
+    else:
+        quarterly = quarterly.sort_values(["year", "quarter"]).groupby("state", observed=True).tail(1)
+    return {state: round(float(value), 2) for state, value in zip(quarterly["state"], quarterly["atv"])}
+
+
+def benchmark(root=STATE_PATH, repeat=3):
+    """Full-history engine (pool and in-process) against calculate_atv.py's serial single-quarter walk."""
+    import contextlib
+    import io
+    import calculate_atv
+
+    def best(fn):
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = fn()
+            samples.append(time.perf_counter() - start)
+        return min(samples), result
+
+    def serial():
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            calculate_atv.calculate_state_atv()
+        return json.loads(out.getvalue())
+
+    files = len(list_files(root))
+    serial_s, expected = best(serial)
+    pool_s, df = best(lambda: aggregate(root))
+    inline_s, _ = best(lambda: aggregate(root, workers=1))
+    print(f"decoder: {'orjson' if orjson else 'json'}, workers: {WORKERS or os.cpu_count()}, files: {files}")
+    print(f"  calculate_atv.py (1 quarter/state)   {serial_s * 1000:>8.1f} ms   {len(expected)} files")
+    print(f"  aggregate, in-process (all quarters) {inline_s * 1000:>8.1f} ms   {len(df):,} rows")
+    print(f"  aggregate, process pool              {pool_s * 1000:>8.1f} ms")
+    print(f"  per file: serial {serial_s / max(len(expected), 1) * 1e6:.0f} us, engine {min(pool_s, inline_s) / files * 1e6:.0f} us")
+
+    # calculate_atv.py reads 2024 Q1 wherever it exists (every state here)
+    actual = latest_atv(df, 2024, 1)
+    mismatches = [state for state, value in expected.items() if actual.get(state) != value]
+    print(f"  ATV parity with calculate_atv.py: {len(expected) - len(mismatches)}/{len(expected)} states")
+    return not mismatches
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--root", default=STATE_PATH)
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    parser.add_argument("--by", nargs="+", choices=KEYS, help="print totals per these keys")
+    parser.add_argument("--output", help="write the full table (.csv or .json)")
+    parser.add_argument("--benchmark", action="store_true")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        sys.exit(0 if benchmark(args.root) else 1)
+
+    start = time.perf_counter()
+    df = aggregate(args.root, args.workers)
+    sys.stderr.write(f"✅ {len(df):,} rows from {df.groupby(['state', 'year', 'quarter'], observed=True).ngroups} files "
+                     f"in {(time.perf_counter() - start) * 1000:.0f} ms\n")
+    if args.output:
+        if args.output.endswith(".json"):
+            df.to_json(args.output, orient="records")
+        else:
+            df.to_csv(args.output, index=False)
+    elif args.by:
+        print(totals(df, args.by).to_string(index=False))
+    else:
+        print(json.dumps(latest_atv(df), indent=4))
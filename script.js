@@ -2383,8 +2383,27 @@ function updateScenarioAnalysis() {
 window.addEventListener("DOMContentLoaded", () => {
     randomizeGranularAlloc(); // Nudge logic: Equal chance start
     initUI();
+    loadMacroData();
 });
 
+// Live macro indicators from the backend store; macro_data.js values stay as the offline fallback
+function loadMacroData() {
+    const ids = ["consumer_price_index_2012_100", "policy_repo_rate", "10_year_g_sec_yield_fbil"];
+    fetch(`https://gokuldham-backend.onrender.com/macro/latest?ids=${ids.join(",")}`)
+        .then(res => res.json())
+        .then(data => {
+            const table = data.indicators;
+            const row = id => table.id.indexOf(id);
+            const cpi = row("consumer_price_index_2012_100");
+            window.MACRO_DATA = window.MACRO_DATA || {};
+            if (table.yoy_pct[cpi] != null) window.MACRO_DATA.inflation_national = Math.round(table.yoy_pct[cpi] * 10) / 10;
+            if (table.value[row("policy_repo_rate")] != null) window.MACRO_DATA.repo_rate = table.value[row("policy_repo_rate")];
+            if (table.value[row("10_year_g_sec_yield_fbil")] != null) window.MACRO_DATA.risk_free = table.value[row("10_year_g_sec_yield_fbil")];
+            window.MACRO_DATA.lastUpdated = table.date[cpi];
+        })
+        .catch(e => console.warn("Macro API unavailable, using bundled macro_data.js.", e));
+}
+
 // Randomize Granular Inputs (Sum to 100)
 function randomizeGranularAlloc() {
     const categories = Object.keys(GRANULAR_ALLOC);